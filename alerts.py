@@ -0,0 +1,137 @@
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+
+from sqlalchemy import bindparam
+
+from lazy import lazy_import
+from models import PriceAlert, db
+
+
+np = lazy_import("numpy")
+
+# position in KINDS is the code the matcher compares against
+KINDS = ("above", "below", "move")
+
+
+def match(rows, kinds, thresholds, prices, moves):
+    """Positions of the alerts whose threshold is crossed.
+
+    Alerts are columns: ``rows`` indexes each alert's symbol into ``prices``
+    and ``moves`` (NaN where there is no usable quote, which never matches),
+    ``kinds`` holds indices into ``KINDS``. One pass over the arrays, however
+    many users the alerts belong to.
+    """
+    price = prices[rows]
+    move = np.abs(moves[rows])
+    with np.errstate(invalid="ignore"):
+        hit = (((kinds == 0) & (price >= thresholds)) |
+               ((kinds == 1) & (price <= thresholds)) |
+               ((kinds == 2) & (move >= thresholds)))
+    return np.flatnonzero(hit)
+
+
+def describe(alert):
+    if alert["kind"] == "move":
+        return f"{alert['ticker']} moved {alert['change_percent']:+.2f}% today"
+    return f"{alert['ticker']} is at {alert['price']:.2f}, {alert['kind']} {alert['threshold']:g}"
+
+
+class LocalSink:
+    """Notifications kept in process memory, newest last, and logged."""
+
+    def __init__(self, size=1000):
+        self.sent = deque(maxlen=size)
+        self.lock = threading.Lock()
+
+    def send(self, notifications):
+        with self.lock:
+            self.sent.extend(notifications)
+        for notification in notifications:
+            logging.info("Alert for user %s: %s", notification["user_id"], notification["message"])
+
+    def for_user(self, user_id):
+        with self.lock:
+            return [notification for notification in self.sent if notification["user_id"] == user_id]
+
+
+class AlertEngine:
+    """Evaluates every active price alert in one pass per tick.
+
+    A tick reads the active alerts ordered by ticker, fetches quotes for the
+    distinct symbols in one batched ``get_quotes`` call and matches all
+    thresholds at once. Stale (last-known-good) quotes never trigger. Fired
+    alerts are switched off in a single bulk update, committed, and only then
+    handed to the sink, so a crash between the two loses a notification
+    rather than sending it twice.
+    """
+
+    def __init__(self, get_quotes, sink, clock=datetime.utcnow):
+        self.get_quotes = get_quotes
+        self.sink = sink
+        self.clock = clock
+
+    def tick(self):
+        alerts = (db.session.query(PriceAlert.id, PriceAlert.user_id, PriceAlert.ticker,
+                                   PriceAlert.kind, PriceAlert.threshold)
+                  .filter(PriceAlert.active.is_(True)).order_by(PriceAlert.ticker).all())
+        if not alerts:
+            return []
+        symbols = list(dict.fromkeys(alert.ticker for alert in alerts))
+        quotes = self.get_quotes(symbols)
+        stale = getattr(quotes, "stale", ())
+
+        prices = np.full(len(symbols), np.nan)
+        moves = np.full(len(symbols), np.nan)
+        for i, symbol in enumerate(symbols):
+            quote = quotes.get(symbol)
+            if quote and symbol not in stale:
+                prices[i] = quote["price"]
+                moves[i] = quote.get("change_percent", np.nan)
+
+        position = {symbol: i for i, symbol in enumerate(symbols)}
+        rows = np.fromiter((position[alert.ticker] for alert in alerts), dtype=np.int64, count=len(alerts))
+        kinds = np.fromiter((KINDS.index(alert.kind) for alert in alerts), dtype=np.int64, count=len(alerts))
+        thresholds = np.fromiter((alert.threshold for alert in alerts), dtype=np.float64, count=len(alerts))
+        hits = match(rows, kinds, thresholds, prices, moves)
+        if not len(hits):
+            return []
+
+        now = self.clock()
+        fired = []
+        for i in hits:
+            alert = alerts[i]
+            fired.append({
+                "alert_id": alert.id,
+                "user_id": alert.user_id,
+                "ticker": alert.ticker,
+                "kind": alert.kind,
+                "threshold": alert.threshold,
+                "price": float(prices[rows[i]]),
+                "change_percent": round(float(moves[rows[i]]), 2),
+                "triggered_at": now.isoformat(),
+            })
+        db.session.execute(
+            PriceAlert.__table__.update()
+            .where(PriceAlert.__table__.c.id == bindparam("alert_id"))
+            .values(active=False, triggered_at=now, triggered_price=bindparam("price")),
+            [{"alert_id": alert["alert_id"], "price": alert["price"]} for alert in fired])
+        db.session.commit()
+        for alert in fired:
+            alert["message"] = describe(alert)
+        self.sink.send(fired)
+        return fired
+
+
+def to_json(alert):
+    return {
+        "id": alert.id,
+        "ticker": alert.ticker,
+        "kind": alert.kind,
+        "threshold": alert.threshold,
+        "active": alert.active,
+        "created_at": alert.created_at.isoformat() if alert.created_at else None,
+        "triggered_at": alert.triggered_at.isoformat() if alert.triggered_at else None,
+        "triggered_price": alert.triggered_price,
+    }
@@ -0,0 +1,93 @@
+from lazy import lazy_import
+
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+TRADING_DAYS = 252
+
+
+def align_closes(closes, tickers):
+    """Stack close series into one date-aligned price matrix.
+
+    Gaps are forward-filled and rows before every column has a price are
+    dropped. Tickers without any history are returned separately.
+    """
+    present = [ticker for ticker in tickers if ticker in closes and len(closes[ticker])]
+    missing = [ticker for ticker in tickers if ticker not in present]
+    if not present:
+        return pd.DataFrame(), missing
+    frame = pd.concat([closes[ticker] for ticker in present], axis=1, keys=present).sort_index()
+    frame = frame.ffill().dropna()
+    return frame, missing
+
+
+def portfolio_analytics(holdings, closes, benchmark="^GSPC"):
+    """Valuation, daily P&L and risk for a set of holdings in one vectorized pass.
+
+    ``holdings`` maps ticker -> quantity and ``closes`` maps ticker -> daily
+    close Series (including the benchmark). Every metric is computed as array
+    operations over the aligned T x N price matrix, so cost grows with the
+    number of observations, not with Python-level work per position.
+    """
+    tickers = list(holdings)
+    frame, missing = align_closes(closes, tickers + [benchmark])
+    if benchmark in missing:
+        missing.remove(benchmark)
+    held = [ticker for ticker in tickers if ticker not in missing]
+    result = {"positions": [], "missing": missing, "total_value": 0.0, "daily_pnl": 0.0,
+              "daily_pnl_percent": 0.0, "volatility": None, "beta": None,
+              "correlation": {"tickers": held, "matrix": []}}
+    if not held or len(frame) < 2:
+        return result
+
+    prices = frame[held].to_numpy(dtype=np.float64)
+    quantities = np.array([holdings[ticker] or 0 for ticker in held], dtype=np.float64)
+    last, prev = prices[-1], prices[-2]
+
+    market_value = quantities * last
+    daily_pnl = quantities * (last - prev)
+    total = market_value.sum()
+    # with no quantities entered yet, fall back to an equal-weight view of the list
+    weights = market_value / total if total else np.full(len(held), 1 / len(held))
+
+    returns = prices[1:] / prices[:-1] - 1
+    # risk needs at least two returns; report it as unknown rather than NaN
+    enough = len(returns) > 1
+    volatility = returns.std(axis=0, ddof=1) * np.sqrt(TRADING_DAYS) if enough else np.full(len(held), np.nan)
+    portfolio_returns = returns @ weights
+
+    betas = np.full(len(held), np.nan)
+    portfolio_beta = None
+    if benchmark in frame:
+        market = frame[benchmark].to_numpy(dtype=np.float64)
+        market_returns = market[1:] / market[:-1] - 1
+        centered_market = market_returns - market_returns.mean()
+        variance = centered_market @ centered_market
+        if variance and enough:
+            betas = (returns - returns.mean(axis=0)).T @ centered_market / variance
+            portfolio_beta = float(weights @ betas)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        correlation = np.corrcoef(returns, rowvar=False) if len(held) > 1 and enough else np.eye(len(held))
+
+    prev_total = (quantities * prev).sum()
+    result.update({
+        "total_value": float(total),
+        "daily_pnl": float(daily_pnl.sum()),
+        "daily_pnl_percent": float(daily_pnl.sum() / prev_total * 100) if prev_total else 0.0,
+        "volatility": float(portfolio_returns.std(ddof=1) * np.sqrt(TRADING_DAYS)) if enough else None,
+        "beta": portfolio_beta,
+        "as_of": frame.index[-1].strftime("%Y-%m-%d"),
+        "correlation": {"tickers": held, "matrix": np.round(np.nan_to_num(correlation), 4).tolist()},
+    })
+    result["positions"] = [
+        {"ticker": ticker, "quantity": float(quantities[i]), "price": float(last[i]),
+         "market_value": float(market_value[i]), "weight": float(weights[i]),
+         "daily_pnl": float(daily_pnl[i]),
+         "volatility": None if np.isnan(volatility[i]) else float(volatility[i]),
+         "beta": None if np.isnan(betas[i]) else float(betas[i])}
+        for i, ticker in enumerate(held)
+    ]
+    return result
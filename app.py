@@ -1,39 +1,90 @@
+import csv
 import logging
-import time
+import math
 import os
-import random
 import re
-import yfinance as yf
+import threading
+import time
 
-from flask import Flask, render_template, request, redirect, url_for, flash, abort, jsonify
+import click
+
+from flask import Flask, Response, render_template, request, redirect, url_for, flash, abort, jsonify, \
+    stream_with_context
 from flask_caching import Cache
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from flask_talisman import Talisman
 from dotenv import load_dotenv
 
-from models import User, db, Portfolio
-from utils import load_watchlist, fetch_stockdata, save_watchlist
+from alerts import KINDS, AlertEngine, LocalSink, to_json as alert_json
+from analytics import portfolio_analytics
+from fragments import FragmentCache
+from fundamentals import FundamentalsStore
+from indicators import GROUPS, IndicatorCache, encode_indicators, series_from_array
+from market_hours import BUNDLED_CALENDAR, TTLS, Schedule, TradingCalendar
+from metrics import Metrics, span
+from models import User, db, Portfolio, PriceAlert, WatchlistEntry, insert_ignore, upgrade_schema
+from news import NewsStore, ingest
+from portfolio_io import PARSERS, UploadError, export_rows, import_rows
+from payloads import MAX_AGE, MAX_POINTS, decimate_index, encode_series, json_body, series_etag
+from providers import INTERVAL_MINUTES, MarketData
+from quote_cache import QuoteCache
+from refresher import Refresher
+from streaming import QuoteHub, SimulatedFeed, StoreFeed
+from symbols import BUNDLED, SymbolIndex, SymbolValidator, download_symbols, write_symbols
+from timeseries import REFRESH_AFTER, OHLCVStore
+from valuation import DEFAULT_DISCOUNT_RATE, DEFAULT_GROWTH, DEFAULT_YEARS, extract_fundamentals, to_json, valuations
+from utils import load_watchlist, fetch_stockdata, format_large_number
 
 
 cache = Cache()
 login_manager = LoginManager()
+market_data = MarketData()
+metrics = Metrics()
+
+STOCK_TICKERS = ["AAPL", "GOOGL", "MSFT", "TSLA", "AMZN"]
+CORE_TICKERS = STOCK_TICKERS + ["^DJI", "^IXIC", "^GSPC"]
 
 
-def create_app():
+def create_app(test_config=None):
     load_dotenv()
     app = Flask(__name__)
 
     app.config['SECRET_KEY'] = 'secret-key'
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('MYSQL_URI')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    app.config['CACHE_TYPE'] = 'SimpleCache'
+    # shared by every worker on the host; set CACHE_TYPE=RedisCache to share across hosts
+    app.config['CACHE_TYPE'] = os.getenv('CACHE_TYPE', 'shared_cache.SQLiteCache')
+    app.config['CACHE_DIR'] = os.getenv('CACHE_DIR')
+    app.config['CACHE_REDIS_URL'] = os.getenv('CACHE_REDIS_URL')
+    app.config['CACHE_THRESHOLD'] = 5000
     app.config['CACHE_DEFAULT_TIMEOUT'] = 300
+    app.config['MARKET_DATA_PROVIDER'] = os.getenv('MARKET_DATA_PROVIDER', 'yfinance')
+    app.config['MARKET_DATA_FIXTURE'] = os.getenv('MARKET_DATA_FIXTURE')
+    app.config['SYMBOLS_FILE'] = os.getenv('SYMBOLS_FILE')
+    # cache TTLs follow the exchange calendar; MARKET_TTLS overrides entries of market_hours.TTLS
+    app.config['MARKET_CALENDAR'] = os.getenv('MARKET_CALENDAR', BUNDLED_CALENDAR)
+    app.config['MARKET_TTLS'] = {}
+    app.config['OHLCV_STORE_DIR'] = os.getenv('OHLCV_STORE_DIR')
+    app.config['STREAM_FEED'] = os.getenv('STREAM_FEED', 'store')
+    app.config['STREAM_POLL_INTERVAL'] = 15
+    app.config['STREAM_HEARTBEAT'] = 15
+    # each open stream occupies a worker thread: streams are recycled after
+    # STREAM_MAX_AGE seconds and at most STREAM_MAX_CLIENTS run per process,
+    # so run under a threaded worker class (see gunicorn.conf.py) with more
+    # threads than that
+    app.config['STREAM_MAX_AGE'] = 300
+    app.config['STREAM_MAX_CLIENTS'] = 4
+    app.config['METRICS_SERVER_TIMING'] = os.getenv('METRICS_SERVER_TIMING') == '1'
+    if test_config:
+        app.config.update(test_config)
 
     db.init_app(app)
     login_manager.init_app(app)
     cache.init_app(app)
-    Talisman(app, content_security_policy={
+    market_data.init_app(app)
+    metrics.init_app(app)
+    Talisman(app, force_https=not app.testing, content_security_policy={
         'default-src': "'self'",
 
         'script-src': ["'self'", "https://cdn.jsdelivr.net","https://cdn.plot.ly","'unsafe-inline'","'unsafe-eval'"],
@@ -43,8 +94,10 @@ def create_app():
         'connect-src': ["'self'","https://*.yahoo.com"]
     })
 
+    # the schema is created by `flask init-db`, not on every worker boot
     with app.app_context():
-        db.create_all()
+        metrics.watch_engine(db.engine)
+        metrics.watch_cache(cache.cache)
         register_routes(app)
 
     return app
@@ -55,132 +108,170 @@ def is_valid_ticker(ticker):
 
 
 def register_routes(app):
-    @app.template_filter('format_large_number')
-    def format_large_number(value):
+    app.add_template_filter(format_large_number, 'format_large_number')
+
+    # `flask refresh-symbols` writes the full listing here; until then the bundled file is used
+    refreshed_symbols = os.path.join(app.instance_path, 'symbols.csv')
+    symbols_file = app.config['SYMBOLS_FILE'] or \
+        (refreshed_symbols if os.path.exists(refreshed_symbols) else BUNDLED)
+    symbol_index = SymbolIndex.from_csv(symbols_file)
+    app.extensions['symbols'] = symbol_index
+
+    ttls = {data_class: dict(phases, **app.config['MARKET_TTLS'].get(data_class, {}))
+            for data_class, phases in TTLS.items()}
+    schedule = Schedule(TradingCalendar.from_file(app.config['MARKET_CALENDAR']), ttls)
+    app.extensions['schedule'] = schedule
+
+    def fetch_fundamentals(tickers):
+        infos = market_data.get_infos(tickers)
+        return {ticker: extract_fundamentals(ticker, info) for ticker, info in infos.items() if info}
+
+    # names, currencies and valuation inputs change at most daily; misses are fetched concurrently
+    fundamentals_cache = QuoteCache(cache, fetch_fundamentals, timeout=lambda: schedule.ttl("fundamentals"),
+                                    prefix="fundamentals:")
+
+    def stock_entry(ticker, quote, profile, stale=False):
+        if not quote:
+            return {"error": "No data available"}
         try:
-            value = float(value)
-            if abs(value) >= 1_000_000_000:
-                return "${:,.2f}B".format(value / 1_000_000_000)
-            elif abs(value) >= 1_000_000:
-                return "${:,.2f}M".format(value / 1_000_000)
-            elif abs(value) >= 1_000:
-                return "${:,.2f}K".format(value / 1_000)
-            else:
-                return "${:,.2f}".format(value)
-        except (ValueError, TypeError):
-            return value
-    @cache.memoize(timeout=300)
-    def get_core_data():
-        core_tickers = ["AAPL", "GOOGL", "MSFT", "TSLA", "AMZN", "^DJI", "^IXIC", "^GSPC"]
-        data = yf.download(
-            tickers=core_tickers,
-            period="1d",
-            interval="1m",
-            group_by="ticker",
-            progress=False,
-            auto_adjust=False
-        )
-
-        processed_data = {}
-        for ticker in core_tickers:
-            try:
-                df = data[ticker]
-                latest = df.iloc[-1]
-                processed_data[ticker] = {
-                    "price": round(latest["Close"], 2),
-                    "change": round(latest["Close"] - df.iloc[0]["Open"], 2)
+            price_change = round(quote["price"] - quote["open"], 2)
+            percent_change = round((price_change / quote["open"]) * 100, 2)
+            return {
+                "price": round(quote["price"], 2),
+                "change": percent_change,
+                "currency": profile.get("currency", "USD"),
+                "name": profile.get("name", ticker),
+                "stale": stale
+            }
+        except Exception as e:
+            return {"error": str(e)}
+
+    quote_cache = QuoteCache(cache, market_data.get_quotes, timeout=lambda: schedule.ttl("quote"))
+    # the index is the fast path; anything it does not list is checked against a (cached) quote
+    symbol_validator = SymbolValidator(symbol_index, quote_cache.get_quotes)
+
+    def load_core_data():
+        # every worker runs this; reading through the shared cache means only the
+        # first to find an entry expiring goes upstream and the rest reuse its fetch
+        quotes = quote_cache.get_quotes(CORE_TICKERS)
+
+        indices = {}
+        for ticker in CORE_TICKERS:
+            quote = quotes.get(ticker)
+            if quote:
+                indices[ticker] = {
+                    "price": round(quote["price"], 2),
+                    "change": round(quote["price"] - quote["open"], 2)
                 }
+            else:
+                indices[ticker] = {"error": "data error"}
+        profiles = fundamentals_cache.get_quotes([ticker for ticker in STOCK_TICKERS if ticker in quotes])
+        stocks = {ticker: stock_entry(ticker, quotes.get(ticker), profiles.get(ticker, {}),
+                                      stale=ticker in quotes.stale)
+                  for ticker in STOCK_TICKERS}
+        return {"indices": indices, "stocks": stocks}
+
+    ohlcv_store = OHLCVStore(
+        app.config['OHLCV_STORE_DIR'] or os.path.join(app.instance_path, 'ohlcv'),
+        market_data.get_history,
+        refresh_after=lambda interval, fetched_at: schedule.bar_ttl(
+            interval, REFRESH_AFTER.get(interval, 3600), fetched_at)
+    )
+
+    if app.config['STREAM_FEED'] == 'simulated':
+        feed = SimulatedFeed()
+    else:
+        feed = StoreFeed(ohlcv_store)
+    quote_hub = QuoteHub(feed, interval=app.config['STREAM_POLL_INTERVAL'])
+    app.extensions['quote_hub'] = quote_hub
+
+    # served from a warm snapshot; requests never wait on the upstream fetch. The
+    # refresher sleeps through closed hours and wakes just before the open to pre-warm
+    core_data_refresher = Refresher(
+        load_core_data,
+        interval=lambda: schedule.refresh_interval("quote"),
+        default={"indices": {}, "stocks": {}},
+        app=app
+    )
+    app.extensions['core_data'] = core_data_refresher
 
-                time.sleep(random.uniform(1, 2))
-            except KeyError:
-                processed_data[ticker] = {"error": "data error"}
-        return processed_data
-
-    @cache.memoize(timeout=60)
-    def get_stock_data(tickers, period="1d", interval="1m"):
-        data = {}
-        for ticker in tickers:
-            try:
-                stock = yf.Ticker(ticker)
-                hist = stock.history(period=period, interval=interval)
-                if not hist.empty:
-                    price_change = round(hist["Close"].iloc[-1] - hist["Open"].iloc[0], 2)
-                    percent_change = round((price_change / hist["Open"].iloc[0]) * 100, 2)
-                    data[ticker] = {
-                        "price": round(hist["Close"].iloc[-1], 2),
-                        "change": percent_change,
-                        "currency": stock.info.get("currency", "USD"),
-                        "name": stock.info.get("shortName", ticker)
-                    }
-                else:
-                    data[ticker] = {"error": "No data available"}
-            except Exception as e:
-                data[ticker] = {"error": str(e)}
-        return data
+    def get_core_data():
+        with span("core_data"):
+            return core_data_refresher.get()
+
+    def get_market_indices(core_data, index_tickers):
+        indices = core_data["indices"]
+        return {name: indices[ticker] for ticker, name in index_tickers.items()
+                if "price" in indices.get(ticker, {})}
+
+    # one batched history download covers every position not already cached
+    closes_cache = QuoteCache(
+        cache, lambda tickers: market_data.get_closes(tickers, period="1y"),
+        timeout=lambda: schedule.ttl("daily_bar"), prefix="closes:1y:"
+    )
+
+    def get_portfolio_analytics(user):
+        holdings = {entry.ticker: entry.quantity for entry in user.portfolios}
+        with span("portfolio_analytics"):
+            closes = closes_cache.get_quotes(list(holdings) + ["^GSPC"])
+            return portfolio_analytics(holdings, closes, benchmark="^GSPC")
+
+    statements_store = FundamentalsStore(market_data.get_statements)
+
+    def get_stock_data(tickers):
+        with span("stock_data"):
+            # failures come back as missing or stale entries, never as exceptions
+            quotes = quote_cache.get_quotes(tickers)
+            profiles = fundamentals_cache.get_quotes([ticker for ticker in tickers if ticker in quotes])
+            return {ticker: stock_entry(ticker, quotes.get(ticker), profiles.get(ticker, {}),
+                                        stale=ticker in quotes.stale)
+                    for ticker in tickers}
 
 
     @login_manager.user_loader
     def load_user(user_id):
         return User.query.get(int(user_id))
 
-    # get news
-    @cache.memoize(timeout=1800)
-
-    def get_news(tickers=["AAPL", "TSLA"], max_news=5):
-        news_list = [{
-                    "title": "Market Update: Stocks Show Mixed Trends",
-                    "link": "#",
-                    "publisher": "SimplyStocks",
-                    "timestamp": 0
-                }]
-        return news_list[:max_news]
-
-
-    # def get_news(tickers=["AAPL", "TSLA"], max_news=5):
-    #     news_list = []
-    #     try:
-    #         for ticker in tickers:
-    #             stock = yf.Ticker(ticker)
-    #             news = stock.news or []
-    #
-    #             for item in news[:max_news]:
-    #                 # 添加更严格的字段验证
-    #                 if not isinstance(item, dict):
-    #                     continue
-    #
-    #                 # 增强默认值处理
-    #                 safe_item = {
-    #                     "title": item.get("title") or "Latest Market News",
-    #                     "link": item.get("link") or "#",
-    #                     "publisher": item.get("publisher") or "Financial News",
-    #                     "timestamp": item.get("providerPublishTime") or 0
-    #                 }
-    #
-    #                 # 添加链接有效性检查
-    #                 if safe_item["link"] == "#" and safe_item["title"] == "Latest Market News":
-    #                     continue  # 跳过无效条目
-    #
-    #                 if not any(n["link"] == safe_item["link"] for n in news_list):
-    #                     news_list.append(safe_item)
-    #
-    #                 if len(news_list) >= max_news:
-    #                     break
-    #
-    #         news_list.sort(key=lambda x: x["timestamp"], reverse=True)
-    #
-    #         # 保证至少返回示例新闻
-    #         if not news_list:
-    #             return [{
-    #                 "title": "Market Update: Stocks Show Mixed Trends",
-    #                 "link": "#",
-    #                 "publisher": "SimplyStocks",
-    #                 "timestamp": 0
-    #             }]
-    #
-    #     except Exception as e:
-    #         print(f"News Error: {str(e)}")
-    #
-    #     return news_list[:max_news]
+    # headlines are ingested in the background; pages only read the store
+    news_store = NewsStore()
+
+    def ingest_news():
+        # one worker per interval fetches upstream and publishes the feeds; every worker reads them back
+        interval = schedule.refresh_interval("news")
+        if cache.add("news:ingesting", os.getpid(), timeout=interval):
+            tickers = sorted(set(STOCK_TICKERS) |
+                             {ticker for ticker, in db.session.query(Portfolio.ticker).distinct()})
+            feeds = {ticker: items for ticker, items in (cache.get("news:feeds") or {}).items()
+                     if ticker in tickers}
+            for batch in market_data.news_batches(tickers):
+                feeds.update(batch)
+                cache.set("news:feeds", feeds, timeout=0)
+        return ingest(news_store, cache.get("news:feeds") or {})
+
+    news_refresher = Refresher(
+        ingest_news,
+        interval=lambda: schedule.refresh_interval("news"),
+        default=0,
+        app=app
+    )
+    app.extensions['news'] = news_refresher
+
+    def get_news(tickers=STOCK_TICKERS, max_news=5):
+        news_refresher.start()
+        return news_store.latest(tickers, max_news)
+
+    # sections shared by every visitor are rendered once per data version
+    fragment_cache = FragmentCache(cache)
+
+    def shared_fragments(market_indices, news, default_stock_data=None):
+        fragments = {
+            "market_indices": fragment_cache.render("fragments/market_indices.html", market_indices=market_indices),
+            "news": fragment_cache.render("fragments/news.html", news=news),
+        }
+        if default_stock_data is not None:
+            fragments["default_stocks"] = fragment_cache.render("fragments/default_stocks.html",
+                                                                default_stock_data=default_stock_data)
+        return fragments
 
     @app.route('/')
     def index():
@@ -188,29 +279,27 @@ def register_routes(app):
         core_data = get_core_data()
 
         # divide news and data
-        stock_tickers = ["AAPL", "GOOGL", "MSFT", "TSLA", "AMZN"]
         index_tickers = {"^DJI": "DJI", "^IXIC": "IXIC", "^GSPC": "^GSPC"}
         user_stock_data = {}
-        default_stock_data = {}
+        default_stock_data = core_data["stocks"]
+        news_tickers = STOCK_TICKERS
 
-        market_indices = {name: core_data.get(ticker) for ticker, name in index_tickers.items()}
+        market_indices = get_market_indices(core_data, index_tickers)
 
         if current_user.is_authenticated:
             user_tickers = [entry.ticker for entry in current_user.portfolios]
-            user_stock_data = get_stock_data(user_tickers)
-            remaining_tickers = [ticker for ticker in stock_tickers if ticker not in user_tickers]
-            default_stock_data = get_stock_data(remaining_tickers)
-        else:
-            default_stock_data = get_stock_data(stock_tickers)
+            if user_tickers:
+                user_stock_data = get_stock_data(user_tickers)
+                news_tickers = user_tickers
+            default_stock_data = {ticker: data for ticker, data in default_stock_data.items()
+                                  if ticker not in user_tickers}
 
-        news = get_news()
+        news = get_news(news_tickers)
 
         return render_template(
             "index.html",
             user_stock_data=user_stock_data,
-            default_stock_data=default_stock_data,
-            market_indices=market_indices,
-            news=news
+            fragments=shared_fragments(market_indices, news, default_stock_data)
         )
 
     # search
@@ -232,14 +321,13 @@ def register_routes(app):
 
             core_data = get_core_data()
             index_tickers = {"^DJI": "Dow Jones", "^IXIC": "NASDAQ", "^GSPC": "S&P 500"}
-            market_indices = {name: core_data.get(ticker) for ticker, name in index_tickers.items()}
+            market_indices = get_market_indices(core_data, index_tickers)
             news = get_news()
 
             return render_template(
                 "index.html",
                 stock_data=stock_data,
-                market_indices=market_indices,
-                news=news,
+                fragments=shared_fragments(market_indices, news),
                 searched_ticker=raw_ticker
             )
         except Exception as e:
@@ -288,7 +376,13 @@ def register_routes(app):
     @app.route('/dashboard')
     @login_required
     def dashboard():
-        return render_template('dashboard.html', user=current_user)
+        analytics = get_portfolio_analytics(current_user) if current_user.portfolios else None
+        return render_template('dashboard.html', user=current_user, analytics=analytics)
+
+    @app.route('/api/portfolio/analytics')
+    @login_required
+    def portfolio_analytics_api():
+        return jsonify(get_portfolio_analytics(current_user))
 
 
       
@@ -309,18 +403,17 @@ def register_routes(app):
     def add_to_portfolio():
         ticker = request.form.get('ticker').upper().strip()
 
-        if not yf.Ticker(ticker).info:
+        if ticker not in symbol_validator:
             flash(f"Valid Stock Code: {ticker}", "danger")
             return redirect(url_for('dashboard'))
 
-        existing = Portfolio.query.filter_by(user_id=current_user.id, ticker=ticker).first()
-        if existing:
+        quantity = max(request.form.get('quantity', 0, type=int), 0)
+        inserted = insert_ignore(Portfolio, [{"user_id": current_user.id, "ticker": ticker, "quantity": quantity}])
+        db.session.commit()
+        if not inserted:
             flash(f"{ticker} Already in Your Portfolio List", "warning")
             return redirect(url_for('dashboard'))
 
-        new_entry = Portfolio(user_id=current_user.id, ticker=ticker)
-        db.session.add(new_entry)
-        db.session.commit()
         flash(f"{ticker} has been added in Your List", "success")
         return redirect(url_for('dashboard'))
 
@@ -329,35 +422,125 @@ def register_routes(app):
         ticker = request.form.get('ticker', '').upper().strip()
         if not ticker:
             return "Error: No ticker provided", 400
+        if not is_valid_ticker(ticker):
+            return "Error: Invalid ticker", 400
 
-        company = yf.Ticker(ticker)
         try:
-            income_stmt = company.income_stmt.fillna(0).astype(float).T.to_dict(orient='split')
-            balance_sheet = company.balance_sheet.fillna(0).astype(float).T.to_dict(orient='split')
-            cashflow_stmt = company.cashflow.fillna(0).astype(float).T.to_dict(orient='split')
-            tenk_data = company.financials.fillna(0).astype(float).T.to_dict(orient='split')
+            company = statements_store.get(ticker)
+            income_stmt = company["income_stmt"]
+            balance_sheet = company["balance_sheet"]
+            cashflow_stmt = company["cashflow"]
+            tenk_data = company["financials"]
         except Exception as e:
             print("Error fetching data:", str(e))
             flash("Failed to fetch financial data.", "error")
             return redirect(url_for('index'))
         return render_template("financials.html", ticker=ticker, income_statement=income_stmt, balance_sheet=balance_sheet, cashflow_statement=cashflow_stmt, tenk_data=tenk_data)
 
+    range_intervals = {"1d": "1m", "6mo": "1d", "1y": "1d", "2y": "1d"}
+
+    def series_response(ticker, interval, etag, build):
+        # shared by the chart endpoints: weak ETag, gzip and a max-age matched to the bar size
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        else:
+            body, encoding = json_body(build(), request.headers.get('Accept-Encoding'))
+            response = Response(body, mimetype='application/json')
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+        response.set_etag(etag, weak=True)
+        if ohlcv_store.is_stale(ticker, interval):
+            # served from the store after a failed refresh; let clients retry soon
+            response.headers['Warning'] = '110 - "Response is Stale"'
+            response.headers['Cache-Control'] = "public, max-age=5"
+        else:
+            response.headers['Cache-Control'] = f"public, max-age={MAX_AGE.get(interval, 60)}"
+        response.vary.add('Accept-Encoding')
+        return response
+
     @app.route('/api/stock-price/<ticker>')
     def get_stock_price(ticker):
         range_option = request.args.get("range", "1d")
-        interval_map = {"1d": "1m", "6mo": "1d", "1y": "1d", "2y": "1d"}
-        interval = interval_map.get(range_option, "1d")
+        interval = range_intervals.get(range_option, "1d")
 
+        ticker = ticker.upper()
+        if not is_valid_ticker(ticker):
+            return jsonify({"error": "Invalid symbol"}), 400
         try:
-            stock = yf.Ticker(ticker.upper())
-            hist = stock.history(period=range_option, interval=interval)
-            data = {
-                "times": hist.index.strftime("%Y-%m-%d" if interval != "1m" else "%H:%M").tolist(),
-                "prices": hist["Close"].fillna("").tolist()
-            }
-            return jsonify(data)
+            bars = ohlcv_store.get(ticker, period=range_option, interval=interval)
+        except Exception as e:
+            # nothing stored to fall back on
+            return jsonify({"error": str(e)}), 503
+
+        return series_response(ticker, interval, series_etag(ticker, range_option, bars),
+                               lambda: encode_series(bars, interval, MAX_POINTS.get(range_option)))
+
+    indicator_cache = IndicatorCache()
+    # load one range further back so the first plotted averages are already warmed up
+    indicator_history = {"1d": "5d", "6mo": "1y", "1y": "2y", "2y": "5y"}
+
+    @app.route('/api/indicators/<ticker>')
+    def get_indicators(ticker):
+        range_option = request.args.get("range", "6mo")
+        interval = range_intervals.get(range_option, "1d")
+        include = [group for group in request.args.get("include", "").split(",") if group] or list(GROUPS)
+        if any(group not in GROUPS for group in include):
+            return jsonify({"error": f"include must be drawn from {', '.join(GROUPS)}"}), 400
+
+        ticker = ticker.upper()
+        if not is_valid_ticker(ticker):
+            return jsonify({"error": "Invalid symbol"}), 400
+        try:
+            array, meta = ohlcv_store.sync(ticker, indicator_history.get(range_option, "1y"), interval)
         except Exception as e:
-            return jsonify({"error": str(e)}), 500
+            return jsonify({"error": str(e)}), 503
+
+        series = series_from_array(array, meta["tz"])
+        state = indicator_cache.get((ticker, interval), series, intraday=interval in INTERVAL_MINUTES)
+        row = ohlcv_store.window_start(array, meta, range_option, interval)
+        start = int(series.ts.searchsorted(array[row, 0])) if row < len(array) else len(series.ts)
+
+        def build():
+            index = decimate_index(len(series.ts) - start, MAX_POINTS.get(range_option))
+            names = [name for group in include for name in GROUPS[group]]
+            data = encode_indicators(series.ts, state, start, index, names)
+            data.update(tz=meta["tz"], interval=interval)
+            return data
+
+        etag = series_etag(ticker, f"indicators:{range_option}:{','.join(include)}", series)
+        return series_response(ticker, interval, etag, build)
+
+    stream_slots = threading.BoundedSemaphore(app.config['STREAM_MAX_CLIENTS'])
+
+    @app.route('/api/stream/<ticker>')
+    def stream_quotes(ticker):
+        ticker = ticker.upper()
+        if not is_valid_ticker(ticker):
+            return jsonify({"error": "Invalid symbol"}), 400
+        # leave the rest of the worker's threads to ordinary requests
+        if not stream_slots.acquire(blocking=False):
+            response = jsonify({"error": "Too many live streams"})
+            response.headers['Retry-After'] = '30'
+            return response, 503
+        response = Response(
+            quote_hub.stream(ticker, heartbeat=app.config['STREAM_HEARTBEAT'], lifetime=app.config['STREAM_MAX_AGE']),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+        # runs when the server closes the response, even if the stream never started
+        response.call_on_close(stream_slots.release)
+        return response
+
+    @app.route('/portfolio/<int:portfolio_id>/quantity', methods=['POST'])
+    @login_required
+    def update_quantity(portfolio_id):
+        entry = Portfolio.query.get_or_404(portfolio_id)
+        if entry.user_id != current_user.id:
+            abort(403)
+        entry.quantity = max(request.form.get('quantity', 0, type=int), 0)
+        db.session.commit()
+        flash(f"{entry.ticker} quantity updated", "success")
+        return redirect(url_for('dashboard'))
 
     @app.route('/remove_from_portfolio/<int:portfolio_id>', methods=['POST'])
     @login_required
@@ -370,6 +553,47 @@ def register_routes(app):
         flash("Stock has been moved", "success")
         return redirect(url_for('dashboard'))
 
+    bulk_models = {'portfolio': Portfolio, 'watchlist': WatchlistEntry}
+    bulk_pages = {'portfolio': 'dashboard', 'watchlist': 'watchlist'}
+
+    @app.route('/<any(portfolio, watchlist):kind>/import', methods=['POST'])
+    @login_required
+    def bulk_import(kind):
+        # a form upload arrives as a file; API clients can also post the raw CSV/JSON body
+        upload = request.files.get('file')
+        stream = upload.stream if upload else request.stream
+        filename = upload.filename if upload else ''
+        fmt = request.args.get('format') or (
+            'json' if filename.endswith(('.json', '.jsonl')) or request.mimetype.endswith(('json', 'ndjson'))
+            else 'csv')
+        if fmt not in PARSERS:
+            abort(400)
+        try:
+            summary = import_rows(bulk_models[kind], current_user.id, PARSERS[fmt](stream), symbol_validator)
+            db.session.commit()
+        except (UploadError, UnicodeDecodeError, csv.Error) as e:
+            db.session.rollback()
+            summary = {"error": str(e)}
+        if upload and request.accept_mimetypes.best == 'text/html':
+            if "error" in summary:
+                flash(f"Import failed: {summary['error']}", "danger")
+            else:
+                flash(f"Imported {summary['added']} of {summary['rows']} rows "
+                      f"({summary['existing']} already held, {summary['invalid']} invalid)", "success")
+            return redirect(url_for(bulk_pages[kind]))
+        return jsonify(summary), 400 if "error" in summary else 200
+
+    @app.route('/<any(portfolio, watchlist):kind>/export')
+    @login_required
+    def bulk_export(kind):
+        fmt = request.args.get('format', 'csv')
+        if fmt not in PARSERS:
+            abort(400)
+        rows = export_rows(bulk_models[kind], current_user.id, fmt)
+        response = Response(stream_with_context(rows), mimetype='text/csv' if fmt == 'csv' else 'application/json')
+        response.headers['Content-Disposition'] = f'attachment; filename={kind}.{fmt}'
+        return response
+
     @app.route('/analysis', methods=['GET', 'POST'])
     def analysis():
         if request.method == 'POST':
@@ -377,29 +601,20 @@ def register_routes(app):
             if not ticker:
                 return "Ticker required", 400
 
-            stock = yf.Ticker(ticker)
-            info = stock.info
-            name = info.get("longName", ticker)
-            price = info.get("currentPrice")
-            change = info.get("regularMarketChangePercent")
-            pe = info.get("trailingPE")
-            eps = info.get("trailingEps")
-            dividend = info.get("dividendRate")
-            growth_rate = info.get("earningsGrowth") or 0.05
-
-            lynch_value = round(eps * growth_rate * 22.5, 2) if eps and eps > 0 else None
-            ddm_value = round(dividend / (0.08 - 0.05), 2) if dividend else None
-
-            dcf_value = None
-            fcf = info.get("freeCashflow")
-            if fcf and fcf > 0:
-                discount_rate = 0.08
-                growth_rate = 0.05
-                years = 5
-                fcfs = [fcf * ((1 + growth_rate) ** year) / ((1 + discount_rate) ** year) for year in range(1, years + 1)]
-                terminal_value = (fcfs[-1] * (1 + growth_rate)) / (discount_rate - growth_rate)
-                discounted_tv = terminal_value / ((1 + discount_rate) ** years)
-                dcf_value = round(sum(fcfs) + discounted_tv, 2)
+            fundamentals = fundamentals_cache.get_quotes([ticker]).get(ticker, {})
+            quote = quote_cache.get_quotes([ticker]).get(ticker, {})
+            name = fundamentals.get("long_name", ticker)
+            price = quote.get("price")
+            change = quote.get("change_percent")
+            pe = fundamentals.get("pe")
+            eps = fundamentals.get("eps")
+            dividend = fundamentals.get("dividend")
+            growth_rate = fundamentals.get("growth") or DEFAULT_GROWTH
+
+            values = valuations([fundamentals])
+            lynch_value = to_json(values["lynch"])[0]
+            ddm_value = to_json(values["ddm"])[0][0][0]
+            dcf_value = to_json(values["dcf"])[0][0][0]
 
             return render_template(
                 'analysis.html', ticker=ticker, name=name, price=price, change=change,
@@ -409,46 +624,187 @@ def register_routes(app):
 
         return render_template('analysis.html')
 
+    @app.route('/api/valuation', methods=['POST'])
+    def valuation_api():
+        payload = request.get_json(silent=True) or {}
+        if not isinstance(payload, dict):
+            return jsonify({"error": "Expected a JSON object"}), 400
+        fields = {
+            'tickers': payload.get('tickers', []),
+            'discount_rates': payload.get('discount_rates', [DEFAULT_DISCOUNT_RATE]),
+            'growth_rates': payload.get('growth_rates', [DEFAULT_GROWTH]),
+        }
+        # a bare string would otherwise be read one character at a time
+        for name, value in fields.items():
+            if not isinstance(value, list):
+                return jsonify({"error": f"{name} must be a list"}), 400
+        tickers = [str(ticker).upper().strip() for ticker in fields['tickers']]
+        tickers = list(dict.fromkeys(ticker for ticker in tickers if is_valid_ticker(ticker)))
+        try:
+            discount_rates = [float(rate) for rate in fields['discount_rates']]
+            growth_rates = [float(rate) for rate in fields['growth_rates']]
+        except (TypeError, ValueError):
+            return jsonify({"error": "Rates must be numbers"}), 400
+        years = payload.get('years', DEFAULT_YEARS)
+        if isinstance(years, float) and years.is_integer():
+            years = int(years)
+        if not isinstance(years, int) or isinstance(years, bool):
+            return jsonify({"error": "years must be a whole number"}), 400
+        # NaN/inf would not survive JSON, and a rate of -100% divides by zero
+        if not all(math.isfinite(rate) and rate > -1 for rate in discount_rates + growth_rates):
+            return jsonify({"error": "Rates must be finite and greater than -1"}), 400
+        if not tickers or len(tickers) > 500:
+            return jsonify({"error": "Provide between 1 and 500 valid tickers"}), 400
+        if not discount_rates or not growth_rates or len(discount_rates) * len(growth_rates) > 400 \
+                or not 1 <= years <= 30:
+            return jsonify({"error": "Invalid rate grid"}), 400
+
+        fundamentals = fundamentals_cache.get_quotes(tickers)
+        found = [ticker for ticker in tickers if ticker in fundamentals]
+        values = valuations([fundamentals[ticker] for ticker in found], discount_rates, growth_rates, years)
+        lynch, ddm, dcf = (to_json(values[model]) for model in ("lynch", "ddm", "dcf"))
+        return jsonify({
+            "assumptions": {"discount_rates": discount_rates, "growth_rates": growth_rates, "years": years},
+            "results": {
+                ticker: {"lynch": lynch[i], "ddm": ddm[i], "dcf": dcf[i]} for i, ticker in enumerate(found)
+            },
+            "missing": [ticker for ticker in tickers if ticker not in fundamentals]
+        })
+
     @app.route('/watchlist', methods=['GET', 'POST'])
+    @login_required
     def watchlist():
-        tickers = load_watchlist()
-
         if request.method == 'POST':
             ticker = request.form.get('ticker', '').upper().strip()
             if not ticker:
                 flash('Please enter a ticker symbol', 'error')
+            elif ticker not in symbol_validator:
+                flash(f'Problem fetching data for {ticker}.', 'error')
             else:
-                data = fetch_stockdata(ticker)
-                if data:
-                    if ticker not in tickers:
-                        tickers.append(ticker)
-                        save_watchlist(tickers)
-                        flash(f'{ticker} added.', 'success')
-                    else:
-                        flash(f'{ticker} already in list.', 'info')
+                added = insert_ignore(WatchlistEntry, [{"user_id": current_user.id, "ticker": ticker}])
+                db.session.commit()
+                if added:
+                    flash(f'{ticker} added.', 'success')
                 else:
-                    flash(f'Problem fetching data for {ticker}.', 'error')
+                    flash(f'{ticker} already in list.', 'info')
             return redirect(url_for('watchlist'))
 
-        stocks_data = []
-        for ticker in tickers:
-            data = fetch_stockdata(ticker)
-            if data:
-                stocks_data.append(data)
+        tickers = [ticker for (ticker,) in db.session.query(WatchlistEntry.ticker)
+                   .filter_by(user_id=current_user.id).order_by(WatchlistEntry.added_at)]
+        with span("fetch_stockdata"):
+            quotes = fetch_stockdata(tickers, quote_cache)
+        stocks_data = [quotes[ticker] for ticker in tickers if ticker in quotes]
 
         return render_template('watchlist.html', stocks=stocks_data)
 
     @app.route('/remove/<ticker>')
+    @login_required
     def remove(ticker):
-        tickers = load_watchlist()
-        if ticker in tickers:
-            tickers.remove(ticker)
-            save_watchlist(tickers)
+        removed = WatchlistEntry.query.filter_by(user_id=current_user.id, ticker=ticker).delete()
+        db.session.commit()
+        if removed:
             flash(f'{ticker} removed.', 'success')
         else:
             flash(f'{ticker} not found in the list.', 'error')
         return redirect(url_for('watchlist'))
 
+    # thresholds are evaluated in bulk by `flask run-alerts`, never per page view
+    alert_sink = LocalSink()
+    alert_engine = AlertEngine(quote_cache.get_quotes, alert_sink)
+    app.extensions['alerts'] = alert_engine
+
+    @app.route('/api/alerts')
+    @login_required
+    def list_alerts():
+        alerts = PriceAlert.query.filter_by(user_id=current_user.id).order_by(PriceAlert.created_at).all()
+        return jsonify([alert_json(alert) for alert in alerts])
+
+    @app.route('/api/alerts', methods=['POST'])
+    @login_required
+    def create_alert():
+        data = request.get_json(silent=True) or request.form
+        if not isinstance(data, dict):
+            return jsonify({"error": "Expected a JSON object"}), 400
+        ticker = str(data.get('ticker', '')).upper().strip()
+        kind = data.get('kind')
+        try:
+            threshold = float(data.get('threshold'))
+        except (TypeError, ValueError):
+            return jsonify({"error": "Threshold must be a number"}), 400
+        if kind not in KINDS:
+            return jsonify({"error": f"Kind must be one of {', '.join(KINDS)}"}), 400
+        if not threshold > 0:
+            return jsonify({"error": "Threshold must be positive"}), 400
+        # alerts are only offered on tickers the user already follows
+        held = db.session.query(
+            Portfolio.query.filter_by(user_id=current_user.id, ticker=ticker).exists() |
+            WatchlistEntry.query.filter_by(user_id=current_user.id, ticker=ticker).exists()).scalar()
+        if not held:
+            return jsonify({"error": f"{ticker} is not in your portfolio or watchlist"}), 400
+        alert = PriceAlert(user_id=current_user.id, ticker=ticker, kind=kind, threshold=threshold)
+        db.session.add(alert)
+        db.session.commit()
+        return jsonify(alert_json(alert)), 201
+
+    @app.route('/api/alerts/<int:alert_id>', methods=['DELETE'])
+    @login_required
+    def delete_alert(alert_id):
+        removed = PriceAlert.query.filter_by(id=alert_id, user_id=current_user.id).delete()
+        db.session.commit()
+        if not removed:
+            abort(404)
+        return '', 204
+
+    @app.route('/api/symbols')
+    def symbol_search():
+        limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+        response = jsonify(symbol_index.search(request.args.get('q', ''), limit))
+        response.headers['Cache-Control'] = 'public, max-age=3600'
+        return response
+
+    @app.cli.command('init-db')
+    def init_db():
+        """Create missing tables and indexes; run once per deploy before starting workers."""
+        db.create_all()
+        for name in upgrade_schema():
+            click.echo(f"Created index {name}")
+        click.echo(f"Database schema ready at {db.engine.url.render_as_string(hide_password=True)}")
+
+    @app.cli.command('run-alerts')
+    @click.option('--once', is_flag=True, help='Evaluate a single tick and exit.')
+    def run_alerts(once):
+        """Evaluate every active price alert, once per quote refresh interval."""
+        while True:
+            fired = alert_engine.tick()
+            click.echo(f"{len(fired)} alerts triggered")
+            if once:
+                break
+            time.sleep(schedule.refresh_interval("quote"))
+
+    @app.cli.command('refresh-symbols')
+    def refresh_symbols():
+        """Download the current US symbol directory into the instance folder."""
+        rows = download_symbols()
+        # the directory only lists securities; keep the bundled index symbols
+        bundled = SymbolIndex.from_csv(BUNDLED)
+        indices = [(symbol, *bundled.entries[symbol]) for symbol in bundled.symbols if symbol.startswith('^')]
+        write_symbols(refreshed_symbols, rows + indices)
+        click.echo(f"Wrote {len(rows) + len(indices)} symbols to {refreshed_symbols}; restart to load them")
+
+    @app.cli.command('import-watchlist')
+    @click.argument('username')
+    @click.argument('path', default='watchlist.json')
+    def import_watchlist(username, path):
+        """Copy the old shared watchlist.json into USERNAME's watchlist."""
+        user = User.query.filter_by(username=username).first()
+        if user is None:
+            raise click.ClickException(f"No user named {username}")
+        tickers = [ticker.upper() for ticker in load_watchlist(path) if is_valid_ticker(ticker.upper())]
+        added = insert_ignore(WatchlistEntry, [{"user_id": user.id, "ticker": ticker} for ticker in tickers]) \
+            if tickers else 0
+        db.session.commit()
+        click.echo(f"Imported {added} of {len(tickers)} tickers for {username}")
+
       
 if __name__ == '__main__':
     app = create_app()
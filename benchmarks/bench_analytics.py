@@ -0,0 +1,41 @@
+"""Time the portfolio analytics engine for growing position counts.
+
+    python -m benchmarks.bench_analytics --positions 10 100 500
+
+Closes come from the deterministic fixture provider, so the run is
+offline and repeatable. Prints one JSON line per portfolio size.
+"""
+import argparse
+import json
+import time
+
+from analytics import portfolio_analytics
+from providers import FixtureProvider
+
+
+def run(positions, repeat):
+    provider = FixtureProvider()
+    tickers = [f"T{i:04d}" for i in range(positions)]
+    closes = provider.get_closes(tickers + ["^GSPC"], period="1y")
+    holdings = {ticker: i + 1 for i, ticker in enumerate(tickers)}
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        portfolio_analytics(holdings, closes)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return {"positions": positions, "best_ms": round(timings[0] * 1000, 3),
+            "median_ms": round(timings[len(timings) // 2] * 1000, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--positions", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    for positions in args.positions:
+        print(json.dumps(run(positions, args.repeat)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""Load the main pages against the offline fixture backend.
+
+    python -m benchmarks.bench_routes --concurrency 1 8 32 --portfolio 0 10 50 \\
+        --latency 0.05 --requests 200 --output results.jsonl
+
+Builds the app with ``MARKET_DATA_PROVIDER = 'fixture'`` (optionally
+replaying ``--fixture`` and sleeping ``--latency`` seconds per upstream
+call), logs in a user holding ``--portfolio`` tickers in both portfolio
+and watchlist, and fires ``--requests`` requests per route at each
+concurrency level after one warm-up request. The chart routes cover the
+ranges the page asks for, so the intraday 1d/1m path is measured too.
+
+Before that warm pass, a cold pass sends ``concurrency`` simultaneous
+requests to an app started in a fresh interpreter with an empty cache and
+bar store and numpy/pandas not yet loaded, which is where first-use races
+show up as errors. Prints one JSON line per (route, portfolio size,
+concurrency, pass) with p50/p99 latency and throughput; ``--baseline``
+compares against an earlier run's output.
+"""
+import argparse
+import json
+import os
+import queue
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import STOCK_TICKERS, create_app
+from models import Portfolio, User, WatchlistEntry, db, insert_ignore
+
+
+ROUTES = {
+    "index": ("GET", "/", None),
+    "search": ("GET", "/search?ticker=AAPL", None),
+    "watchlist": ("GET", "/watchlist", None),
+    "company": ("POST", "/company", {"ticker": "AAPL"}),
+    "analysis": ("POST", "/analysis", {"ticker": "MSFT"}),
+    "chart_1d": ("GET", "/api/stock-price/AAPL?range=1d", None),
+    "chart_6mo": ("GET", "/api/stock-price/AAPL?range=6mo", None),
+    "chart_2y": ("GET", "/api/stock-price/AAPL?range=2y", None),
+}
+PASSES = ("cold", "warm")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COLD_PROBE = """
+import json, sys
+from benchmarks.bench_routes import cold_probe
+print(json.dumps(cold_probe(sys.argv[1], sys.argv[2], int(sys.argv[3]), int(sys.argv[4]),
+                            float(sys.argv[5]), sys.argv[6] or None)))
+"""
+
+USERNAME = "bench"
+PASSWORD = "BenchPass123"
+
+
+def commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def portfolio_tickers(size):
+    # the fixture backend synthesizes a deterministic series for any symbol
+    extra = [f"BM{i:03d}" for i in range(max(0, size - len(STOCK_TICKERS)))]
+    return (STOCK_TICKERS + extra)[:size]
+
+
+def build_app(workdir, latency, fixture):
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///" + os.path.join(workdir, "bench.db"),
+        "CACHE_DIR": workdir,
+        "OHLCV_STORE_DIR": os.path.join(workdir, "ohlcv"),
+        "MARKET_DATA_PROVIDER": "fixture",
+        "MARKET_DATA_FIXTURE": fixture,
+        "MARKET_DATA_LATENCY": latency,
+        "MARKET_DATA_RATE_LIMIT": None,
+    })
+    with app.app_context():
+        db.create_all()
+    with app.test_client() as client:
+        client.post("/register", data={"username": USERNAME, "email": "bench@example.com",
+                                       "password": PASSWORD})
+    return app
+
+
+def set_portfolio(app, size):
+    with app.app_context():
+        user = User.query.filter_by(username=USERNAME).first()
+        Portfolio.query.filter_by(user_id=user.id).delete()
+        WatchlistEntry.query.filter_by(user_id=user.id).delete()
+        rows = [{"user_id": user.id, "ticker": ticker} for ticker in portfolio_tickers(size)]
+        if rows:
+            insert_ignore(Portfolio, [dict(row, quantity=10) for row in rows])
+            insert_ignore(WatchlistEntry, rows)
+        db.session.commit()
+
+
+def logged_in_clients(app, count):
+    clients = queue.Queue()
+    for _ in range(count):
+        client = app.test_client()
+        client.post("/login", data={"username": USERNAME, "password": PASSWORD})
+        clients.put(client)
+    return clients
+
+
+def send(client, route):
+    method, path, data = ROUTES[route]
+    if method == "POST":
+        return client.post(path, data=data)
+    return client.get(path)
+
+
+def timed(client, route):
+    started = time.perf_counter()
+    try:
+        ok = send(client, route).status_code < 400
+    except Exception:
+        # TESTING lets view errors propagate; they count like a 500
+        ok = False
+    return time.perf_counter() - started, ok
+
+
+def percentile(values, q):
+    # linear interpolation between closest ranks, as numpy.percentile does
+    values = sorted(values)
+    position = (len(values) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+def summarize(results, elapsed):
+    latencies = [latency * 1000 for latency, _ in results]
+    return {
+        "requests": len(results),
+        "errors": sum(not ok for _, ok in results),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "throughput_rps": round(len(results) / elapsed, 2),
+    }
+
+
+def measure(app, route, concurrency, requests):
+    clients = logged_in_clients(app, concurrency)
+
+    def one(_):
+        client = clients.get()
+        try:
+            return timed(client, route)
+        finally:
+            clients.put(client)
+
+    one(None)  # warm-up, so every level measures the steady state
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(requests)))
+    return summarize(results, time.perf_counter() - started)
+
+
+def cold_probe(workdir, route, size, concurrency, latency, fixture):
+    """Runs in a fresh interpreter: ``concurrency`` first requests released at once."""
+    app = build_app(workdir, latency, fixture)
+    set_portfolio(app, size)
+    clients = logged_in_clients(app, concurrency)
+    barrier = threading.Barrier(concurrency)
+
+    def one(_):
+        client = clients.get()
+        barrier.wait()
+        return timed(client, route)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(concurrency)))
+    return {"results": results, "elapsed": time.perf_counter() - started}
+
+
+def measure_cold(route, size, concurrency, latency, fixture):
+    with tempfile.TemporaryDirectory() as workdir:
+        probe = subprocess.run(
+            [sys.executable, "-c", COLD_PROBE, workdir, route, str(size), str(concurrency), str(latency),
+             fixture or ""], cwd=ROOT, capture_output=True, text=True, check=True)
+    cold = json.loads(probe.stdout.strip().splitlines()[-1])
+    return summarize(cold["results"], cold["elapsed"])
+
+
+def run(routes, concurrency, portfolio, requests, latency, fixture=None, passes=PASSES):
+    revision = commit()
+    with tempfile.TemporaryDirectory() as workdir:
+        app = build_app(workdir, latency, fixture)
+        for size in portfolio:
+            set_portfolio(app, size)
+            for route in routes:
+                for level in concurrency:
+                    for name in passes:
+                        result = {"commit": revision, "route": route, "portfolio": size,
+                                  "concurrency": level, "latency": latency, "pass": name}
+                        if name == "cold":
+                            result.update(measure_cold(route, size, level, latency, fixture))
+                        else:
+                            result.update(measure(app, route, level, requests))
+                        yield result
+
+
+def key(result):
+    # rows from before the cold pass existed were all warm
+    return result["route"], result["portfolio"], result["concurrency"], result.get("pass", "warm")
+
+
+def compare(result, baseline):
+    before = baseline.get(key(result))
+    if before:
+        result["p50_change"] = round(result["p50_ms"] / before["p50_ms"] - 1, 4) if before["p50_ms"] else None
+        result["p99_change"] = round(result["p99_ms"] / before["p99_ms"] - 1, 4) if before["p99_ms"] else None
+        result["baseline_commit"] = before.get("commit")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--routes", nargs="+", choices=sorted(ROUTES), default=list(ROUTES))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--portfolio", type=int, nargs="+", default=[0, 10, 50])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--passes", nargs="+", choices=PASSES, default=list(PASSES),
+                        help="cold: simultaneous first requests in a fresh process; warm: steady state")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="seconds the stub sleeps per upstream call")
+    parser.add_argument("--fixture", help="recorded market data JSON to replay")
+    parser.add_argument("--output", help="also append the JSON lines to this file")
+    parser.add_argument("--baseline", help="JSON lines from an earlier run to compare against")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {key(row): row for row in (json.loads(line) for line in f if line.strip())}
+
+    output = open(args.output, "a") if args.output else None
+    try:
+        for result in run(args.routes, args.concurrency, args.portfolio, args.requests,
+                          args.latency, args.fixture, args.passes):
+            line = json.dumps(compare(result, baseline))
+            print(line, flush=True)
+            if output:
+                output.write(line + "\n")
+    finally:
+        if output:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
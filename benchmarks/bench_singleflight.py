@@ -0,0 +1,70 @@
+"""Fire N concurrent cold-cache quote requests at a stub provider.
+
+    python -m benchmarks.bench_singleflight --clients 50 --latency 0.2
+
+Reports how many upstream calls the burst caused and how long it took,
+with and without request coalescing.
+"""
+import argparse
+import json
+import threading
+import time
+
+from flask_caching.backends import SimpleCache
+
+from providers import FixtureProvider, MarketData
+from quote_cache import QuoteCache
+
+
+class CountingProvider(FixtureProvider):
+    def __init__(self, latency):
+        super().__init__(latency=latency)
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def get_quotes(self, tickers):
+        with self.lock:
+            self.calls += 1
+        return super().get_quotes(tickers)
+
+
+def run(clients, latency, coalesce):
+    class App:
+        config = {"MARKET_DATA_PROVIDER": "fixture", "MARKET_DATA_RATE_LIMIT": None}
+        extensions = {}
+
+    market_data = MarketData(App())
+    market_data.provider = provider = CountingProvider(latency)
+    if coalesce:
+        fetch = market_data.get_quotes
+    else:
+        fetch = lambda tickers: market_data._fetch("get_quotes", tuple(sorted(set(tickers))))
+    quotes = QuoteCache(SimpleCache(), fetch)
+
+    barrier = threading.Barrier(clients)
+
+    def client():
+        barrier.wait()
+        quotes.get_quotes(["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA"])
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {"coalesce": coalesce, "clients": clients, "upstream_calls": provider.calls,
+            "seconds": round(time.perf_counter() - started, 4)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+    for coalesce in (False, True):
+        print(json.dumps(run(args.clients, args.latency, coalesce)))
+
+
+if __name__ == "__main__":
+    main()
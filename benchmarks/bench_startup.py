@@ -0,0 +1,110 @@
+"""Time how long a fresh worker takes to become ready.
+
+    python -m benchmarks.bench_startup --runs 10 --output startup.jsonl
+
+Each run starts a new interpreter, so nothing is warm in ``sys.modules``,
+and records the time to ``import app``, to run ``create_app`` and to serve
+the first ``/`` against the offline fixture backend, plus whether numpy,
+pandas or yfinance were loaded before that first request. Prints one JSON
+line per phase with min/p50/max in milliseconds; ``--baseline`` compares
+against an earlier run's output.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.bench_routes import commit
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("numpy", "pandas", "yfinance")
+
+PROBE = """
+import json, os, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+instance = app.create_app({
+    "TESTING": True,
+    "SQLALCHEMY_DATABASE_URI": "sqlite:///" + os.path.join(sys.argv[1], "bench.db"),
+    "CACHE_DIR": sys.argv[1],
+    "OHLCV_STORE_DIR": os.path.join(sys.argv[1], "ohlcv"),
+    "MARKET_DATA_PROVIDER": "fixture",
+    "MARKET_DATA_RATE_LIMIT": None,
+})
+created = time.perf_counter()
+# lazily bound modules only reach sys.modules once an attribute is read
+heavy = [name for name in %r if name in sys.modules]
+with instance.app_context():
+    app.db.create_all()
+ready = time.perf_counter()
+instance.test_client().get("/")
+served = time.perf_counter()
+print(json.dumps({"import": imported - started, "create_app": created - imported,
+                  "first_request": served - ready, "heavy": heavy}))
+""" % (HEAVY,)
+
+
+def probe(workdir):
+    result = subprocess.run([sys.executable, "-c", PROBE, workdir], cwd=ROOT, capture_output=True,
+                            text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run(runs):
+    samples = []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as workdir:
+            samples.append(probe(workdir))
+    revision = commit()
+    for phase in ("import", "create_app", "first_request"):
+        values = sorted(sample[phase] * 1000 for sample in samples)
+        yield {
+            "commit": revision,
+            "phase": phase,
+            "runs": runs,
+            "min_ms": round(values[0], 3),
+            "p50_ms": round(statistics.median(values), 3),
+            "max_ms": round(values[-1], 3),
+            "heavy_imports": sorted({name for sample in samples for name in sample["heavy"]}),
+        }
+
+
+def compare(result, baseline):
+    before = baseline.get(result["phase"])
+    if before and before["p50_ms"]:
+        result["p50_change"] = round(result["p50_ms"] / before["p50_ms"] - 1, 4)
+        result["baseline_commit"] = before.get("commit")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--output", help="also append the JSON lines to this file")
+    parser.add_argument("--baseline", help="JSON lines from an earlier run to compare against")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {row["phase"]: row for row in (json.loads(line) for line in f if line.strip())}
+
+    output = open(args.output, "a") if args.output else None
+    try:
+        for result in run(args.runs):
+            line = json.dumps(compare(result, baseline))
+            print(line, flush=True)
+            if output:
+                output.write(line + "\n")
+    finally:
+        if output:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Time the batch valuation models for a screen of many tickers.
+
+    python -m benchmarks.bench_valuation --tickers 200 --grid 5
+
+Fundamentals come from the fixture provider, as they would from the warm
+fundamentals cache, so this measures the model math alone.
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from providers import FixtureProvider
+from valuation import extract_fundamentals, valuations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickers", type=int, default=200)
+    parser.add_argument("--grid", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    provider = FixtureProvider()
+    fundamentals = [extract_fundamentals(f"T{i:04d}", provider.get_info(f"T{i:04d}")) for i in range(args.tickers)]
+    discount = np.linspace(0.06, 0.12, args.grid)
+    growth = np.linspace(0.01, 0.05, args.grid)
+    timings = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        valuations(fundamentals, discount, growth)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    print(json.dumps({"tickers": args.tickers, "grid": [args.grid, args.grid],
+                      "best_ms": round(timings[0] * 1000, 3),
+                      "median_ms": round(timings[len(timings) // 2] * 1000, 3)}))
+
+
+if __name__ == "__main__":
+    main()
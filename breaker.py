@@ -0,0 +1,65 @@
+import threading
+import time
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """Stops calling an upstream that keeps failing.
+
+    After ``threshold`` consecutive failures the circuit opens and calls are
+    refused without touching the upstream. Once the backoff has passed a
+    single probe call is let through: success closes the circuit, failure
+    re-opens it for twice as long, up to ``max_backoff``. Failures reported
+    while the circuit is open, by calls started before it opened, do not
+    extend the backoff.
+    """
+
+    def __init__(self, threshold=5, backoff=5, max_backoff=300, clock=time.monotonic):
+        self.threshold = threshold
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self.failures = 0
+        self.trips = 0
+        self.opened_until = 0.0
+        self.probing = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.failures < self.threshold:
+            return "closed"
+        return "open" if self.clock() < self.opened_until or self.probing else "half-open"
+
+    def retry_after(self):
+        return max(0.0, self.opened_until - self.clock())
+
+    def allow(self):
+        with self.lock:
+            if self.failures < self.threshold:
+                return True
+            if self.probing or self.clock() < self.opened_until:
+                return False
+            self.probing = True
+            return True
+
+    def success(self):
+        with self.lock:
+            self.failures = 0
+            self.trips = 0
+            self.probing = False
+
+    def failure(self):
+        with self.lock:
+            if self.failures >= self.threshold and not self.probing:
+                # calls that were already in flight when the circuit opened
+                return
+            self.failures += 1
+            self.probing = False
+            if self.failures >= self.threshold:
+                self.trips += 1
+                delay = min(self.max_backoff, self.backoff * 2 ** (self.trips - 1))
+                self.opened_until = self.clock() + delay
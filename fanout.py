@@ -0,0 +1,78 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+class FanOutResult:
+    def __init__(self):
+        self.results = {}
+        self.errors = {}
+
+    @property
+    def ok(self):
+        return not self.errors
+
+
+class PoolExhausted(RuntimeError):
+    pass
+
+
+class FanOut:
+    """Bounded thread pool for upstream calls that cannot be batched.
+
+    ``run`` takes a mapping of key -> zero-argument callable and returns a
+    FanOutResult with whatever succeeded; failures and calls not finished
+    ``timeout`` seconds after the batch was submitted are reported in
+    ``errors`` instead of failing the whole batch. At most ``max_workers``
+    calls are in flight at once across the process.
+
+    A timed-out call that has not started is cancelled. One that is already
+    running cannot be stopped and keeps its thread until the upstream
+    answers; it is counted in ``hung`` and reported to ``on_timeout``. While
+    every worker is hung, ``run`` fails at once with ``PoolExhausted``
+    rather than queueing behind them.
+    """
+
+    def __init__(self, max_workers=8, timeout=10, on_timeout=None):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.on_timeout = on_timeout
+        self.hung = 0
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fanout")
+
+    def _finished(self, future):
+        with self.lock:
+            self.hung -= 1
+
+    def run(self, calls, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        result = FanOutResult()
+        if self.hung >= self.max_workers:
+            for key in calls:
+                result.errors[key] = PoolExhausted(f"all {self.max_workers} workers are stuck on earlier calls")
+            return result
+
+        started = time.monotonic()
+        futures = {self.executor.submit(fn): key for key, fn in calls.items()}
+        done, pending = wait(futures, timeout=timeout)
+        for future in done:
+            key = futures[future]
+            try:
+                result.results[key] = future.result()
+            except Exception as e:
+                result.errors[key] = e
+        for future in pending:
+            key = futures[future]
+            result.errors[key] = TimeoutError(f"{key} timed out after {time.monotonic() - started:.1f}s")
+            if future.cancel():
+                continue
+            with self.lock:
+                self.hung += 1
+            future.add_done_callback(self._finished)
+            if self.on_timeout is not None:
+                self.on_timeout(key)
+        return result
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,42 @@
+import hashlib
+import json
+
+from flask import render_template
+from markupsafe import Markup
+
+from metrics import record_cache
+
+
+def data_version(data):
+    # content digest, so every worker agrees on the key without sharing state
+    encoded = json.dumps(data, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+class FragmentCache:
+    """Pre-rendered HTML for page sections that are the same for every visitor.
+
+    A fragment is stored under its template and the version of the data it
+    shows, so new data renders a new entry and nothing has to be
+    invalidated; old entries simply expire after ``timeout`` seconds.
+    Fragment templates must not read per-user context such as
+    ``current_user``.
+    """
+
+    def __init__(self, cache, prefix="fragment:", timeout=3600):
+        self.cache = cache
+        self.prefix = prefix
+        self.timeout = timeout
+
+    def render(self, template, version=None, **context):
+        if version is None:
+            version = data_version(context)
+        key = f"{self.prefix}{template}:{version}"
+        html = self.cache.get(key)
+        if html is not None:
+            record_cache("fragments", hits=1)
+            return Markup(html)
+        record_cache("fragments", misses=1)
+        html = render_template(template, **context)
+        self.cache.set(key, str(html), timeout=self.timeout)
+        return Markup(html)
@@ -0,0 +1,91 @@
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+
+from models import FinancialStatement, db, insert_ignore
+from providers import STATEMENTS
+from utils import format_large_number
+
+
+def serialize_statement(frame):
+    """Turn a statement frame into the compact payload the template renders.
+
+    Rows are fiscal periods (newest first), columns are line items, and every
+    cell is already formatted, so rendering needs neither pandas nor filters.
+    Returns ``(period_end, payload_json)`` or ``None`` for an empty frame.
+    """
+    if frame is None or frame.empty:
+        return None
+    table = frame.fillna(0).astype(float).T
+    periods = [period.strftime("%Y-%m-%d") if hasattr(period, "strftime") else str(period)
+               for period in table.index]
+    payload = {
+        "columns": [str(column) for column in table.columns],
+        "index": periods,
+        "data": [[format_large_number(value) for value in row] for row in table.to_numpy().tolist()],
+    }
+    return max(periods), json.dumps(payload, separators=(",", ":"))
+
+
+class FundamentalsStore:
+    """Persistent store of financial statements keyed by ticker, statement and fiscal period.
+
+    Statements change quarterly, so a ticker is only re-fetched after ``ttl``.
+    A re-fetch that yields the same content just bumps ``fetched_at``; a new
+    fiscal period adds a row and a restatement updates the existing one.
+    New periods go through ``insert_ignore``, so workers refreshing the same
+    ticker at once settle on one row instead of failing on the constraint.
+    """
+
+    def __init__(self, fetch, ttl=timedelta(days=7)):
+        self.fetch = fetch
+        self.ttl = ttl
+
+    def latest(self, ticker):
+        rows = FinancialStatement.query.filter_by(ticker=ticker) \
+            .order_by(FinancialStatement.period_end.desc()).all()
+        latest = {}
+        for row in rows:
+            latest.setdefault(row.statement, row)
+        return latest
+
+    def get(self, ticker):
+        rows = self.latest(ticker)
+        now = datetime.utcnow()
+        if not rows or min(row.fetched_at for row in rows.values()) < now - self.ttl:
+            try:
+                rows = self.refresh(ticker, rows, now)
+            except Exception:
+                if not rows:
+                    raise
+                logging.exception(f"Statement refresh failed for {ticker}; serving stored copy")
+        return {name: json.loads(rows[name].payload) if name in rows else {} for name in STATEMENTS}
+
+    def refresh(self, ticker, rows, now):
+        statements = self.fetch(ticker)
+        for name in STATEMENTS:
+            serialized = serialize_statement(statements.get(name))
+            if serialized is None:
+                # keep whatever we had rather than blanking a statement on a partial failure
+                continue
+            period_end, payload = serialized
+            content_hash = hashlib.sha1(payload.encode()).hexdigest()
+            current = rows.get(name)
+            if current is None or current.period_end != period_end:
+                # another worker may be adding the same period; the unique constraint keeps one row
+                insert_ignore(FinancialStatement, [{
+                    "ticker": ticker, "statement": name, "period_end": period_end, "payload": payload,
+                    "content_hash": content_hash, "fetched_at": now, "updated_at": now,
+                }])
+                current = FinancialStatement.query.filter_by(
+                    ticker=ticker, statement=name, period_end=period_end
+                ).one()
+                rows[name] = current
+            if current.content_hash != content_hash:
+                current.payload = payload
+                current.content_hash = content_hash
+                current.updated_at = now
+            current.fetched_at = now
+        db.session.commit()
+        return rows
@@ -0,0 +1,11 @@
+# Live quote streams (/api/stream) hold a thread for up to STREAM_MAX_AGE
+# seconds, so sync workers would be starved by a few open chart tabs. Threaded
+# workers keep STREAM_MAX_CLIENTS streams per process well below the thread
+# count, leaving the rest for page requests.
+import os
+
+worker_class = "gthread"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+threads = int(os.getenv("GUNICORN_THREADS", "16"))
+# streams send a keepalive every STREAM_HEARTBEAT seconds; anything silent longer is dead
+timeout = 60
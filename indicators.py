@@ -0,0 +1,180 @@
+import threading
+from collections import OrderedDict, namedtuple
+
+from lazy import lazy_import
+from metrics import record_cache
+
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+Series = namedtuple("Series", ["ts", "high", "low", "close", "volume", "tz"])
+
+SMA_WINDOWS = (20, 50)
+EMA_SPANS = (12, 26)
+MACD_SIGNAL = 9
+RSI_PERIOD = 14
+BOLLINGER_WINDOW = 20
+BOLLINGER_WIDTH = 2
+
+# series sent to clients; the rest is running state kept for incremental updates
+OUTPUTS = ("sma20", "sma50", "ema12", "ema26", "macd", "macd_signal", "macd_hist",
+           "rsi", "bb_upper", "bb_middle", "bb_lower", "vwap")
+GROUPS = {
+    "sma": ("sma20", "sma50"),
+    "ema": ("ema12", "ema26"),
+    "macd": ("macd", "macd_signal", "macd_hist"),
+    "rsi": ("rsi",),
+    "bollinger": ("bb_upper", "bb_middle", "bb_lower"),
+    "vwap": ("vwap",),
+}
+
+
+def _ewm(values, alpha, seed=None):
+    # with adjust=False an EMA only depends on its previous value, so a tail
+    # can be continued by prepending the last computed point
+    if seed is None or np.isnan(seed):
+        return pd.Series(values).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    return pd.Series(np.concatenate([[seed], values])).ewm(alpha=alpha, adjust=False).mean().to_numpy()[1:]
+
+
+def _rolling(close, start, window, std=False):
+    # values from ``start`` on need only the window - 1 closes before it
+    lead = max(0, start - window + 1)
+    rolling = pd.Series(close[lead:]).rolling(window)
+    values = (rolling.std(ddof=0) if std else rolling.mean()).to_numpy()
+    return values[start - lead:]
+
+
+def _sessions(ts, tz, intraday):
+    if not intraday:
+        return np.zeros(len(ts), dtype=np.int64)
+    local = pd.to_datetime(ts.astype("int64"), unit="s", utc=True).tz_convert(tz)
+    return (local.normalize().asi8 // 10**9).astype(np.int64)
+
+
+def compute(bars, intraday, start=0, previous=None):
+    """Indicator state for rows ``start:`` of ``bars``.
+
+    ``previous`` is the state for rows ``:start`` of the same series; EMAs,
+    RSI averages and VWAP sums continue from its last row and rolling
+    windows reach back into ``bars`` only as far as they need.
+    """
+    ts, high, low, close, volume, tz = bars
+    tail = close[start:]
+    seed = (lambda name: previous[name][start - 1]) if previous is not None and start else (lambda name: None)
+    state = {}
+
+    for window in SMA_WINDOWS:
+        state[f"sma{window}"] = _rolling(close, start, window)
+    for span in EMA_SPANS:
+        state[f"ema{span}"] = _ewm(tail, 2 / (span + 1), seed(f"ema{span}"))
+    state["macd"] = state["ema12"] - state["ema26"]
+    state["macd_signal"] = _ewm(state["macd"], 2 / (MACD_SIGNAL + 1), seed("macd_signal"))
+    state["macd_hist"] = state["macd"] - state["macd_signal"]
+
+    # Wilder's RSI: smoothed average gain over smoothed average loss
+    before = close[start - 1:-1] if start else np.concatenate([close[:1], close[:-1]])
+    delta = tail - before
+    alpha = 1 / RSI_PERIOD
+    state["rsi_gain"] = _ewm(np.clip(delta, 0, None), alpha, seed("rsi_gain"))
+    state["rsi_loss"] = _ewm(np.clip(-delta, 0, None), alpha, seed("rsi_loss"))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - 100 / (1 + state["rsi_gain"] / state["rsi_loss"])
+    rsi[(state["rsi_loss"] == 0) & (state["rsi_gain"] > 0)] = 100
+    rsi[np.arange(start, len(close)) < RSI_PERIOD] = np.nan
+    state["rsi"] = rsi
+
+    middle = state[f"sma{BOLLINGER_WINDOW}"] if BOLLINGER_WINDOW in SMA_WINDOWS else \
+        _rolling(close, start, BOLLINGER_WINDOW)
+    width = BOLLINGER_WIDTH * _rolling(close, start, BOLLINGER_WINDOW, std=True)
+    state["bb_middle"] = middle
+    state["bb_upper"] = middle + width
+    state["bb_lower"] = middle - width
+
+    # VWAP anchored at each intraday session, or at the first bar for daily series
+    sessions = _sessions(ts, tz, intraday)
+    typical = (high[start:] + low[start:] + tail) / 3
+    pv = pd.Series(np.nan_to_num(typical * volume[start:]))
+    v = pd.Series(np.nan_to_num(volume[start:]))
+    groups = sessions[start:]
+    cum_pv = pv.groupby(groups).cumsum().to_numpy()
+    cum_v = v.groupby(groups).cumsum().to_numpy()
+    if previous is not None and start and len(groups) and sessions[start - 1] == groups[0]:
+        same = groups == groups[0]
+        cum_pv[same] += previous["vwap_pv"][start - 1]
+        cum_v[same] += previous["vwap_volume"][start - 1]
+    state["vwap_pv"] = cum_pv
+    state["vwap_volume"] = cum_v
+    with np.errstate(divide="ignore", invalid="ignore"):
+        state["vwap"] = np.where(cum_v > 0, cum_pv / cum_v, np.nan)
+    return state
+
+
+def series_from_array(array, tz):
+    # rows without a close cannot feed any indicator
+    rows = np.asarray(array).reshape(-1, 6)
+    rows = rows[~np.isnan(rows[:, 4])]
+    return Series(rows[:, 0], rows[:, 2], rows[:, 3], rows[:, 4], rows[:, 5], tz)
+
+
+class IndicatorCache:
+    """Indicator series per ticker and interval, extended as bars arrive.
+
+    Each entry keeps the bars it was computed from. On the next request the
+    stored bars are compared with the current ones and only rows from the
+    first difference on are recomputed (usually the last, still-forming bar
+    plus any new ones), seeded from the cached state. A change at the front
+    of the series, such as a backfill, recomputes it whole. Entries live in
+    process memory, bounded to ``size`` series.
+    """
+
+    def __init__(self, size=256):
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _first_change(self, old, bars):
+        if not len(old.ts) or len(bars.ts) < len(old.ts) or bars.ts[0] != old.ts[0]:
+            return 0
+        n = len(old.ts)
+        changed = np.flatnonzero((bars.ts[:n] != old.ts) | (bars.close[:n] != old.close) |
+                                 (bars.volume[:n] != old.volume))
+        return int(changed[0]) if len(changed) else n
+
+    def get(self, key, bars, intraday):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+        start = 0 if entry is None else self._first_change(entry["bars"], bars)
+        if entry is not None and start == len(bars.ts) == len(entry["bars"].ts):
+            record_cache("indicators", hits=1)
+            return entry["state"]
+        if start:
+            record_cache("indicators", refreshes=1)
+            tail = compute(bars, intraday, start, entry["state"])
+            state = {name: np.concatenate([entry["state"][name][:start], values]) for name, values in tail.items()}
+        else:
+            record_cache("indicators", misses=1)
+            state = compute(bars, intraday)
+        with self.lock:
+            # copies, since the store hands out memory-mapped arrays that get replaced
+            self.entries[key] = {"bars": Series(*(np.array(column) for column in bars[:5]), bars.tz),
+                                 "state": state}
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+        return state
+
+
+def encode_indicators(ts, state, start, index, names=OUTPUTS):
+    """Indicators for rows ``start:`` at the decimated ``index``, nulls for warm-up rows."""
+    ts = ts[start:][index]
+    first = int(ts[0]) if len(ts) else 0
+    series = {}
+    for name in names:
+        values = np.round(state[name][start:][index], 4)
+        series[name] = [None if value != value else float(value) for value in values]
+    return {"start": first, "offsets": (ts.astype(np.int64) - first).tolist(), "series": series}
@@ -0,0 +1,34 @@
+import importlib
+import importlib.util
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    """Stand-in that imports the real module on the first attribute miss.
+
+    ``importlib.import_module`` holds the module's import lock, so threads
+    racing on first use all wait for one complete import instead of reading
+    a half-executed module. The real module's namespace is then copied in,
+    so later lookups are plain attribute reads.
+    """
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def lazy_import(name):
+    """Module ``name`` that is only executed when an attribute is first read.
+
+    numpy and pandas take most of the app's import time but are only needed
+    once market data is handled, so modules bind them through this and a
+    worker boots without them.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    if importlib.util.find_spec(name) is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    return LazyModule(name)
@@ -0,0 +1,140 @@
+import json
+import os
+import time
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+
+BUNDLED_CALENDAR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "market_calendar.json")
+
+# seconds each class of data may be cached, by session phase; "closed" is
+# replaced by the time left until pre-market when that is longer
+TTLS = {
+    "quote": {"regular": 60, "pre": 300, "post": 300, "closed": 3600},
+    "daily_bar": {"regular": 900, "pre": 3600, "post": 1800, "closed": 3600},
+    "fundamentals": {"regular": 86400, "pre": 86400, "post": 86400, "closed": 86400},
+    "news": {"regular": 900, "pre": 1800, "post": 1800, "closed": 4 * 3600},
+}
+# classes that stop changing while the market is shut
+SLEEPS_WHEN_CLOSED = {"quote", "daily_bar"}
+PREWARM_LEAD = 300
+
+
+def _clock(value):
+    hours, minutes = value.split(":")
+    return timedelta(hours=int(hours), minutes=int(minutes))
+
+
+class TradingCalendar:
+    """Exchange sessions from a bundled calendar file.
+
+    A weekday that is not a listed holiday trades pre-market, regular hours
+    (closing early on listed half days) and post-market; everything else is
+    closed. Dates outside the file are treated as ordinary weekdays.
+    """
+
+    def __init__(self, timezone="America/New_York", holidays=(), early_closes=(), pre="04:00",
+                 open="09:30", close="16:00", early_close="13:00", post_end="20:00"):
+        self.tz = ZoneInfo(timezone)
+        self.holidays = {date.fromisoformat(day) for day in holidays}
+        self.early_closes = {date.fromisoformat(day) for day in early_closes}
+        self.pre = _clock(pre)
+        self.open = _clock(open)
+        self.close = _clock(close)
+        self.early_close = _clock(early_close)
+        self.post_end = _clock(post_end)
+
+    @classmethod
+    def from_file(cls, path=BUNDLED_CALENDAR):
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data["timezone"], data.get("holidays", ()), data.get("early_closes", ()),
+                   **data.get("sessions", {}))
+
+    def is_trading_day(self, day):
+        return day.weekday() < 5 and day not in self.holidays
+
+    def _local(self, at):
+        return datetime.fromtimestamp(at, self.tz)
+
+    def _at(self, day, offset):
+        return datetime(day.year, day.month, day.day, tzinfo=self.tz) + offset
+
+    def hours(self, day):
+        """(pre-market start, open, close, post-market end) for a trading day."""
+        close = self.early_close if day in self.early_closes else self.close
+        return tuple(self._at(day, offset) for offset in (self.pre, self.open, close, self.post_end))
+
+    def session(self, at=None):
+        now = self._local(time.time() if at is None else at)
+        day = now.date()
+        if not self.is_trading_day(day):
+            return "closed"
+        pre, open_, close, post_end = self.hours(day)
+        if open_ <= now < close:
+            return "regular"
+        if pre <= now < open_:
+            return "pre"
+        if close <= now < post_end:
+            return "post"
+        return "closed"
+
+    def next_trading_day(self, day):
+        day += timedelta(days=1)
+        while not self.is_trading_day(day):
+            day += timedelta(days=1)
+        return day
+
+    def next_event(self, at, index):
+        # index 0 = pre-market start, 1 = regular open
+        now = self._local(at)
+        day = now.date()
+        if self.is_trading_day(day) and now < self.hours(day)[index]:
+            return self.hours(day)[index].timestamp()
+        return self.hours(self.next_trading_day(day))[index].timestamp()
+
+    def next_open(self, at=None):
+        return self.next_event(time.time() if at is None else at, 1)
+
+    def next_premarket(self, at=None):
+        return self.next_event(time.time() if at is None else at, 0)
+
+
+class Schedule:
+    """Cache TTLs and refresh intervals that follow the trading calendar.
+
+    During regular hours quotes live a minute; outside them the TTL grows,
+    and while the market is shut price data is kept until pre-market starts,
+    so nights, weekends and holidays cost next to no upstream calls.
+    """
+
+    def __init__(self, calendar, ttls=TTLS, prewarm_lead=PREWARM_LEAD, clock=time.time):
+        self.calendar = calendar
+        self.ttls = ttls
+        self.prewarm_lead = prewarm_lead
+        self.clock = clock
+
+    def ttl(self, data_class, at=None):
+        at = self.clock() if at is None else at
+        session = self.calendar.session(at)
+        ttl = self.ttls[data_class][session]
+        if session == "closed" and data_class in SLEEPS_WHEN_CLOSED:
+            ttl = max(ttl, self.calendar.next_premarket(at) - at)
+        return max(1, int(ttl))
+
+    def bar_ttl(self, interval, regular, at=None):
+        # ``at`` is when the bars were fetched; regular-hours TTLs stay with the
+        # store and the calendar only stretches them outside the session
+        at = self.clock() if at is None else at
+        if self.calendar.session(at) == "regular":
+            return regular
+        return max(regular, self.ttl("daily_bar" if interval == "1d" else "quote", at))
+
+    def refresh_interval(self, data_class, at=None):
+        """Sleep before the next background refresh, waking ``prewarm_lead`` before the open."""
+        at = self.clock() if at is None else at
+        interval = self.ttl(data_class, at)
+        prewarm = self.calendar.next_open(at) - self.prewarm_lead - at
+        if 0 < prewarm < interval:
+            interval = prewarm
+        return max(1, int(interval))
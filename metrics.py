@@ -0,0 +1,252 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import Response, before_render_template, current_app, g, has_request_context, request, \
+    template_rendered
+from sqlalchemy import event
+
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join('{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+                     for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _number(value):
+    return "+Inf" if value == float("inf") else repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def get(self, *labels):
+        return self.values.get(labels, 0)
+
+    def samples(self):
+        with self.lock:
+            values = dict(self.values)
+        for labels, value in sorted(values.items()):
+            yield self.name, _labels(self.labelnames, labels), value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self.lock:
+            counts, total = self.series.get(labels, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.series[labels] = (counts, total + value)
+
+    def count(self, *labels):
+        series = self.series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def samples(self):
+        with self.lock:
+            series = {labels: (list(counts), total) for labels, (counts, total) in self.series.items()}
+        names = self.labelnames + ("le",)
+        for labels, (counts, total) in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield self.name + "_bucket", _labels(names, labels + (_number(bound),)), cumulative
+            yield self.name + "_sum", _labels(self.labelnames, labels), total
+            yield self.name + "_count", _labels(self.labelnames, labels), cumulative
+
+
+class Collected:
+    """Values read at scrape time from ``collect()``, which returns {labels: value}."""
+
+    def __init__(self, name, help, labelnames=(), collect=None, kind="gauge"):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+        self.kind = kind
+
+    def samples(self):
+        for labels, value in sorted((self.collect() or {}).items()):
+            yield self.name, _labels(self.labelnames, labels), value
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self.metrics.get(name) or self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=BUCKETS):
+        return self.metrics.get(name) or self.register(Histogram(name, help, labelnames, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# process-wide, like the caches and the rate limiter; each worker exposes its own numbers
+REGISTRY = Registry()
+
+request_seconds = REGISTRY.histogram(
+    "http_request_duration_seconds", "Request latency by route.", ("method", "route", "status"))
+request_queries = REGISTRY.histogram(
+    "http_request_db_queries", "SQL statements issued per request.", ("route",), QUERY_BUCKETS)
+span_seconds = REGISTRY.histogram(
+    "app_span_duration_seconds", "Time spent in named sections of request handling.", ("span",))
+upstream_seconds = REGISTRY.histogram(
+    "market_data_call_duration_seconds", "Upstream market data call latency.", ("provider", "method"))
+upstream_errors = REGISTRY.counter(
+    "market_data_call_errors_total", "Upstream market data calls that raised.", ("provider", "method"))
+cache_requests = REGISTRY.counter(
+    "app_cache_requests_total", "Lookups per application cache, by result.", ("cache", "result"))
+
+
+def record_cache(name, hits=0, misses=0, refreshes=0):
+    for result, count in (("hit", hits), ("miss", misses), ("refresh", refreshes)):
+        if count:
+            cache_requests.inc(name, result, amount=count)
+
+
+@contextmanager
+def span(name):
+    """Times a block into ``app_span_duration_seconds`` and the request's Server-Timing."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        span_seconds.observe(elapsed, name)
+        if has_request_context():
+            g.setdefault("spans", []).append((name, elapsed))
+
+
+def server_timing(spans, queries, query_seconds, total):
+    entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in spans]
+    entries.append(f'db;dur={query_seconds * 1000:.1f};desc="{queries} queries"')
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+class Metrics:
+    """Flask extension that times every request and serves ``/metrics``.
+
+    Requests are recorded per route template (``/company``, not the URL), and
+    SQL statements are counted per request through an engine event. With
+    ``METRICS_SERVER_TIMING`` on, each response also carries a
+    ``Server-Timing`` header listing its spans, database time and total.
+    """
+
+    def __init__(self, app=None, registry=REGISTRY):
+        self.registry = registry
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("METRICS_ENABLED", True)
+        app.config.setdefault("METRICS_SERVER_TIMING", False)
+        if not app.config["METRICS_ENABLED"]:
+            return
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.add_url_rule("/metrics", "metrics", self.expose)
+        before_render_template.connect(self._render_started, app)
+        template_rendered.connect(self._render_finished, app)
+        app.extensions["metrics"] = self
+
+    def watch_cache(self, backend):
+        # the shared backend keeps its own counters; read them when scraped
+        if not hasattr(backend, "stats"):
+            return
+        self.registry.register(Collected(
+            "app_cache_backend_operations_total", "Shared cache backend lookups and evictions.",
+            ("result",), lambda: {(result,): backend.stats()[key] for result, key in
+                                  (("hit", "hits"), ("miss", "misses"), ("eviction", "evictions"))},
+            kind="counter"))
+        self.registry.register(Collected(
+            "app_cache_evictions_total", "Entries evicted from the shared cache, by key prefix.",
+            ("cache",), lambda: {(prefix,): count for prefix, count in backend.evicted.items()},
+            kind="counter"))
+        self.registry.register(Collected(
+            "app_cache_backend_entries", "Entries currently held by the shared cache.",
+            (), lambda: {(): backend.stats()["size"]}))
+
+    def watch_engine(self, engine):
+        def before(conn, cursor, statement, parameters, context, executemany):
+            if has_request_context() and "request_started" in g:
+                conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+        def after(conn, cursor, statement, parameters, context, executemany):
+            started = conn.info.get("query_started")
+            if started and has_request_context() and "request_started" in g:
+                g.queries = g.get("queries", 0) + 1
+                g.query_seconds = g.get("query_seconds", 0.0) + time.perf_counter() - started.pop()
+
+        event.listen(engine, "before_cursor_execute", before)
+        event.listen(engine, "after_cursor_execute", after)
+
+    def _render_started(self, sender, template, context, **extra):
+        g.render_started = time.perf_counter()
+
+    def _render_finished(self, sender, template, context, **extra):
+        started = g.pop("render_started", None)
+        if started is not None:
+            elapsed = time.perf_counter() - started
+            span_seconds.observe(elapsed, "render")
+            g.setdefault("spans", []).append(("render", elapsed))
+
+    def _start(self):
+        g.request_started = time.perf_counter()
+
+    def _finish(self, response):
+        started = g.pop("request_started", None)
+        if started is None:
+            return response
+        total = time.perf_counter() - started
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        queries = g.get("queries", 0)
+        request_seconds.observe(total, request.method, route, str(response.status_code))
+        request_queries.observe(queries, route)
+        if current_app.config["METRICS_SERVER_TIMING"]:
+            response.headers["Server-Timing"] = server_timing(
+                g.get("spans", []), queries, g.get("query_seconds", 0.0), total)
+        return response
+
+    def expose(self):
+        return Response(self.registry.render(), mimetype="text/plain; version=0.0.4")
@@ -1,4 +1,6 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import inspect, text
+from sqlalchemy.dialects import postgresql, sqlite
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
 from datetime import datetime
@@ -6,6 +8,12 @@ from datetime import datetime
 db = SQLAlchemy()
 
 class Portfolio(db.Model):
+    # the unique (user_id, ticker) index also serves every per-user lookup
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'ticker', name='uq_portfolio_user_ticker'),
+        db.Index('ix_portfolio_ticker', 'ticker'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     ticker = db.Column(db.String(10), nullable=False)
@@ -13,15 +21,112 @@ class Portfolio(db.Model):
     added_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 
+class WatchlistEntry(db.Model):
+    # the unique index doubles as the O(1) membership check and per-user lookup
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'ticker', name='uq_watchlist_user_ticker'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    ticker = db.Column(db.String(10), nullable=False)
+    added_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class PriceAlert(db.Model):
+    # the engine reads every active alert grouped by ticker each tick; users list their own
+    __table_args__ = (
+        db.Index('ix_price_alert_active_ticker', 'active', 'ticker'),
+        db.Index('ix_price_alert_user', 'user_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    ticker = db.Column(db.String(10), nullable=False)
+    # "above"/"below" compare the price, "move" the absolute % change on the day
+    kind = db.Column(db.String(10), nullable=False)
+    threshold = db.Column(db.Float, nullable=False)
+    active = db.Column(db.Boolean, default=True, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    triggered_at = db.Column(db.DateTime)
+    triggered_price = db.Column(db.Float)
+
+
+class FinancialStatement(db.Model):
+    # one row per reported fiscal period; the newest period_end is what gets shown
+    __table_args__ = (
+        db.UniqueConstraint('ticker', 'statement', 'period_end', name='uq_statement_period'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    ticker = db.Column(db.String(10), nullable=False)
+    statement = db.Column(db.String(20), nullable=False)
+    period_end = db.Column(db.String(10), nullable=False)
+    payload = db.Column(db.Text, nullable=False)
+    content_hash = db.Column(db.String(40), nullable=False)
+    fetched_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(256), nullable=False)
-    portfolios = db.relationship('Portfolio', backref='user', lazy=True)
+    portfolios = db.relationship('Portfolio', backref='user', lazy='selectin', order_by='Portfolio.added_at')
 
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
\ No newline at end of file
+        return check_password_hash(self.password_hash, password)
+
+
+def insert_ignore(model, rows):
+    """Insert rows, letting the table's unique constraints drop duplicates.
+
+    Returns the number of rows actually inserted. Replaces check-then-insert,
+    which costs an extra query and races between workers.
+    """
+    table = model.__table__
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'mysql':
+        stmt = table.insert().prefix_with('IGNORE')
+    elif dialect == 'sqlite':
+        stmt = sqlite.insert(table).on_conflict_do_nothing()
+    elif dialect == 'postgresql':
+        stmt = postgresql.insert(table).on_conflict_do_nothing()
+    else:
+        raise NotImplementedError(f"insert_ignore does not support {dialect}")
+    if len(rows) == 1:
+        return db.session.execute(stmt, rows[0]).rowcount
+    return db.session.execute(stmt, rows).rowcount
+
+
+def upgrade_schema():
+    """Add the indexes ``create_all`` leaves out of tables that already exist.
+
+    ``portfolio`` tables created before ``uq_portfolio_user_ticker`` hold
+    duplicate (user_id, ticker) rows and without the constraint
+    ``insert_ignore`` ignores nothing. Duplicates are collapsed onto the
+    earliest row, as the old check-then-insert meant to, before the unique
+    index is built. Returns the names of the indexes created.
+    """
+    inspector = inspect(db.engine)
+    if not inspector.has_table('portfolio'):
+        return []
+    existing = {index['name'] for index in inspector.get_indexes('portfolio')} | \
+        {constraint['name'] for constraint in inspector.get_unique_constraints('portfolio')}
+    created = []
+    with db.engine.begin() as conn:
+        if 'uq_portfolio_user_ticker' not in existing:
+            # the derived table lets MySQL delete from the table it selects from
+            conn.execute(text(
+                'DELETE FROM portfolio WHERE id NOT IN '
+                '(SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM portfolio GROUP BY user_id, ticker) AS keep)'))
+            conn.execute(text('CREATE UNIQUE INDEX uq_portfolio_user_ticker ON portfolio (user_id, ticker)'))
+            created.append('uq_portfolio_user_ticker')
+        if 'ix_portfolio_ticker' not in existing:
+            conn.execute(text('CREATE INDEX ix_portfolio_ticker ON portfolio (ticker)'))
+            created.append('ix_portfolio_ticker')
+    return created
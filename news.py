@@ -0,0 +1,75 @@
+import bisect
+import hashlib
+import heapq
+import threading
+
+
+PER_TICKER = 50
+
+
+def link_key(link):
+    return hashlib.sha1(link.encode("utf-8")).hexdigest()
+
+
+class NewsStore:
+    """Recent headlines per ticker, newest first, deduplicated on link.
+
+    Articles are indexed by a hash of their link, so re-ingesting a feed or
+    a story filed under several tickers costs one dict lookup per item and
+    is stored once. Each ticker keeps a sorted list of ``(-timestamp, key)``
+    bounded to ``per_ticker`` entries; ``latest`` heap-merges the lists of
+    the requested tickers and stops after ``limit`` distinct articles.
+    """
+
+    def __init__(self, per_ticker=PER_TICKER):
+        self.per_ticker = per_ticker
+        self.items = {}
+        self.refs = {}
+        self.feeds = {}
+        self.members = {}
+        self.lock = threading.Lock()
+
+    def add(self, ticker, items):
+        added = 0
+        with self.lock:
+            feed = self.feeds.setdefault(ticker, [])
+            members = self.members.setdefault(ticker, set())
+            for item in items:
+                link = item.get("link")
+                if not link or link == "#":
+                    continue
+                key = link_key(link)
+                if key in members:
+                    continue
+                self.items.setdefault(key, item)
+                self.refs[key] = self.refs.get(key, 0) + 1
+                bisect.insort(feed, (-int(item.get("timestamp") or 0), key))
+                members.add(key)
+                added += 1
+            while len(feed) > self.per_ticker:
+                _, key = feed.pop()
+                members.discard(key)
+                self.refs[key] -= 1
+                if not self.refs[key]:
+                    del self.refs[key]
+                    del self.items[key]
+        return added
+
+    def latest(self, tickers, limit=5):
+        news = []
+        seen = set()
+        with self.lock:
+            feeds = [self.feeds[ticker] for ticker in dict.fromkeys(tickers) if ticker in self.feeds]
+            for _, key in heapq.merge(*feeds):
+                if key in seen:
+                    continue
+                seen.add(key)
+                news.append(self.items[key])
+                if len(news) >= limit:
+                    break
+        return news
+
+
+def ingest(store, feeds):
+    """Add ``{ticker: items}`` to ``store``; returns how many entries were new."""
+    return sum(store.add(ticker, items) for ticker, items in feeds.items())
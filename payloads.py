@@ -0,0 +1,56 @@
+import gzip
+import hashlib
+import json
+
+from lazy import lazy_import
+
+
+np = lazy_import("numpy")
+
+
+# most points any chart range is sent; the chart is ~900px wide
+MAX_POINTS = {"1d": 400, "6mo": 200, "1y": 260, "2y": 260}
+# seconds a browser or proxy may reuse a series before asking again
+MAX_AGE = {"1m": 30, "1d": 300}
+
+
+def decimate_index(length, max_points):
+    # keep every k-th point plus the latest one, so the line still ends at the current price
+    if max_points is None or length <= max_points:
+        return np.arange(length)
+    step = int(np.ceil(length / max_points))
+    return np.arange(length - 1, -1, -step)[::-1]
+
+
+def decimate(ts, values, max_points):
+    index = decimate_index(len(ts), max_points)
+    return ts[index], values[index]
+
+
+def encode_series(bars, interval, max_points=None):
+    ts = np.asarray(bars.ts)
+    close = np.asarray(bars.close)
+    valid = ~np.isnan(close)
+    ts, close = decimate(ts[valid], close[valid], max_points)
+    start = int(ts[0]) if len(ts) else 0
+    return {
+        "start": start,
+        "offsets": (ts.astype(np.int64) - start).tolist(),
+        "prices": np.round(close, 4).tolist(),
+        "tz": bars.tz,
+        "interval": interval,
+    }
+
+
+def series_etag(ticker, range_option, bars):
+    # cheap to compute from the tail alone, before anything is serialized
+    last = (float(bars.ts[-1]), float(bars.close[-1])) if len(bars.ts) else (0, 0)
+    key = f"{ticker}:{range_option}:{len(bars.ts)}:{last[0]}:{last[1]}"
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def json_body(data, accept_encoding, min_size=1024):
+    body = json.dumps(data, separators=(",", ":")).encode()
+    if len(body) >= min_size and "gzip" in (accept_encoding or ""):
+        return gzip.compress(body, compresslevel=5), "gzip"
+    return body, None
@@ -0,0 +1,134 @@
+import codecs
+import csv
+import io
+import json
+from itertools import chain, islice
+
+from models import db, insert_ignore
+
+
+BATCH_SIZE = 1000
+MAX_ERRORS = 100
+
+
+class UploadError(ValueError):
+    pass
+
+
+def parse_csv(stream):
+    reader = csv.DictReader(codecs.iterdecode(stream, "utf-8-sig"))
+    fields = {name.strip().lower(): name for name in reader.fieldnames or ()}
+    if "ticker" not in fields:
+        raise UploadError("CSV needs a 'ticker' column")
+    for row in reader:
+        yield reader.line_num, row.get(fields["ticker"]), row.get(fields.get("quantity", ""))
+
+
+def parse_json(stream):
+    # JSON Lines are parsed row by row; a plain JSON array has to be read whole
+    lines = iter(stream)
+    first = next((line for line in lines if line.strip()), b"")
+    if first.lstrip()[:1] == b"[":
+        try:
+            records = json.loads(first + b"".join(lines))
+        except ValueError as e:
+            raise UploadError(f"Invalid JSON: {e}")
+        if not isinstance(records, list):
+            raise UploadError("JSON upload must be an array or JSON Lines")
+    else:
+        records = (line for line in chain([first], lines) if line.strip())
+    for number, record in enumerate(records, start=1):
+        if isinstance(record, bytes):
+            try:
+                record = json.loads(record)
+            except ValueError:
+                yield number, None, None
+                continue
+        if isinstance(record, str):
+            record = {"ticker": record}
+        if not isinstance(record, dict):
+            yield number, None, None
+            continue
+        yield number, record.get("ticker"), record.get("quantity")
+
+
+PARSERS = {"csv": parse_csv, "json": parse_json}
+
+
+def import_rows(model, user_id, rows, symbols, batch_size=BATCH_SIZE):
+    """Validate parsed rows against ``symbols`` and insert them in batches.
+
+    ``symbols.known`` is asked once per batch, so symbols outside the local
+    index are checked upstream in one batched lookup rather than row by row.
+
+    Every batch goes through ``insert_ignore`` in the caller's transaction, so
+    the whole upload is committed or rolled back at once and tickers already
+    held are left untouched. Returns counts plus the first ``MAX_ERRORS``
+    rejected rows.
+    """
+    has_quantity = "quantity" in model.__table__.c
+    summary = {"rows": 0, "added": 0, "existing": 0, "duplicates": 0, "invalid": 0, "errors": []}
+    seen = set()
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            break
+        chunk = [(line, str(ticker or "").upper().strip(), quantity) for line, ticker, quantity in chunk]
+        known = symbols.known({ticker for _, ticker, _ in chunk if ticker})
+        batch = []
+        for line, ticker, quantity in chunk:
+            summary["rows"] += 1
+            error = None
+            if ticker not in known:
+                error = f"unknown symbol {ticker!r}"
+            elif has_quantity:
+                try:
+                    quantity = int(float(quantity)) if quantity not in (None, "") else 0
+                    if quantity < 0:
+                        error = "quantity must not be negative"
+                except (TypeError, ValueError):
+                    error = f"bad quantity {quantity!r}"
+            if error:
+                summary["invalid"] += 1
+                if len(summary["errors"]) < MAX_ERRORS:
+                    summary["errors"].append({"line": line, "error": error})
+                continue
+            if ticker in seen:
+                summary["duplicates"] += 1
+                continue
+            seen.add(ticker)
+            row = {"user_id": user_id, "ticker": ticker}
+            if has_quantity:
+                row["quantity"] = quantity
+            batch.append(row)
+        if batch:
+            added = insert_ignore(model, batch)
+            summary["added"] += added
+            summary["existing"] += len(batch) - added
+    return summary
+
+
+def export_rows(model, user_id, fmt, batch_size=BATCH_SIZE):
+    columns = [model.ticker] + ([model.quantity] if "quantity" in model.__table__.c else [])
+    names = [column.key for column in columns]
+    query = (db.session.query(*columns).filter(model.user_id == user_id)
+             .order_by(model.added_at, model.id).execution_options(yield_per=batch_size))
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(names)
+        for row in query:
+            writer.writerow(row)
+            if buffer.tell() > 8192:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    else:
+        yield "["
+        separator = ""
+        for row in query:
+            yield separator + json.dumps(dict(zip(names, row)))
+            separator = ","
+        yield "]"
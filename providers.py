@@ -0,0 +1,572 @@
+import calendar
+import json
+import logging
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+
+from breaker import CircuitBreaker, CircuitOpen
+from fanout import FanOut, FanOutResult
+from lazy import lazy_import
+from metrics import REGISTRY, Collected, upstream_errors, upstream_seconds
+from ratelimit import TokenBucket
+from singleflight import Group
+
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+PERIOD_DAYS = {"1d": 1, "5d": 5, "1mo": 30, "3mo": 91, "6mo": 182, "1y": 365, "2y": 730, "5y": 1826}
+INTERVAL_MINUTES = {"1m": 1, "5m": 5, "15m": 15, "30m": 30, "1h": 60}
+STATEMENTS = ("income_stmt", "balance_sheet", "cashflow", "financials")
+FIXTURE_HEADLINES = ("shares active in heavy trading", "beats quarterly estimates", "announces new product line",
+                     "analysts revise price targets", "outlines buyback plan")
+
+
+def quote_from_bars(ticker, bars):
+    # bars: daily OHLCV frame, oldest first; the last row is the current session
+    bars = bars.dropna(subset=["Close"])
+    if bars.empty:
+        return None
+    row = bars.iloc[-1]
+    price = float(row["Close"])
+    prev_close = float(bars["Close"].iloc[-2]) if len(bars) > 1 else float(row["Open"])
+    change = price - prev_close
+    return {
+        "ticker": ticker,
+        "price": price,
+        "open": float(row["Open"]),
+        "high": float(row["High"]),
+        "low": float(row["Low"]),
+        "volume": float(row["Volume"]),
+        "previous_close": prev_close,
+        "change": change,
+        "change_percent": (change / prev_close * 100) if prev_close else 0,
+        "date": row.name.strftime("%Y-%m-%d"),
+    }
+
+
+def is_upstream_failure(error):
+    """Transport errors, throttling and 5xx responses, as opposed to a bad request or symbol."""
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None) or getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    # ConnectionError and TimeoutError are OSErrors, as are requests' transport exceptions
+    if isinstance(error, OSError):
+        return True
+    return "RateLimit" in type(error).__name__ or "Too Many Requests" in str(error)
+
+
+class MarketDataProvider:
+    """Interface every market-data backend implements.
+
+    ``get_quotes`` is the batched entry point: one call per request, however
+    many tickers it covers.
+    """
+
+    name = "base"
+
+    def get_quotes(self, tickers):
+        raise NotImplementedError
+
+    def get_history(self, ticker, period="1d", interval="1m"):
+        raise NotImplementedError
+
+    def get_closes(self, tickers, period="1y", interval="1d"):
+        # batched close series, ticker -> Series; backends override with one request
+        closes = {}
+        for ticker in tickers:
+            history = self.get_history(ticker, period=period, interval=interval)
+            if not history.empty:
+                closes[ticker] = history["Close"].dropna()
+        return closes
+
+    def get_info(self, ticker):
+        raise NotImplementedError
+
+    def get_statement(self, ticker, name):
+        raise NotImplementedError
+
+    def news_batches(self, tickers, size=5, sleep=time.sleep):
+        """Yield ``{ticker: items}`` for ``tickers``, ``size`` lookups at a time.
+
+        Meant for background ingestion: calls go one by one through their own
+        circuit breaker, so a slow news pass never opens the one pages rely
+        on, and each batch is followed by a pause as long as it took to pay
+        for, leaving at least half the rate limit to requests. Stops early
+        while the upstream is down.
+        """
+        rate = self.limiter.rate
+        for start in range(0, len(tickers), size):
+            if start and rate:
+                sleep(size / rate)
+            feeds = {}
+            for ticker in tickers[start:start + size]:
+                try:
+                    feeds[ticker] = self._guarded(self.news_breaker, "get_news", (ticker,), {})
+                except CircuitOpen as e:
+                    logging.warning(f"News ingestion paused: {e}")
+                    yield feeds
+                    return
+                except Exception as e:
+                    logging.warning(f"News fetch failed for {ticker}: {e}")
+            yield feeds
+
+    def get_statements(self, ticker):
+        return {name: self.get_statement(ticker, name) for name in STATEMENTS}
+
+    def get_news(self, ticker):
+        # recent headlines for one ticker as {"title", "link", "publisher", "timestamp"}
+        raise NotImplementedError
+
+
+class YFinanceProvider(MarketDataProvider):
+    name = "yfinance"
+
+    def get_quotes(self, tickers):
+        import yfinance as yf
+
+        tickers = list(dict.fromkeys(tickers))
+        if not tickers:
+            return {}
+        data = yf.download(
+            tickers=tickers,
+            period="5d",
+            interval="1d",
+            group_by="ticker",
+            progress=False,
+            auto_adjust=False,
+            threads=True
+        )
+        quotes = {}
+        for ticker in tickers:
+            try:
+                bars = data[ticker] if isinstance(data.columns, pd.MultiIndex) else data
+            except KeyError:
+                continue
+            quote = quote_from_bars(ticker, bars)
+            if quote:
+                quotes[ticker] = quote
+        return quotes
+
+    def get_history(self, ticker, period="1d", interval="1m"):
+        import yfinance as yf
+        return yf.Ticker(ticker).history(period=period, interval=interval)
+
+    def get_closes(self, tickers, period="1y", interval="1d"):
+        import yfinance as yf
+
+        tickers = list(dict.fromkeys(tickers))
+        if not tickers:
+            return {}
+        data = yf.download(
+            tickers=tickers,
+            period=period,
+            interval=interval,
+            progress=False,
+            auto_adjust=False,
+            threads=True
+        )
+        close = data["Close"]
+        if isinstance(close, pd.Series):
+            close = close.to_frame(tickers[0])
+        return {ticker: close[ticker].dropna() for ticker in tickers
+                if ticker in close and close[ticker].notna().any()}
+
+    def get_info(self, ticker):
+        import yfinance as yf
+        return yf.Ticker(ticker).info or {}
+
+    def get_statement(self, ticker, name):
+        import yfinance as yf
+        return getattr(yf.Ticker(ticker), name)
+
+    def get_news(self, ticker):
+        import yfinance as yf
+
+        news = []
+        for item in yf.Ticker(ticker).news or []:
+            if not isinstance(item, dict):
+                continue
+            # newer yfinance releases nest the article under "content"
+            content = item.get("content")
+            if isinstance(content, dict):
+                url = content.get("canonicalUrl") or content.get("clickThroughUrl") or {}
+                published = content.get("pubDate")
+                timestamp = calendar.timegm(time.strptime(published, "%Y-%m-%dT%H:%M:%SZ")) if published else 0
+                item = {"title": content.get("title"), "link": url.get("url"),
+                        "publisher": (content.get("provider") or {}).get("displayName"),
+                        "providerPublishTime": timestamp}
+            if not item.get("link") or not item.get("title"):
+                continue
+            news.append({
+                "title": item["title"],
+                "link": item["link"],
+                "publisher": item.get("publisher") or "Financial News",
+                "timestamp": int(item.get("providerPublishTime") or 0),
+            })
+        return news
+
+
+class FixtureProvider(MarketDataProvider):
+    """Offline backend for tests and load runs.
+
+    Replays recorded data from a JSON fixture file when one is given and
+    falls back to deterministic synthetic series seeded by the symbol, so the
+    same ticker always produces the same prices.
+    """
+
+    name = "fixture"
+
+    def __init__(self, path=None, now=None, latency=0):
+        self.fixtures = {}
+        self.now = now
+        self.latency = latency
+        if path:
+            with open(path) as f:
+                self.fixtures = json.load(f)
+
+    def _delay(self):
+        # simulated upstream round trip for load tests
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _seed(self, ticker):
+        return zlib.crc32(ticker.encode())
+
+    def _known(self, ticker):
+        return not self.fixtures or ticker in self.fixtures
+
+    def _index(self, period, interval):
+        now = self.now or datetime.utcnow()
+        days = PERIOD_DAYS.get(period, 1)
+        if interval in INTERVAL_MINUTES:
+            # regular session is 14:30-21:00 UTC; roll back to the last weekday session
+            session = now.replace(hour=14, minute=30, second=0, microsecond=0)
+            if now < session:
+                session -= timedelta(days=1)
+            while session.weekday() >= 5:
+                session -= timedelta(days=1)
+            end = min(now, session + timedelta(minutes=390))
+            freq = f"{INTERVAL_MINUTES[interval]}min"
+            index = pd.DatetimeIndex([], tz="UTC")
+            for day in pd.bdate_range(end=session.date(), periods=days):
+                open_ = day + pd.Timedelta(hours=14, minutes=30)
+                close = min(day + pd.Timedelta(hours=21), pd.Timestamp(end))
+                index = index.append(pd.date_range(open_, close, freq=freq, tz="UTC"))
+            return index
+        end = pd.Timestamp(now.date())
+        return pd.bdate_range(end - pd.Timedelta(days=days), end, tz="UTC")
+
+    def _recorded(self, ticker, period, interval):
+        rows = self.fixtures.get(ticker, {}).get("history", {}).get(f"{period}:{interval}")
+        if rows is None:
+            return None
+        frame = pd.DataFrame(rows, columns=["Date", "Open", "High", "Low", "Close", "Volume"])
+        frame.index = pd.to_datetime(frame.pop("Date"), unit="s", utc=True)
+        return frame
+
+    def get_history(self, ticker, period="1d", interval="1m"):
+        self._delay()
+        return self._history(ticker, period, interval)
+
+    def _history(self, ticker, period, interval):
+        if not self._known(ticker):
+            return pd.DataFrame(columns=["Open", "High", "Low", "Close", "Volume"])
+        recorded = self._recorded(ticker, period, interval)
+        if recorded is not None:
+            return recorded
+        index = self._index(period, interval)
+        rng = np.random.default_rng(self._seed(ticker))
+        base = 20 + self._seed(ticker) % 400
+        # walk forward from a fixed origin so overlapping ranges agree on price
+        origin = pd.Timestamp("2015-01-01", tz="UTC")
+        steps = ((index - origin) / pd.Timedelta(minutes=1)).to_numpy().astype(np.int64)
+        noise = rng.standard_normal(4096)
+        close = base * np.exp(0.02 * np.sin(steps / 9973.0) + 0.004 * noise[steps % 4096])
+        open_ = close * (1 + 0.002 * noise[(steps + 1) % 4096])
+        high = np.maximum(open_, close) * 1.003
+        low = np.minimum(open_, close) * 0.997
+        volume = 1_000_000 + (steps % 997) * 1000
+        return pd.DataFrame(
+            {"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume.astype(float)},
+            index=index
+        )
+
+    def get_quotes(self, tickers):
+        self._delay()
+        return self._quotes(tickers)
+
+    def _quotes(self, tickers):
+        quotes = {}
+        for ticker in dict.fromkeys(tickers):
+            quote = quote_from_bars(ticker, self._history(ticker, "5d", "1d"))
+            if quote:
+                quotes[ticker] = quote
+        return quotes
+
+    def get_closes(self, tickers, period="1y", interval="1d"):
+        self._delay()
+        closes = {}
+        for ticker in dict.fromkeys(tickers):
+            history = self._history(ticker, period, interval)
+            if not history.empty:
+                closes[ticker] = history["Close"]
+        return closes
+
+    def get_info(self, ticker):
+        self._delay()
+        if not self._known(ticker):
+            return {}
+        if "info" in self.fixtures.get(ticker, {}):
+            return dict(self.fixtures[ticker]["info"])
+        seed = self._seed(ticker)
+        quote = self._quotes([ticker]).get(ticker, {})
+        return {
+            "symbol": ticker,
+            "shortName": f"{ticker} Inc.",
+            "longName": f"{ticker} Incorporated",
+            "currency": "USD",
+            "currentPrice": quote.get("price"),
+            "previousClose": quote.get("previous_close"),
+            "regularMarketChangePercent": quote.get("change_percent"),
+            "trailingPE": 10 + seed % 30,
+            "trailingEps": round(quote.get("price", 0) / (10 + seed % 30), 2),
+            "dividendRate": round((seed % 300) / 100, 2) or None,
+            "earningsGrowth": (seed % 20) / 100 or None,
+            "freeCashflow": (seed % 90 + 10) * 1e8,
+        }
+
+    def get_statement(self, ticker, name):
+        self._delay()
+        if not self._known(ticker):
+            return pd.DataFrame()
+        seed = self._seed(ticker)
+        year = (self.now or datetime.utcnow()).year
+        columns = pd.to_datetime([f"{year - i}-12-31" for i in range(1, 5)])
+        rows = {
+            "income_stmt": ["Total Revenue", "Gross Profit", "Operating Income", "Net Income"],
+            "balance_sheet": ["Total Assets", "Total Liabilities Net Minority Interest", "Stockholders Equity"],
+            "cashflow": ["Operating Cash Flow", "Capital Expenditure", "Free Cash Flow"],
+            "financials": ["Total Revenue", "EBITDA", "Net Income"],
+        }
+        labels = rows[name]
+        values = [[(seed % 97 + 3) * 1e8 * (k + 1) * (1 - 0.05 * i) for i in range(len(columns))]
+                  for k in range(len(labels))]
+        return pd.DataFrame(values, index=labels, columns=columns)
+
+    def get_news(self, ticker):
+        self._delay()
+        if not self._known(ticker):
+            return []
+        if "news" in self.fixtures.get(ticker, {}):
+            return [dict(item) for item in self.fixtures[ticker]["news"]]
+        # a few hourly headlines per symbol plus one market story every symbol shares
+        now = calendar.timegm(self.now.utctimetuple()) if self.now else int(time.time())
+        hour = now - now % 3600
+        seed = self._seed(ticker)
+        news = [{
+            "title": f"{ticker} {FIXTURE_HEADLINES[(seed + i) % len(FIXTURE_HEADLINES)]}",
+            "link": f"https://news.example.com/{ticker.lower()}/{hour - i * 3600}",
+            "publisher": "SimplyStocks Wire",
+            "timestamp": hour - i * 3600 - seed % 1800,
+        } for i in range(3)]
+        news.append({
+            "title": "Markets close mixed as investors weigh rate outlook",
+            "link": f"https://news.example.com/markets/{hour}",
+            "publisher": "SimplyStocks Wire",
+            "timestamp": hour,
+        })
+        return news
+
+
+PROVIDERS = {
+    "yfinance": YFinanceProvider,
+    "fixture": FixtureProvider,
+}
+
+
+def create_provider(config):
+    name = config.get("MARKET_DATA_PROVIDER", "yfinance")
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown market data provider: {name}")
+    if name == "fixture":
+        return FixtureProvider(path=config.get("MARKET_DATA_FIXTURE"),
+                               latency=config.get("MARKET_DATA_LATENCY", 0))
+    return PROVIDERS[name]()
+
+
+class MarketData:
+    """Flask extension giving routes one entry point into the configured provider.
+
+    Every upstream call is paced by a single token bucket, so all fetchers in
+    the process share one rate limit. Identical calls already in flight are
+    coalesced so a burst of cache misses costs one upstream request, and
+    lookups that cannot be batched fan out over a bounded thread pool.
+
+    A circuit breaker sits in front of the provider: after
+    ``MARKET_DATA_BREAKER_THRESHOLD`` consecutive failures calls fail fast
+    with ``CircuitOpen`` until an exponentially growing backoff has passed,
+    so callers fall back to cached data instead of queueing on timeouts.
+    Only time spent inside the provider counts as a stall: a fan-out call
+    still waiting on the local rate limiter at its deadline is our own
+    backlog, not an upstream failure, and batches are split so the rate
+    limit can get through each one before the deadline.
+    """
+
+    def __init__(self, app=None):
+        self.provider = None
+        self.limiter = TokenBucket(None)
+        self.fanout = None
+        self.flights = Group()
+        self.breaker = CircuitBreaker()
+        self.news_breaker = CircuitBreaker()
+        self.batch_size = None
+        self.inflight = {}
+        self.lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("MARKET_DATA_PROVIDER", "yfinance")
+        app.config.setdefault("MARKET_DATA_FIXTURE", None)
+        app.config.setdefault("MARKET_DATA_RATE_LIMIT", 2)
+        app.config.setdefault("MARKET_DATA_BURST", 5)
+        app.config.setdefault("MARKET_DATA_MAX_CONCURRENCY", 8)
+        app.config.setdefault("MARKET_DATA_TIMEOUT", 10)
+        app.config.setdefault("MARKET_DATA_BREAKER_THRESHOLD", 5)
+        app.config.setdefault("MARKET_DATA_BREAKER_BACKOFF", 5)
+        app.config.setdefault("MARKET_DATA_BREAKER_MAX_BACKOFF", 300)
+        self.provider = create_provider(app.config)
+        self.limiter = TokenBucket(app.config["MARKET_DATA_RATE_LIMIT"], app.config["MARKET_DATA_BURST"])
+        if self.fanout is not None:
+            self.fanout.shutdown()
+        self.breaker, self.news_breaker = (
+            CircuitBreaker(app.config["MARKET_DATA_BREAKER_THRESHOLD"], app.config["MARKET_DATA_BREAKER_BACKOFF"],
+                           app.config["MARKET_DATA_BREAKER_MAX_BACKOFF"]) for _ in range(2))
+        self.fanout = FanOut(app.config["MARKET_DATA_MAX_CONCURRENCY"], app.config["MARKET_DATA_TIMEOUT"],
+                             on_timeout=self._stalled)
+        # half the tokens one deadline buys, leaving the rest to other callers sharing the bucket
+        rate = app.config["MARKET_DATA_RATE_LIMIT"]
+        self.batch_size = max(1, int(rate * app.config["MARKET_DATA_TIMEOUT"] / 2)) if rate else None
+        REGISTRY.register(Collected(
+            "market_data_circuit_open", "1 while the market data circuit breaker refuses calls.",
+            ("provider",), lambda: {(self.provider.name,): int(self.breaker.state != "closed")}))
+        REGISTRY.register(Collected(
+            "market_data_hung_calls", "Timed-out upstream calls still holding a fan-out worker.",
+            ("provider",), lambda: {(self.provider.name,): self.fanout.hung}))
+        app.extensions["market_data"] = self
+
+    def _call(self, method, *args, **kwargs):
+        key = (method, args, tuple(sorted(kwargs.items())))
+        return self.flights.do(key, lambda: self._fetch(method, *args, **kwargs))
+
+    def _fetch(self, method, *args, **kwargs):
+        return self._guarded(self.breaker, method, args, kwargs)
+
+    def _guarded(self, breaker, method, args, kwargs):
+        if not breaker.allow():
+            raise CircuitOpen(f"{self.provider.name} unavailable, retrying in {breaker.retry_after():.0f}s")
+        self.limiter.acquire()
+        started = time.perf_counter()
+        call = {"started": started, "stalled": False, "breaker": breaker}
+        with self.lock:
+            self.inflight[id(call)] = call
+        try:
+            result = getattr(self.provider, method)(*args, **kwargs)
+            breaker.success()
+            return result
+        except Exception as e:
+            # a bad symbol means the upstream answered; only outages trip the breaker
+            if not is_upstream_failure(e):
+                breaker.success()
+            elif not call["stalled"]:
+                breaker.failure()
+            upstream_errors.inc(self.provider.name, method)
+            raise
+        finally:
+            with self.lock:
+                del self.inflight[id(call)]
+            upstream_seconds.observe(time.perf_counter() - started, self.provider.name, method)
+
+    def _stalled(self, key):
+        # called for each fan-out call past its deadline; only provider calls that have used
+        # the whole deadline themselves count, each once, however many batches wait on them
+        cutoff = time.perf_counter() - self.fanout.timeout
+        with self.lock:
+            stalled = [call for call in self.inflight.values()
+                       if not call["stalled"] and call["started"] <= cutoff]
+            for call in stalled:
+                call["stalled"] = True
+        for call in stalled:
+            call["breaker"].failure()
+
+    def _fan_out(self, calls):
+        keys = list(calls)
+        size = self.batch_size or len(keys) or 1
+        result = FanOutResult()
+        for start in range(0, len(keys), size):
+            batch = self.fanout.run({key: calls[key] for key in keys[start:start + size]})
+            result.results.update(batch.results)
+            result.errors.update(batch.errors)
+        return result
+
+    def get_quotes(self, tickers):
+        return self._call("get_quotes", tuple(sorted(set(tickers))))
+
+    def get_history(self, ticker, period="1d", interval="1m"):
+        return self._call("get_history", ticker, period=period, interval=interval)
+
+    def get_closes(self, tickers, period="1y", interval="1d"):
+        return self._call("get_closes", tuple(sorted(set(tickers))), period=period, interval=interval)
+
+    def get_info(self, ticker):
+        return self._call("get_info", ticker)
+
+    def get_infos(self, tickers):
+        result = self._fan_out({ticker: (lambda t=ticker: self.get_info(t)) for ticker in tickers})
+        for ticker, error in result.errors.items():
+            logging.warning(f"Info lookup failed for {ticker}: {error}")
+        return result.results
+
+    def get_news(self, ticker):
+        return self._call("get_news", ticker)
+
+    def news_batches(self, tickers, size=5, sleep=time.sleep):
+        """Yield ``{ticker: items}`` for ``tickers``, ``size`` lookups at a time.
+
+        Meant for background ingestion: calls go one by one through their own
+        circuit breaker, so a slow news pass never opens the one pages rely
+        on, and each batch is followed by a pause as long as it took to pay
+        for, leaving at least half the rate limit to requests. Stops early
+        while the upstream is down.
+        """
+        rate = self.limiter.rate
+        for start in range(0, len(tickers), size):
+            if start and rate:
+                sleep(size / rate)
+            feeds = {}
+            for ticker in tickers[start:start + size]:
+                try:
+                    feeds[ticker] = self._guarded(self.news_breaker, "get_news", (ticker,), {})
+                except CircuitOpen as e:
+                    logging.warning(f"News ingestion paused: {e}")
+                    yield feeds
+                    return
+                except Exception as e:
+                    logging.warning(f"News fetch failed for {ticker}: {e}")
+            yield feeds
+
+    def get_statements(self, ticker):
+        # the four statements are independent requests, so fetch them side by side
+        result = self.fanout.run({
+            name: (lambda n=name: self._call("get_statement", ticker, n)) for name in STATEMENTS
+        })
+        if not result.results:
+            raise next(iter(result.errors.values()))
+        for name, error in result.errors.items():
+            logging.warning(f"{name} fetch failed for {ticker}: {error}")
+        return {name: result.results.get(name, pd.DataFrame()) for name in STATEMENTS}
@@ -0,0 +1,117 @@
+import logging
+import random
+import time
+
+from metrics import record_cache
+
+
+class Quotes(dict):
+    """Quotes by ticker; ``stale`` names the ones served past their TTL because a refresh failed."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stale = set()
+
+
+class QuoteCache:
+    """Per-symbol quote cache in front of a batched ``get_quotes`` fetcher.
+
+    Each ticker is cached under its own key, so requests for overlapping
+    ticker lists share entries regardless of order. Only the symbols that
+    miss are sent upstream, in a single batched call.
+
+    Expiry is spread out so entries written together do not all lapse in the
+    same second: each batch gets up to ``jitter`` of its TTL shaved off, and
+    in the last ``early`` fraction of an entry's life a reader refreshes it
+    early with rising probability while everyone else keeps the cached copy.
+
+    ``timeout`` may be a callable returning the TTL to give a fresh batch.
+
+    Entries outlive their TTL by ``stale_timeout`` as a last-known-good copy.
+    When a refresh fails that copy is served and listed in ``Quotes.stale``,
+    and the failed symbols are negative-cached for ``negative_timeout`` so
+    they are not retried on every request. The negative mark is stored in
+    the symbol's own entry (one without a value if there was none), so a
+    read is still one key per symbol.
+    """
+
+    def __init__(self, cache, fetch, timeout=60, prefix="quote:", jitter=0.1, early=0.2,
+                 clock=time.time, rand=random.random, name=None, stale_timeout=86400, negative_timeout=30):
+        self.cache = cache
+        self.fetch = fetch
+        self.timeout = timeout
+        self.prefix = prefix
+        self.name = name or prefix.rstrip(":")
+        self.jitter = jitter
+        self.early = early
+        self.clock = clock
+        self.rand = rand
+        self.stale_timeout = stale_timeout
+        self.negative_timeout = negative_timeout
+
+    def key(self, ticker):
+        return self.prefix + ticker
+
+    def _due(self, entry, now):
+        remaining = entry["expires"] - now
+        window = entry["ttl"] * self.early
+        if remaining > window:
+            return False
+        return self.rand() >= remaining / window if window else True
+
+    def get_quotes(self, tickers):
+        tickers = list(dict.fromkeys(tickers))
+        quotes = Quotes()
+        if not tickers:
+            return quotes
+        now = self.clock()
+        cached = self.cache.get_dict(*[self.key(ticker) for ticker in tickers])
+        missing = []
+        for ticker in tickers:
+            entry = cached.get(self.key(ticker))
+            if entry is not None and entry["value"] is not None:
+                quotes[ticker] = entry["value"]
+                if entry["expires"] <= now:
+                    quotes.stale.add(ticker)
+            if entry is not None and entry.get("failed_until", 0) > now:
+                continue
+            if entry is None or entry["value"] is None or self._due(entry, now):
+                missing.append(ticker)
+        misses = sum(ticker not in quotes for ticker in missing)
+        refreshes = len(missing) - misses
+        record_cache(self.name, hits=len(quotes) - refreshes, misses=misses, refreshes=refreshes)
+        if missing:
+            try:
+                fetched = self.refresh(missing)
+            except Exception as e:
+                logging.warning(f"Refreshing {self.name} for {', '.join(missing)} failed: {e}")
+                fetched = {}
+            failed = [ticker for ticker in missing if ticker not in fetched]
+            if failed:
+                self._mark_failed(failed, cached, now)
+            quotes.update(fetched)
+            quotes.stale.difference_update(fetched)
+        return quotes
+
+    def _mark_failed(self, tickers, cached, now):
+        # a last-known-good entry keeps its value and remaining lifetime
+        marked = {}
+        for ticker in tickers:
+            entry = cached.get(self.key(ticker)) or {"value": None, "expires": now, "ttl": 0}
+            marked[ticker] = dict(entry, failed_until=now + self.negative_timeout)
+        for ticker, entry in marked.items():
+            lifetime = entry["expires"] + self.stale_timeout - now if entry["value"] is not None else 0
+            self.cache.set(self.key(ticker), entry, timeout=max(1, int(max(lifetime, self.negative_timeout))))
+
+    def refresh(self, tickers):
+        fetched = self.fetch(tickers)
+        if fetched:
+            timeout = self.timeout() if callable(self.timeout) else self.timeout
+            ttl = timeout * (1 - self.jitter * self.rand())
+            expires = self.clock() + ttl
+            self.cache.set_many(
+                {self.key(ticker): {"value": value, "expires": expires, "ttl": ttl}
+                 for ticker, value in fetched.items()},
+                timeout=max(1, int(ttl + self.stale_timeout))
+            )
+        return fetched
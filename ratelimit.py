@@ -0,0 +1,49 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket used to pace upstream calls.
+
+    ``rate`` tokens are added per second up to ``capacity``. A rate of ``None``
+    or ``0`` disables limiting entirely.
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate or 1)
+        self.tokens = float(self.capacity)
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, tokens=1):
+        if not self.rate:
+            return True
+        with self.lock:
+            self._refill(self.clock())
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens=1, timeout=None):
+        if not self.rate:
+            return True
+        deadline = None if timeout is None else self.clock() + timeout
+        while True:
+            with self.lock:
+                now = self.clock()
+                self._refill(now)
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return True
+                wait = (tokens - self.tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            self.sleep(wait)
@@ -0,0 +1,77 @@
+import logging
+import os
+import threading
+import time
+
+
+class Refresher:
+    """Keeps a warm snapshot of ``fn()`` refreshed by a background thread.
+
+    ``get`` never blocks on the upstream fetch: it returns the last good
+    snapshot (stale-while-revalidate) and the daemon thread replaces it every
+    ``interval`` seconds. Failed refreshes keep the previous snapshot.
+    ``interval`` may be a callable, asked again before every sleep.
+    """
+
+    def __init__(self, fn, interval, default=None, app=None):
+        self.fn = fn
+        self.interval = interval
+        self.app = app
+        self.value = default
+        self.updated_at = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    @property
+    def age(self):
+        if self.updated_at is None:
+            return None
+        return time.time() - self.updated_at
+
+    def next_interval(self):
+        return self.interval() if callable(self.interval) else self.interval
+
+    @property
+    def stale(self):
+        return self.updated_at is None or self.age > self.next_interval()
+
+    def get(self):
+        self.start()
+        return self.value
+
+    def refresh(self):
+        try:
+            if self.app is not None:
+                with self.app.app_context():
+                    value = self.fn()
+            else:
+                value = self.fn()
+        except Exception:
+            logging.exception("Background refresh failed; keeping previous snapshot")
+            return False
+        with self._lock:
+            self.value = value
+            self.updated_at = time.time()
+        return True
+
+    def start(self):
+        # threads do not survive a fork, so each worker process starts its own
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="refresher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.next_interval())
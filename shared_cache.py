@@ -0,0 +1,180 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from flask_caching.backends.base import BaseCache
+
+
+class SQLiteCache(BaseCache):
+    """Host-wide cache shared by every worker process through one SQLite file.
+
+    Entries carry their own expiry, the table is bounded to ``threshold``
+    rows with least-recently-used eviction, and hit/miss/eviction counters
+    are kept per process for metrics. Select it with
+    ``CACHE_TYPE = 'shared_cache.SQLiteCache'``; ``CACHE_DIR`` picks the
+    directory holding the database file.
+    """
+
+    # only rewrite the access time this often, so hot reads stay read-only
+    touch_interval = 5
+
+    def __init__(self, path, threshold=500, default_timeout=300):
+        super().__init__(default_timeout=default_timeout)
+        self.path = path
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.evicted = {}
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+                "expires REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)")
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        directory = config.get("CACHE_DIR") or app.instance_path
+        kwargs.update(threshold=config["CACHE_THRESHOLD"])
+        return cls(os.path.join(directory, "cache.sqlite"), *args, **kwargs)
+
+    def _conn(self):
+        # sqlite connections must not cross threads or forked processes
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _expires(self, timeout):
+        timeout = self._normalize_timeout(timeout)
+        return 0 if timeout == 0 else time.time() + timeout
+
+    def _count(self, hits=0, misses=0, evicted=()):
+        with self._stats_lock:
+            self.hits += hits
+            self.misses += misses
+            self.evictions += len(evicted)
+            for key in evicted:
+                # "quote:AAPL" -> "quote", so evictions can be told apart per cache
+                prefix = key.split(":", 1)[0]
+                self.evicted[prefix] = self.evicted.get(prefix, 0) + 1
+
+    def get_dict(self, *keys):
+        if not keys:
+            return {}
+        now = time.time()
+        conn = self._conn()
+        placeholders = ",".join("?" * len(keys))
+        rows = conn.execute(
+            f"SELECT key, value, accessed FROM cache WHERE key IN ({placeholders}) "
+            "AND (expires = 0 OR expires > ?)",
+            (*keys, now)
+        ).fetchall()
+        found = {}
+        touched = []
+        for key, value, accessed in rows:
+            try:
+                found[key] = pickle.loads(value)
+            except (pickle.PickleError, EOFError, AttributeError):
+                continue
+            if now - accessed > self.touch_interval:
+                touched.append((now, key))
+        if touched:
+            conn.executemany("UPDATE cache SET accessed = ? WHERE key = ?", touched)
+        self._count(hits=len(found), misses=len(set(keys)) - len(found))
+        return {key: found.get(key) for key in keys}
+
+    def get(self, key):
+        return self.get_dict(key)[key]
+
+    def get_many(self, *keys):
+        found = self.get_dict(*keys)
+        return [found[key] for key in keys]
+
+    def has(self, key):
+        row = self._conn().execute(
+            "SELECT 1 FROM cache WHERE key = ? AND (expires = 0 OR expires > ?)",
+            (key, time.time())
+        ).fetchone()
+        return row is not None
+
+    def set_many(self, mapping, timeout=None):
+        now = time.time()
+        expires = self._expires(timeout)
+        rows = [(key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), expires, now)
+                for key, value in mapping.items()]
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO cache (key, value, expires, accessed) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._prune(conn, now)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return list(mapping)
+
+    def set(self, key, value, timeout=None):
+        self.set_many({key: value}, timeout)
+        return True
+
+    def add(self, key, value, timeout=None):
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM cache WHERE key = ? AND expires != 0 AND expires <= ?", (key, now))
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO cache (key, value, expires, accessed) VALUES (?, ?, ?, ?)",
+                (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), self._expires(timeout), now)
+            )
+            self._prune(conn, now)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return cursor.rowcount == 1
+
+    def delete_many(self, *keys):
+        if not keys:
+            return []
+        placeholders = ",".join("?" * len(keys))
+        self._conn().execute(f"DELETE FROM cache WHERE key IN ({placeholders})", keys)
+        return list(keys)
+
+    def delete(self, key):
+        return bool(self.delete_many(key))
+
+    def clear(self):
+        self._conn().execute("DELETE FROM cache")
+        return True
+
+    def _prune(self, conn, now):
+        conn.execute("DELETE FROM cache WHERE expires != 0 AND expires <= ?", (now,))
+        size = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        if size > self.threshold:
+            evicted = [key for (key,) in conn.execute(
+                "SELECT key FROM cache ORDER BY accessed LIMIT ?", (size - self.threshold,)
+            )]
+            conn.executemany("DELETE FROM cache WHERE key = ?", [(key,) for key in evicted])
+            self._count(evicted=evicted)
+
+    def stats(self):
+        size = self._conn().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": size}
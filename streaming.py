@@ -0,0 +1,171 @@
+import json
+import logging
+import queue
+import random
+import threading
+import time
+
+from lazy import lazy_import
+
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+class StoreFeed:
+    """Reads new intraday bars for a symbol out of the OHLCV store.
+
+    The store only goes upstream when its tail is stale, so every poller
+    shares the same refresh window.
+    """
+
+    def __init__(self, store, period="1d", interval="1m"):
+        self.store = store
+        self.period = period
+        self.interval = interval
+
+    def poll(self, ticker, since):
+        bars = self.store.get(ticker, period=self.period, interval=self.interval)
+        if not len(bars.ts):
+            return []
+        start = len(bars.ts) - 1 if since is None else np.searchsorted(bars.ts, since, side="left")
+        times = pd.to_datetime(bars.ts[start:].astype("int64"), unit="s", utc=True).tz_convert(bars.tz)
+        return [
+            {"t": int(ts), "time": label, "price": float(close), "volume": float(volume)}
+            for ts, label, close, volume in zip(
+                bars.ts[start:], times.strftime("%H:%M"), bars.close[start:], bars.volume[start:]
+            )
+            if close == close
+        ]
+
+
+class SimulatedFeed:
+    """Local random-walk feed that emits one new bar per poll, for tests and demos."""
+
+    def __init__(self, start_price=100.0, step=60, seed=0):
+        self.start_price = start_price
+        self.step = step
+        self.random = random.Random(seed)
+        self.state = {}
+        self.polls = 0
+
+    def poll(self, ticker, since):
+        self.polls += 1
+        ts, price = self.state.get(ticker, (int(time.time()) // self.step * self.step, self.start_price))
+        ts += self.step
+        price = round(price * (1 + self.random.gauss(0, 0.001)), 4)
+        self.state[ticker] = (ts, price)
+        label = time.strftime("%H:%M", time.gmtime(ts))
+        return [{"t": ts, "time": label, "price": price, "volume": float(self.random.randint(100, 10000))}]
+
+
+class Channel:
+    def __init__(self, ticker):
+        self.ticker = ticker
+        self.subscribers = set()
+        self.stop = threading.Event()
+        self.last = None
+        self.thread = None
+
+
+class QuoteHub:
+    """Fans one upstream poller per symbol out to any number of SSE subscribers.
+
+    The poller starts with the first subscriber and stops with the last, and
+    only bars that are new or whose price changed since the previous poll are
+    pushed. Upstream traffic therefore scales with symbols, not open tabs.
+    """
+
+    def __init__(self, feed, interval=15, queue_size=100):
+        self.feed = feed
+        self.interval = interval
+        self.queue_size = queue_size
+        self.channels = {}
+        self.lock = threading.Lock()
+
+    def subscribe(self, ticker):
+        subscriber = queue.Queue(maxsize=self.queue_size)
+        with self.lock:
+            channel = self.channels.get(ticker)
+            if channel is None:
+                channel = self.channels[ticker] = Channel(ticker)
+                channel.thread = threading.Thread(
+                    target=self._run, args=(channel,), name=f"quotes-{ticker}", daemon=True
+                )
+                channel.thread.start()
+            channel.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, ticker, subscriber):
+        with self.lock:
+            channel = self.channels.get(ticker)
+            if channel is None:
+                return
+            channel.subscribers.discard(subscriber)
+            if not channel.subscribers:
+                channel.stop.set()
+                del self.channels[ticker]
+
+    def _changes(self, channel, bars):
+        changes = []
+        for bar in bars:
+            if channel.last is not None:
+                last_t, last_price = channel.last
+                if bar["t"] < last_t or (bar["t"] == last_t and bar["price"] == last_price):
+                    continue
+            changes.append(bar)
+            channel.last = (bar["t"], bar["price"])
+        return changes
+
+    def _publish(self, channel, events):
+        with self.lock:
+            subscribers = list(channel.subscribers)
+        for subscriber in subscribers:
+            for event in events:
+                try:
+                    subscriber.put_nowait(event)
+                except queue.Full:
+                    # slow consumer: drop its oldest bar rather than block the poller
+                    try:
+                        subscriber.get_nowait()
+                    except queue.Empty:
+                        pass
+                    subscriber.put_nowait(event)
+
+    def _run(self, channel):
+        first = True
+        while not channel.stop.is_set():
+            try:
+                since = channel.last[0] if channel.last else None
+                bars = self.feed.poll(channel.ticker, since)
+                changes = self._changes(channel, bars)
+                # subscribers load the current chart themselves; only push what comes after
+                if changes and not first:
+                    self._publish(channel, changes)
+                first = False
+            except Exception:
+                logging.exception(f"Quote poll failed for {channel.ticker}")
+            channel.stop.wait(self.interval)
+
+    def stream(self, ticker, heartbeat=15, lifetime=None, clock=time.monotonic):
+        # a stream holds a worker thread, so it ends after ``lifetime`` seconds
+        # and the browser's EventSource reconnects after the ``retry`` delay
+        deadline = clock() + lifetime if lifetime else None
+        subscriber = self.subscribe(ticker)
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                timeout = heartbeat
+                if deadline is not None:
+                    remaining = deadline - clock()
+                    if remaining <= 0:
+                        return
+                    timeout = min(heartbeat, remaining)
+                try:
+                    event = subscriber.get(timeout=timeout)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: bar\ndata: {json.dumps(event)}\n\n"
+        finally:
+            self.unsubscribe(ticker, subscriber)
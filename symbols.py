@@ -0,0 +1,133 @@
+import bisect
+import csv
+import io
+import os
+import re
+import urllib.request
+
+
+BUNDLED = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "symbols.csv")
+
+# NASDAQ Trader publishes every US-listed symbol twice a day
+NASDAQ_LISTED = "https://www.nasdaqtrader.com/dynamic/SymDir/nasdaqlisted.txt"
+OTHER_LISTED = "https://www.nasdaqtrader.com/dynamic/SymDir/otherlisted.txt"
+OTHER_EXCHANGES = {"A": "NYSE AMERICAN", "N": "NYSE", "P": "NYSE ARCA", "Z": "CBOE", "V": "IEX"}
+# Yahoo spellings: BRK-B, SHOP.TO, ^GSPC, EURUSD=X; at most 10 characters to fit the ticker columns
+SYMBOL_FORMAT = re.compile(r"^\^?[A-Z0-9][A-Z0-9.\-=]{0,9}$")
+
+
+class SymbolIndex:
+    """In-memory symbol master used for validation and autocomplete.
+
+    Membership is a dict lookup. Prefix search runs over two sorted lists,
+    one of symbols and one of lower-cased names, so a query is a pair of
+    bisections plus a slice however large the universe is.
+    """
+
+    def __init__(self, rows=()):
+        self.entries = {}
+        for symbol, name, exchange in rows:
+            self.entries[symbol.upper()] = (name, exchange)
+        self.symbols = sorted(self.entries)
+        self.names = sorted((name.lower(), symbol) for symbol, (name, _) in self.entries.items() if name)
+
+    @classmethod
+    def from_csv(cls, path):
+        with open(path, newline="") as f:
+            return cls((row["symbol"], row.get("name", ""), row.get("exchange", "")) for row in csv.DictReader(f))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, symbol):
+        return symbol in self.entries
+
+    def known(self, symbols):
+        return {symbol for symbol in symbols if symbol in self.entries}
+
+    def get(self, symbol):
+        entry = self.entries.get(symbol)
+        if entry is None:
+            return None
+        return {"symbol": symbol, "name": entry[0], "exchange": entry[1]}
+
+    def search(self, query, limit=10):
+        query = query.strip()
+        if not query:
+            return []
+        prefix = query.upper()
+        start = bisect.bisect_left(self.symbols, prefix)
+        matches = []
+        for symbol in self.symbols[start:start + limit]:
+            if not symbol.startswith(prefix):
+                break
+            matches.append(symbol)
+        if len(matches) < limit:
+            prefix = query.lower()
+            start = bisect.bisect_left(self.names, (prefix,))
+            for name, symbol in self.names[start:]:
+                if len(matches) >= limit or not name.startswith(prefix):
+                    break
+                if symbol not in matches:
+                    matches.append(symbol)
+        return [self.get(symbol) for symbol in matches]
+
+
+class SymbolValidator:
+    """Accepts what the index lists and asks upstream about everything else.
+
+    The index only covers US listings, so a symbol it does not know (a
+    foreign suffix, a fund, a new listing) is looked up through ``lookup``,
+    a batched fetcher such as ``QuoteCache.get_quotes`` whose cache and
+    negative cache keep repeated checks off the upstream. Strings that
+    cannot be a symbol are rejected without a lookup.
+    """
+
+    def __init__(self, index, lookup):
+        self.index = index
+        self.lookup = lookup
+
+    def known(self, symbols):
+        symbols = set(symbols)
+        found = self.index.known(symbols)
+        rest = sorted(symbol for symbol in symbols - found if len(symbol) <= 10 and SYMBOL_FORMAT.match(symbol))
+        if rest:
+            found.update(symbol for symbol in self.lookup(rest) if symbol in rest)
+        return found
+
+    def __contains__(self, symbol):
+        return symbol in self.known([symbol])
+
+
+def parse_nasdaq_directory(text, exchange=None):
+    # pipe-delimited with a header row and a "File Creation Time" trailer
+    rows = []
+    for row in csv.DictReader(io.StringIO(text), delimiter="|"):
+        symbol = row.get("Symbol") or row.get("ACT Symbol")
+        if not symbol or symbol.startswith("File Creation Time") or row.get("Test Issue") == "Y":
+            continue
+        name = row.get("Security Name", "").split(" - ")[0].strip()
+        venue = exchange or OTHER_EXCHANGES.get(row.get("Exchange"), row.get("Exchange", ""))
+        # Yahoo writes class shares as BRK-B rather than BRK.B
+        rows.append((symbol.replace(".", "-"), name, venue))
+    return rows
+
+
+def download_symbols(timeout=30):
+    rows = []
+    for url, exchange in ((NASDAQ_LISTED, "NASDAQ"), (OTHER_LISTED, None)):
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            rows.extend(parse_nasdaq_directory(response.read().decode("utf-8"), exchange))
+    return rows
+
+
+def write_symbols(path, rows):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["symbol", "name", "exchange"])
+        writer.writerows(sorted(set(rows)))
+    os.replace(tmp, path)
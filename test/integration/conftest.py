@@ -0,0 +1,93 @@
+import threading
+
+import pytest
+from app import create_app, db
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        'CACHE_DIR': str(tmp_path),
+        'OHLCV_STORE_DIR': str(tmp_path / 'ohlcv'),
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+        'WTF_CSRF_ENABLED': False,
+        'MARKET_DATA_PROVIDER': 'fixture',
+        'MARKET_DATA_RATE_LIMIT': None
+    })
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    with app.test_client() as client:
+        yield client
+
+
+class QueryCounter:
+    # background refreshers share the engine; only the test's own thread is counted
+    def __init__(self):
+        self.statements = []
+        self.thread = threading.get_ident()
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() == self.thread:
+            self.statements.append(statement)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+@pytest.fixture
+def count_queries(app):
+    """Records every SQL statement sent while the returned counter is active.
+
+        with count_queries() as queries:
+            client.get('/dashboard')
+        assert queries.count <= 3
+    """
+    from contextlib import contextmanager
+    from sqlalchemy import event
+
+    @contextmanager
+    def counting():
+        counter = QueryCounter()
+        event.listen(db.engine, 'before_cursor_execute', counter)
+        try:
+            yield counter
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', counter)
+
+    return counting
+
+
+@pytest.fixture
+def login(client):
+    def register_and_login(username='testuser', password='SecurePass123'):
+        client.post('/register', data={
+            'username': username,
+            'email': f'{username}@example.com',
+            'password': password
+        })
+        client.post('/login', data={'username': username, 'password': password})
+        from models import User
+        return User.query.filter_by(username=username).first()
+
+    return register_and_login
+
+
+@pytest.fixture
+def unknown_symbols(monkeypatch):
+    """The fixture backend knows every symbol; this makes it return no quotes for some."""
+    from app import market_data
+
+    def hide(*symbols):
+        original = market_data.provider.get_quotes
+        monkeypatch.setattr(market_data.provider, 'get_quotes',
+                            lambda tickers: {t: q for t, q in original(tickers).items() if t not in symbols})
+
+    return hide
@@ -0,0 +1,53 @@
+from app import market_data
+from models import PriceAlert
+
+
+def test_alerts_only_on_followed_tickers(client, login):
+    login()
+    response = client.post('/api/alerts', json={'ticker': 'AAPL', 'kind': 'above', 'threshold': 1})
+    assert response.status_code == 400
+
+    client.post('/watchlist', data={'ticker': 'AAPL'})
+    response = client.post('/api/alerts', json={'ticker': 'aapl', 'kind': 'sideways', 'threshold': 1})
+    assert response.status_code == 400
+    response = client.post('/api/alerts', json=['AAPL', 'above', 1])
+    assert response.status_code == 400
+    response = client.post('/api/alerts', data={'ticker': 'aapl', 'kind': 'below', 'threshold': '1'})
+    assert response.status_code == 201
+
+    response = client.post('/api/alerts', json={'ticker': 'aapl', 'kind': 'above', 'threshold': 1})
+    assert response.status_code == 201
+    alert = response.get_json()
+    assert alert['ticker'] == 'AAPL' and alert['active']
+
+    assert client.delete(f"/api/alerts/{alert['id']}").status_code == 204
+    assert client.delete(f"/api/alerts/{alert['id']}").status_code == 404
+
+
+def test_tick_fetches_every_symbol_once_and_fires_crossed_alerts(app, client, login, monkeypatch):
+    user = login()
+    client.post('/watchlist', data={'ticker': 'AAPL'})
+    client.post('/add_to_portfolio', data={'ticker': 'MSFT'})
+    for ticker, kind, threshold in (('AAPL', 'above', 1), ('AAPL', 'below', 1), ('MSFT', 'above', 1e9),
+                                    ('MSFT', 'below', 1e9)):
+        client.post('/api/alerts', json={'ticker': ticker, 'kind': kind, 'threshold': threshold})
+
+    calls = []
+    original = market_data.provider.get_quotes
+
+    def counting(tickers):
+        calls.append(sorted(tickers))
+        return original(tickers)
+
+    monkeypatch.setattr(market_data.provider, 'get_quotes', counting)
+    engine = app.extensions['alerts']
+    fired = engine.tick()
+
+    assert calls == [['AAPL', 'MSFT']]
+    assert sorted((alert['ticker'], alert['kind']) for alert in fired) == [('AAPL', 'above'), ('MSFT', 'below')]
+    assert [n['alert_id'] for n in engine.sink.for_user(user.id)] == [alert['alert_id'] for alert in fired]
+    assert PriceAlert.query.filter_by(active=True).count() == 2
+
+    # fired alerts are switched off, so the next tick sends nothing new
+    assert engine.tick() == []
+    assert len(engine.sink.for_user(user.id)) == 2
@@ -1,22 +1,7 @@
-import pytest
-from app import create_app, db
-from models import User
-
-
-@pytest.fixture
-def client():
-    app = create_app()
-    app.config.update({
-        'TESTING': True,
-        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
-        'WTF_CSRF_ENABLED': False
-    })
+from sqlalchemy import inspect, text
 
-    with app.test_client() as client:
-        with app.app_context():
-            db.create_all()
-        yield client
-        db.drop_all()
+from app import create_app, db
+from models import Portfolio, User, insert_ignore
 
 
 def test_user_registration(client):
@@ -32,4 +17,44 @@ def test_user_registration(client):
     with client.application.app_context():
         user = User.query.filter_by(username='testuser').first()
         assert user is not None
-        assert user.email == 'test@example.com'
\ No newline at end of file
+        assert user.email == 'test@example.com'
+
+def test_schema_is_created_by_init_db_not_create_app(tmp_path):
+    app = create_app({
+        'CACHE_DIR': str(tmp_path),
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + str(tmp_path / 'app.db'),
+        'MARKET_DATA_PROVIDER': 'fixture'
+    })
+    with app.app_context():
+        assert not inspect(db.engine).has_table('user')
+
+    result = app.test_cli_runner().invoke(args=['init-db'])
+    assert result.exit_code == 0
+    with app.app_context():
+        assert inspect(db.engine).has_table('user')
+
+
+def test_init_db_adds_portfolio_constraint_to_old_tables(tmp_path):
+    app = create_app({
+        'CACHE_DIR': str(tmp_path),
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + str(tmp_path / 'old.db'),
+        'MARKET_DATA_PROVIDER': 'fixture'
+    })
+    with app.app_context():
+        with db.engine.begin() as conn:
+            # the portfolio table as it was created before the unique constraint
+            conn.execute(text('CREATE TABLE portfolio (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, '
+                              'ticker VARCHAR(10) NOT NULL, quantity INTEGER, added_at DATETIME)'))
+            conn.execute(text("INSERT INTO portfolio (user_id, ticker, quantity) VALUES "
+                              "(1, 'AAPL', 5), (1, 'AAPL', 7), (1, 'MSFT', 1), (2, 'AAPL', 3)"))
+
+    result = app.test_cli_runner().invoke(args=['init-db'])
+    assert 'uq_portfolio_user_ticker' in result.output
+
+    with app.app_context():
+        rows = db.session.query(Portfolio.user_id, Portfolio.ticker, Portfolio.quantity).order_by(Portfolio.id).all()
+        assert rows == [(1, 'AAPL', 5), (1, 'MSFT', 1), (2, 'AAPL', 3)]
+        assert insert_ignore(Portfolio, [{'user_id': 1, 'ticker': 'AAPL', 'quantity': 9}]) == 0
+    assert app.test_cli_runner().invoke(args=['init-db']).exit_code == 0
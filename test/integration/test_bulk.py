@@ -0,0 +1,78 @@
+import io
+import json
+import time
+
+from models import Portfolio, WatchlistEntry
+
+
+def test_csv_import_validates_and_skips_held_tickers(client, login, unknown_symbols):
+    unknown_symbols('NOTREAL')
+    user = login()
+    client.post('/add_to_portfolio', data={'ticker': 'AAPL', 'quantity': 1})
+    body = "Ticker,Quantity\naapl,5\nMSFT,10\nNOTREAL,1\nTSLA,-2\nNVDA,x\nmsft,3\nGOOGL,\n"
+
+    response = client.post('/portfolio/import', data=body, content_type='text/csv')
+
+    summary = response.get_json()
+    assert response.status_code == 200
+    assert summary['rows'] == 7
+    assert summary['added'] == 2
+    assert summary['existing'] == 1
+    assert summary['duplicates'] == 1
+    assert summary['invalid'] == 3
+    assert [error['line'] for error in summary['errors']] == [4, 5, 6]
+    holdings = {entry.ticker: entry.quantity for entry in Portfolio.query.filter_by(user_id=user.id)}
+    assert holdings == {'AAPL': 1, 'MSFT': 10, 'GOOGL': 0}
+
+
+def test_json_lines_and_array_uploads(client, login):
+    user = login()
+    lines = b'{"ticker": "AMD", "quantity": 4}\n\n"INTC"\n'
+    client.post('/watchlist/import?format=json', data={'file': (io.BytesIO(lines), 'list.jsonl')},
+                headers={'Accept': 'application/json'})
+    client.post('/watchlist/import', data=json.dumps([{"ticker": "KO"}]), content_type='application/json')
+
+    tickers = {entry.ticker for entry in WatchlistEntry.query.filter_by(user_id=user.id)}
+    assert tickers == {'AMD', 'INTC', 'KO'}
+
+
+def test_form_upload_redirects_with_summary(client, login):
+    login()
+    response = client.post('/portfolio/import', data={'file': (io.BytesIO(b'ticker\nAAPL\n'), 'p.csv')},
+                           headers={'Accept': 'text/html'}, follow_redirects=True)
+    assert b'Imported 1 of 1 rows' in response.data
+
+
+def test_bad_upload_is_rejected(client, login):
+    login()
+    response = client.post('/portfolio/import', data='symbol\nAAPL\n', content_type='text/csv')
+    assert response.status_code == 400
+    assert 'ticker' in response.get_json()['error']
+
+
+def test_export_round_trip(client, login):
+    login()
+    rows = "\n".join(["ticker,quantity", "AAPL,3", "MSFT,7"])
+    client.post('/portfolio/import', data=rows, content_type='text/csv')
+
+    response = client.get('/portfolio/export')
+    assert response.is_streamed
+    assert response.mimetype == 'text/csv'
+    assert response.get_data(as_text=True).splitlines() == ["ticker,quantity", "AAPL,3", "MSFT,7"]
+
+    exported = client.get('/portfolio/export?format=json').get_json()
+    assert exported == [{"ticker": "AAPL", "quantity": 3}, {"ticker": "MSFT", "quantity": 7}]
+
+
+def test_large_import_is_one_transaction(app, client, login, count_queries):
+    login()
+    symbols = app.extensions['symbols'].symbols
+    body = "ticker,quantity\n" + "\n".join(f"{symbols[i % len(symbols)]},{i}" for i in range(5000))
+
+    started = time.perf_counter()
+    with count_queries() as queries:
+        response = client.post('/portfolio/import', data=body, content_type='text/csv')
+    assert time.perf_counter() - started < 5
+    assert response.get_json()['rows'] == 5000
+    inserts = [statement for statement in queries.statements if statement.startswith('INSERT')]
+    assert len(inserts) <= 5
@@ -0,0 +1,33 @@
+from app import cache, market_data
+
+
+def test_outage_serves_last_known_good_quotes(client, monkeypatch):
+    client.get('/search?ticker=NVDA')
+    entry = cache.get('quote:NVDA')
+    cache.set('quote:NVDA', dict(entry, expires=0))
+
+    calls = []
+
+    def down(tickers):
+        calls.append(tickers)
+        raise ConnectionError("Too Many Requests. Rate limited.")
+
+    monkeypatch.setattr(market_data.provider, 'get_quotes', down)
+
+    response = client.get('/search?ticker=NVDA')
+    assert response.status_code == 200
+    assert b'(delayed)' in response.data
+    assert b'Failed to fetch' not in response.data
+
+    # the failure is negative-cached, so the next page view does not retry upstream
+    client.get('/search?ticker=NVDA')
+    assert len(calls) == 1
+
+
+def test_stock_price_without_stored_bars_is_unavailable(client, monkeypatch):
+    def down(*args, **kwargs):
+        raise ConnectionError("upstream down")
+
+    monkeypatch.setattr(market_data.provider, 'get_history', down)
+    response = client.get('/api/stock-price/AAPL?range=6mo')
+    assert response.status_code == 503
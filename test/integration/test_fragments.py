@@ -0,0 +1,41 @@
+from flask import render_template_string
+
+import fragments
+from app import cache
+from fragments import FragmentCache, data_version
+
+
+def test_shared_sections_are_rendered_once(app, client, monkeypatch):
+    app.extensions['core_data'].refresh()
+    app.extensions['news'].refresh()
+    rendered = []
+    original = fragments.render_template
+
+    def counting(template, **context):
+        rendered.append(template)
+        return original(template, **context)
+
+    monkeypatch.setattr(fragments, 'render_template', counting)
+
+    first = client.get('/')
+    second = client.get('/')
+
+    assert first.status_code == second.status_code == 200
+    assert first.data == second.data
+    assert b'Global Indices' in second.data and b'Latest News' in second.data
+    assert rendered.count('fragments/news.html') == 1
+    assert rendered.count('fragments/market_indices.html') == 1
+
+
+def test_new_data_renders_a_new_fragment(app):
+    fragment_cache = FragmentCache(cache)
+    with app.test_request_context():
+        first = fragment_cache.render('fragments/news.html', news=[{'title': 'One', 'link': '#', 'publisher': 'P'}])
+        again = fragment_cache.render('fragments/news.html', news=[{'title': 'One', 'link': '#', 'publisher': 'P'}])
+        changed = fragment_cache.render('fragments/news.html', news=[{'title': 'Two', 'link': '#', 'publisher': 'P'}])
+
+        assert first == again
+        assert 'One' in first and 'Two' in changed
+        # Markup is inserted into the page without escaping
+        assert '<div' in render_template_string('{{ html }}', html=changed)
+    assert data_version({'a': 1, 'b': 2}) == data_version({'b': 2, 'a': 1})
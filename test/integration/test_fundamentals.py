@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.dialects import sqlite
+
+from fundamentals import FundamentalsStore, serialize_statement
+from models import FinancialStatement, db
+from providers import FixtureProvider, STATEMENTS
+
+
+class CountingStatements:
+    def __init__(self):
+        self.provider = FixtureProvider()
+        self.calls = 0
+        self.scale = 1.0
+
+    def __call__(self, ticker):
+        self.calls += 1
+        return {name: self.provider.get_statement(ticker, name) * self.scale for name in STATEMENTS}
+
+
+def test_repeat_views_skip_upstream(app):
+    fetch = CountingStatements()
+    store = FundamentalsStore(fetch)
+    first = store.get("AAPL")
+    second = store.get("AAPL")
+    assert fetch.calls == 1
+    assert first == second
+    assert first["income_stmt"]["columns"][0] == "Total Revenue"
+    assert first["income_stmt"]["data"][0][0].startswith("$")
+
+
+def test_stale_refresh_detects_changes(app):
+    fetch = CountingStatements()
+    store = FundamentalsStore(fetch, ttl=timedelta(days=7))
+    original = store.get("AAPL")
+
+    def expire():
+        FinancialStatement.query.update({"fetched_at": datetime.utcnow() - timedelta(days=8)})
+        db.session.commit()
+
+    expire()
+    unchanged = {row.statement: row.updated_at for row in FinancialStatement.query}
+    assert store.get("AAPL") == original
+    assert fetch.calls == 2
+    assert {row.statement: row.updated_at for row in FinancialStatement.query} == unchanged
+
+    expire()
+    fetch.scale = 2.0
+    restated = store.get("AAPL")
+    assert restated["income_stmt"]["data"] != original["income_stmt"]["data"]
+    assert FinancialStatement.query.count() == len(STATEMENTS)
+
+
+def test_failed_refresh_serves_stored_copy(app):
+    fetch = CountingStatements()
+    store = FundamentalsStore(fetch, ttl=timedelta(0))
+    stored = store.get("AAPL")
+
+    def broken(ticker):
+        raise RuntimeError("upstream down")
+
+    store.fetch = broken
+    assert store.get("AAPL") == stored
+
+
+def test_company_page_renders_stored_payload(client):
+    response = client.post('/company', data={'ticker': 'AAPL'})
+    assert response.status_code == 200
+    assert b'Total Revenue' in response.data
+    assert FinancialStatement.query.filter_by(ticker='AAPL').count() == len(STATEMENTS)
+
+
+def test_concurrent_first_refresh_keeps_one_row_per_period(app):
+    fetch = CountingStatements()
+    now = datetime.utcnow()
+    theirs = []
+    for name, frame in fetch("AAPL").items():
+        period_end, payload = serialize_statement(frame)
+        theirs.append({"ticker": "AAPL", "statement": name, "period_end": period_end, "payload": payload,
+                       "content_hash": "theirs", "fetched_at": now, "updated_at": now})
+
+    def other_worker(conn, cursor, statement, parameters, context, executemany):
+        # the other worker's rows land right after this refresh first looks a period up
+        if not theirs or not statement.startswith("SELECT") or "period_end = " not in statement:
+            return
+        rows = theirs[:]
+        del theirs[:]
+        conn.execute(sqlite.insert(FinancialStatement.__table__).on_conflict_do_nothing(), rows)
+
+    event.listen(db.engine, 'after_cursor_execute', other_worker)
+    try:
+        statements = FundamentalsStore(fetch).get("AAPL")
+    finally:
+        event.remove(db.engine, 'after_cursor_execute', other_worker)
+    assert statements["income_stmt"]["columns"][0] == "Total Revenue"
+    assert FinancialStatement.query.count() == len(STATEMENTS)
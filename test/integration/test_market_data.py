@@ -0,0 +1,159 @@
+import gzip
+import json
+import os
+import time
+
+from streaming import SimulatedFeed
+
+
+def test_index_renders_from_provider(app, client):
+    app.extensions['core_data'].refresh()
+    response = client.get('/')
+    assert response.status_code == 200
+    assert b'AAPL Inc.' in response.data
+
+
+def test_workers_share_the_core_data_fetch(app, tmp_path, monkeypatch):
+    from app import create_app, market_data
+
+    calls = []
+    original = market_data.provider.get_quotes
+    monkeypatch.setattr(market_data.provider, 'get_quotes', lambda tickers: calls.append(tickers) or original(tickers))
+    app.extensions['core_data'].refresh()
+    # a second worker on the same host reads the snapshot out of the shared cache
+    other = create_app(dict(app.config, CACHE_DIR=str(tmp_path)))
+    monkeypatch.setattr(market_data.provider, 'get_quotes', lambda tickers: calls.append(tickers) or original(tickers))
+    assert other.extensions['core_data'].refresh()
+    assert len(calls) == 1
+    assert other.extensions['core_data'].value["stocks"]["AAPL"]["price"]
+
+
+def test_index_does_not_wait_for_cold_snapshot(app, client):
+    refresher = app.extensions['core_data']
+    refresher.fn = lambda: time.sleep(5)
+    started = time.monotonic()
+    response = client.get('/')
+    assert response.status_code == 200
+    assert time.monotonic() - started < 1
+    refresher.stop()
+
+
+def test_search_uses_batched_quotes(client):
+    response = client.get('/search?ticker=NVDA')
+    assert response.status_code == 200
+    assert b'Search Result: NVDA' in response.data
+
+
+def test_stock_price_api(client):
+    response = client.get('/api/stock-price/AAPL?range=6mo')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert len(data['offsets']) == len(data['prices']) > 0
+    assert data['offsets'][0] == 0
+    assert response.headers['Cache-Control'] == 'public, max-age=300'
+
+    cached = client.get('/api/stock-price/AAPL?range=6mo', headers={'If-None-Match': response.headers['ETag']})
+    assert cached.status_code == 304
+
+
+def test_stock_price_api_decimates_and_compresses(client):
+    response = client.get('/api/stock-price/AAPL?range=2y', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    data = json.loads(gzip.decompress(response.data))
+    assert len(data['prices']) <= 260
+
+
+def test_chart_apis_reject_path_like_symbols(app, client):
+    for url in ('/api/stock-price/..etc?range=1d', '/api/indicators/a.b?range=6mo'):
+        response = client.get(url)
+        assert response.status_code == 400
+    assert os.listdir(app.config['OHLCV_STORE_DIR']) == []
+
+
+def test_company_and_analysis(client):
+    response = client.post('/company', data={'ticker': 'AAPL'})
+    assert response.status_code == 200
+    assert b'Total Revenue' in response.data
+
+    response = client.post('/analysis', data={'ticker': 'AAPL'})
+    assert response.status_code == 200
+    assert b'AAPL Incorporated' in response.data
+
+
+def test_stream_endpoint_pushes_bars(app, client):
+    hub = app.extensions['quote_hub']
+    hub.feed = SimulatedFeed()
+    hub.interval = 0.01
+    response = client.get('/api/stream/AAPL', buffered=False)
+    assert response.mimetype == 'text/event-stream'
+    chunks = iter(response.response)
+    assert next(chunks) == b'retry: 5000\n\n'
+    assert next(chunks).startswith(b'event: bar\n')
+    response.close()
+    assert hub.channels == {}
+
+
+def test_valuation_api_batches_tickers_and_grid(client):
+    response = client.post('/api/valuation', json={
+        'tickers': ['aapl', 'MSFT', 'bad!'],
+        'discount_rates': [0.07, 0.08],
+        'growth_rates': [0.03, 0.04, 0.05]
+    })
+    assert response.status_code == 200
+    data = response.get_json()
+    assert set(data['results']) == {'AAPL', 'MSFT'}
+    assert len(data['results']['AAPL']['dcf']) == 2
+    assert len(data['results']['AAPL']['dcf'][0]) == 3
+
+
+def test_valuation_api_rejects_empty_request(client):
+    assert client.post('/api/valuation', json={}).status_code == 400
+
+
+def test_indicators_api(client):
+    response = client.get('/api/indicators/AAPL?range=6mo&include=rsi,macd')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert set(data['series']) == {'rsi', 'macd', 'macd_signal', 'macd_hist'}
+    assert len(data['offsets']) == len(data['series']['rsi']) > 0
+    # six months are cut from the stored history, so averages are already warmed up
+    assert data['series']['rsi'][0] is not None
+
+    cached = client.get('/api/indicators/AAPL?range=6mo&include=rsi,macd',
+                        headers={'If-None-Match': response.headers['ETag']})
+    assert cached.status_code == 304
+    assert client.get('/api/indicators/AAPL?include=nope').status_code == 400
+
+
+def test_live_streams_are_capped_per_process(app, client):
+    hub = app.extensions['quote_hub']
+    hub.feed = SimulatedFeed()
+    hub.interval = 0.01
+    streams = [client.get('/api/stream/AAPL', buffered=False) for _ in range(app.config['STREAM_MAX_CLIENTS'])]
+    refused = client.get('/api/stream/AAPL', buffered=False)
+    assert refused.status_code == 503
+    assert refused.headers['Retry-After'] == '30'
+
+    streams.pop().close()
+    reopened = client.get('/api/stream/AAPL', buffered=False)
+    assert reopened.status_code == 200
+    for response in streams + [reopened]:
+        response.close()
+
+
+def test_valuation_api_rejects_non_finite_rates(client):
+    for rates in (["nan"], ["inf"], [-1], [-2.5]):
+        response = client.post('/api/valuation', json={'tickers': ['AAPL'], 'discount_rates': rates})
+        assert response.status_code == 400, rates
+        response = client.post('/api/valuation', json={'tickers': ['AAPL'], 'growth_rates': rates})
+        assert response.status_code == 400, rates
+
+
+def test_valuation_api_rejects_malformed_payloads(client):
+    for payload in (['AAPL'], {'tickers': 5}, {'tickers': 'AAPL'}, {'tickers': ['AAPL'], 'growth_rates': '0.05'},
+                    {'tickers': ['AAPL'], 'years': 2.9}, {'tickers': ['AAPL'], 'years': '5'},
+                    {'tickers': ['AAPL'], 'years': True}):
+        response = client.post('/api/valuation', json=payload)
+        assert response.status_code == 400, payload
+    response = client.post('/api/valuation', json={'tickers': ['AAPL'], 'years': 5.0})
+    assert response.get_json()['assumptions']['years'] == 5
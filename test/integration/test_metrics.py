@@ -0,0 +1,55 @@
+import pytest
+
+from app import create_app, db
+from metrics import cache_requests, request_queries, request_seconds, upstream_seconds
+
+
+def test_metrics_endpoint_reports_routes_upstream_and_caches(client):
+    before = request_seconds.count("GET", "/search", "200")
+    upstream_before = upstream_seconds.count("fixture", "get_quotes")
+
+    assert client.get('/search?ticker=ZZZZ').status_code == 200
+
+    assert request_seconds.count("GET", "/search", "200") == before + 1
+    assert upstream_seconds.count("fixture", "get_quotes") > upstream_before
+    assert cache_requests.get("quote", "miss") + cache_requests.get("quote", "hit") > 0
+
+    response = client.get('/metrics')
+    text = response.get_data(as_text=True)
+    assert response.mimetype == 'text/plain'
+    assert 'http_request_duration_seconds_count{method="GET",route="/search",status="200"}' in text
+    assert 'market_data_call_duration_seconds_count{provider="fixture",method="get_quotes"}' in text
+    assert 'app_cache_backend_operations_total{result="hit"}' in text
+
+
+def test_db_queries_counted_per_request(client, login):
+    login()
+    before = request_queries.count("/dashboard")
+    client.get('/dashboard')
+    assert request_queries.count("/dashboard") == before + 1
+    assert 'Server-Timing' not in client.get('/dashboard').headers
+
+
+@pytest.fixture
+def timed_client(tmp_path):
+    app = create_app({
+        'CACHE_DIR': str(tmp_path),
+        'OHLCV_STORE_DIR': str(tmp_path / 'ohlcv'),
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+        'MARKET_DATA_PROVIDER': 'fixture',
+        'MARKET_DATA_RATE_LIMIT': None,
+        'METRICS_SERVER_TIMING': True
+    })
+    with app.app_context():
+        db.create_all()
+        with app.test_client() as client:
+            yield client
+
+
+def test_server_timing_header(timed_client):
+    header = timed_client.get('/').headers['Server-Timing']
+    names = [entry.split(';')[0] for entry in header.split(', ')]
+    assert names[0] == 'core_data'
+    assert 'render' in names
+    assert names[-2:] == ['db', 'total']
@@ -0,0 +1,49 @@
+import threading
+
+from app import cache, market_data
+
+
+def test_pages_never_fetch_news(client, monkeypatch):
+    callers = []
+    original = market_data.provider.get_news
+
+    def recording(ticker):
+        callers.append(threading.current_thread())
+        return original(ticker)
+
+    monkeypatch.setattr(market_data.provider, 'get_news', recording)
+    response = client.get('/')
+    assert response.status_code == 200
+    assert threading.main_thread() not in callers
+
+
+def test_home_page_shows_news_for_the_users_portfolio(app, client, login):
+    login()
+    client.post('/add_to_portfolio', data={'ticker': 'NVDA'})
+    assert app.extensions['news'].refresh()
+
+    page = client.get('/').data
+    assert b'NVDA ' in page
+    assert b'TSLA ' not in page
+    # the market story is filed under every ticker but listed once
+    assert page.count(b'Markets close mixed') == 1
+
+
+def test_one_worker_per_interval_fetches_news_upstream(app, monkeypatch):
+    calls = []
+    original = market_data.provider.get_news
+
+    def counting(ticker):
+        calls.append(ticker)
+        return original(ticker)
+
+    monkeypatch.setattr(market_data.provider, 'get_news', counting)
+    news = app.extensions['news']
+    assert news.refresh()
+    fetched = len(calls)
+    assert fetched
+
+    # another worker refreshing within the interval reads the published feeds instead
+    assert news.refresh()
+    assert len(calls) == fetched
+    assert cache.get('news:feeds').keys() == set(calls)
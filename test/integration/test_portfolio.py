@@ -2,6 +2,12 @@ from models import Portfolio
 
 
 def test_add_stock_to_portfolio(client):
+    client.post('/register', data={
+        'username': 'testuser',
+        'email': 'test@example.com',
+        'password': 'SecurePass123'
+    })
+
     # 先登录
     client.post('/login', data={
         'username': 'testuser',
@@ -0,0 +1,48 @@
+from models import Portfolio, db
+
+
+def add_positions(user, tickers):
+    db.session.add_all(Portfolio(user_id=user.id, ticker=ticker) for ticker in tickers)
+    db.session.commit()
+
+
+def test_dashboard_query_count_does_not_grow_with_positions(client, login, count_queries):
+    user = login()
+    add_positions(user, ["T%d" % i for i in range(5)])
+    with count_queries() as few:
+        assert client.get('/dashboard').status_code == 200
+
+    add_positions(user, ["U%d" % i for i in range(50)])
+    with count_queries() as many:
+        assert client.get('/dashboard').status_code == 200
+    assert many.count == few.count <= 2
+
+
+def test_index_loads_portfolio_in_one_query(app, client, login, count_queries):
+    app.extensions['core_data'].refresh()
+    user = login()
+    add_positions(user, ["AAPL", "NVDA", "META"])
+    with count_queries() as queries:
+        assert client.get('/').status_code == 200
+    assert queries.count <= 2
+
+
+def test_duplicate_add_uses_constraint(client, login, count_queries):
+    login()
+    client.post('/add_to_portfolio', data={'ticker': 'NVDA'})
+    with count_queries() as queries:
+        response = client.post('/add_to_portfolio', data={'ticker': 'NVDA'}, follow_redirects=True)
+    assert b'NVDA Already in Your Portfolio List' in response.data
+    assert Portfolio.query.filter_by(ticker='NVDA').count() == 1
+    # no check-then-insert lookup; the unique index rejects the duplicate
+    assert not [statement for statement in queries.statements if 'portfolio.ticker = ' in statement]
+
+
+def test_portfolio_analytics_api(client, login):
+    login()
+    client.post('/add_to_portfolio', data={'ticker': 'AAPL', 'quantity': 10})
+    client.post('/add_to_portfolio', data={'ticker': 'MSFT', 'quantity': 4})
+    data = client.get('/api/portfolio/analytics').get_json()
+    assert [position['ticker'] for position in data['positions']] == ['AAPL', 'MSFT']
+    assert data['total_value'] > 0
+    assert b'Portfolio Value' in client.get('/dashboard').data
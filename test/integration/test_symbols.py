@@ -0,0 +1,42 @@
+from app import market_data
+from models import Portfolio
+
+
+def test_symbol_autocomplete(client):
+    response = client.get('/api/symbols?q=msf')
+    assert response.status_code == 200
+    assert response.get_json()[0] == {"symbol": "MSFT", "name": "Microsoft Corporation", "exchange": "NASDAQ"}
+    assert client.get('/api/symbols?q=').get_json() == []
+    assert len(client.get('/api/symbols?q=a&limit=3').get_json()) == 3
+
+
+def test_indexed_symbols_are_accepted_without_a_lookup(client, login, monkeypatch):
+    lookups = []
+    original = market_data.provider.get_quotes
+    monkeypatch.setattr(market_data.provider, 'get_quotes', lambda tickers: lookups.append(tickers) or original(tickers))
+    user = login()
+
+    client.post('/add_to_portfolio', data={'ticker': 'nvda'})
+    assert lookups == []
+
+    for ticker in ('ROKU', 'BRK-B', 'SHOP.TO'):
+        client.post('/add_to_portfolio', data={'ticker': ticker})
+    assert [list(tickers) for tickers in lookups] == [['ROKU'], ['BRK-B'], ['SHOP.TO']]
+    assert {entry.ticker for entry in Portfolio.query.filter_by(user_id=user.id)} == {'NVDA', 'ROKU', 'BRK-B',
+                                                                                     'SHOP.TO'}
+
+
+def test_unknown_symbols_are_rejected(client, login, unknown_symbols):
+    unknown_symbols('NOTREAL')
+    user = login()
+    response = client.post('/add_to_portfolio', data={'ticker': 'NOTREAL'}, follow_redirects=True)
+    assert b'Valid Stock Code: NOTREAL' in response.data
+    client.post('/add_to_portfolio', data={'ticker': 'NOT A TICKER'})
+    assert Portfolio.query.filter_by(user_id=user.id).count() == 0
+
+
+def test_watchlist_rejects_unknown_symbol(client, login, unknown_symbols):
+    unknown_symbols('NOTREAL')
+    login()
+    response = client.post('/watchlist', data={'ticker': 'NOTREAL'}, follow_redirects=True)
+    assert b'Problem fetching data for NOTREAL.' in response.data
@@ -0,0 +1,52 @@
+import json
+
+from models import WatchlistEntry
+
+
+def test_watchlist_requires_login(client):
+    response = client.get('/watchlist')
+    assert response.status_code == 401
+
+
+def test_add_and_remove_watchlist_ticker(client, login):
+    user = login()
+
+    response = client.post('/watchlist', data={'ticker': 'msft'}, follow_redirects=True)
+    assert b'MSFT added.' in response.data
+    assert b'MSFT' in response.data
+
+    response = client.post('/watchlist', data={'ticker': 'MSFT'}, follow_redirects=True)
+    assert b'MSFT already in list.' in response.data
+    assert WatchlistEntry.query.filter_by(user_id=user.id).count() == 1
+
+    response = client.get('/remove/MSFT', follow_redirects=True)
+    assert b'MSFT removed.' in response.data
+    assert WatchlistEntry.query.filter_by(user_id=user.id).count() == 0
+
+    response = client.get('/remove/MSFT', follow_redirects=True)
+    assert b'MSFT not found in the list.' in response.data
+
+
+def test_watchlists_are_per_user(client, login):
+    alice = login('alice')
+    client.post('/watchlist', data={'ticker': 'AAPL'})
+    client.get('/logout')
+
+    bob = login('bob')
+    client.post('/watchlist', data={'ticker': 'TSLA'})
+    client.get('/remove/AAPL')
+
+    assert [e.ticker for e in WatchlistEntry.query.filter_by(user_id=alice.id)] == ['AAPL']
+    assert [e.ticker for e in WatchlistEntry.query.filter_by(user_id=bob.id)] == ['TSLA']
+
+
+def test_import_watchlist_command(app, login, tmp_path):
+    user = login()
+    path = tmp_path / 'watchlist.json'
+    path.write_text(json.dumps(['aapl', 'MSFT', 'AAPL']))
+
+    result = app.test_cli_runner().invoke(args=['import-watchlist', 'testuser', str(path)])
+
+    assert 'Imported 2 of 3 tickers' in result.output
+    tickers = sorted(e.ticker for e in WatchlistEntry.query.filter_by(user_id=user.id))
+    assert tickers == ['AAPL', 'MSFT']
@@ -0,0 +1,14 @@
+import numpy as np
+
+from alerts import KINDS, match
+
+
+def test_match_compares_each_alert_with_its_symbol():
+    prices = np.array([100.0, 50.0, np.nan])
+    moves = np.array([3.5, -1.0, np.nan])
+    rows = np.array([0, 0, 1, 1, 0, 1, 2])
+    kinds = np.array([KINDS.index(kind) for kind in ("above", "above", "below", "below", "move", "move", "above")])
+    thresholds = np.array([99.0, 101.0, 50.0, 40.0, 3.0, 2.0, 1.0])
+
+    # a symbol without a usable quote never matches
+    assert match(rows, kinds, thresholds, prices, moves).tolist() == [0, 2, 4]
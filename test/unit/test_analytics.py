@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from analytics import portfolio_analytics
+
+
+def series(values):
+    return pd.Series(values, index=pd.bdate_range("2024-01-01", periods=len(values)), dtype=float)
+
+
+def test_value_pnl_and_weights():
+    closes = {
+        "AAA": series([10, 11, 12]),
+        "BBB": series([20, 20, 18]),
+        "^GSPC": series([100, 101, 102]),
+    }
+    result = portfolio_analytics({"AAA": 10, "BBB": 5}, closes)
+    assert result["total_value"] == 10 * 12 + 5 * 18
+    assert result["daily_pnl"] == 10 * 1 + 5 * -2
+    weights = {position["ticker"]: position["weight"] for position in result["positions"]}
+    assert np.isclose(weights["AAA"], 120 / 210)
+
+
+def test_beta_and_correlation_match_numpy():
+    rng = np.random.default_rng(0)
+    market = 100 * np.cumprod(1 + rng.normal(0, 0.01, 250))
+    levered = 50 * np.cumprod(1 + 2 * (market[1:] / market[:-1] - 1))
+    closes = {"LEV": series(np.r_[50, levered]), "^GSPC": series(market), "IDX": series(market / 2)}
+    result = portfolio_analytics({"LEV": 1, "IDX": 1}, closes)
+    betas = {position["ticker"]: position["beta"] for position in result["positions"]}
+    assert np.isclose(betas["LEV"], 2.0)
+    assert np.isclose(betas["IDX"], 1.0)
+    assert np.isclose(result["correlation"]["matrix"][0][1], 1.0)
+
+
+def test_missing_history_and_zero_quantities():
+    closes = {"AAA": series([10, 11]), "^GSPC": series([1, 2])}
+    result = portfolio_analytics({"AAA": 0, "NOPE": 3}, closes)
+    assert result["missing"] == ["NOPE"]
+    assert result["positions"][0]["weight"] == 1.0
+    assert result["total_value"] == 0
+    assert result["volatility"] is None
@@ -0,0 +1,88 @@
+import threading
+
+import pytest
+
+from breaker import CircuitBreaker, CircuitOpen
+from providers import FixtureProvider, MarketData
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_opens_after_threshold_and_backs_off_exponentially():
+    clock = FakeClock()
+    breaker = CircuitBreaker(threshold=2, backoff=5, max_backoff=12, clock=clock)
+    breaker.failure()
+    assert breaker.allow()
+    breaker.failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    clock.now = 5
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+    # only one probe at a time
+    assert not breaker.allow()
+    breaker.failure()
+    assert breaker.retry_after() == 10
+
+    clock.now = 15
+    assert breaker.allow()
+    breaker.failure()
+    assert breaker.retry_after() == 12
+
+    clock.now = 27
+    assert breaker.allow()
+    breaker.success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_failures_while_open_do_not_extend_the_backoff():
+    clock = FakeClock()
+    breaker = CircuitBreaker(threshold=1, backoff=5, clock=clock)
+    threads = [threading.Thread(target=breaker.failure) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert breaker.trips == 1
+    assert breaker.retry_after() == 5
+
+    clock.now = 5
+    assert breaker.allow()
+    breaker.failure()
+    breaker.failure()
+    assert breaker.trips == 2
+    assert breaker.retry_after() == 10
+
+
+class FailingProvider(FixtureProvider):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def get_quotes(self, tickers):
+        self.calls += 1
+        raise ConnectionError("rate limited")
+
+
+def test_market_data_fails_fast_while_open():
+    class App:
+        config = {"MARKET_DATA_PROVIDER": "fixture", "MARKET_DATA_RATE_LIMIT": None,
+                  "MARKET_DATA_BREAKER_THRESHOLD": 2}
+        extensions = {}
+
+    market_data = MarketData(App())
+    market_data.provider = provider = FailingProvider()
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            market_data.get_quotes(["AAPL"])
+    with pytest.raises(CircuitOpen):
+        market_data.get_quotes(["AAPL"])
+    assert provider.calls == 2
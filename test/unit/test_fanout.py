@@ -0,0 +1,70 @@
+import threading
+import time
+
+from fanout import FanOut
+
+
+def test_runs_calls_concurrently():
+    fanout = FanOut(max_workers=10, timeout=5)
+    started = time.monotonic()
+    result = fanout.run({i: (lambda: time.sleep(0.2) or "ok") for i in range(10)})
+    assert time.monotonic() - started < 1
+    assert len(result.results) == 10
+    assert result.ok
+
+
+def test_partial_failures_and_timeouts():
+    fanout = FanOut(max_workers=4, timeout=0.2)
+
+    def boom():
+        raise ValueError("bad symbol")
+
+    result = fanout.run({
+        "fast": lambda: 1,
+        "boom": boom,
+        "slow": lambda: time.sleep(1),
+    })
+    assert result.results == {"fast": 1}
+    assert isinstance(result.errors["boom"], ValueError)
+    assert isinstance(result.errors["slow"], TimeoutError)
+
+
+def test_concurrency_is_capped():
+    fanout = FanOut(max_workers=2, timeout=5)
+    lock = threading.Lock()
+    active = []
+    peak = []
+
+    def call():
+        with lock:
+            active.append(1)
+            peak.append(len(active))
+        time.sleep(0.05)
+        with lock:
+            active.pop()
+
+    fanout.run({i: call for i in range(8)})
+    assert max(peak) == 2
+
+
+def test_deadline_counts_from_submission_and_hung_calls_are_reported():
+    timeouts = []
+    fanout = FanOut(max_workers=2, timeout=0.3, on_timeout=timeouts.append)
+    release = threading.Event()
+
+    result = fanout.run({"a": release.wait, "b": release.wait, "queued": lambda: 1})
+    assert set(result.errors) == {"a", "b", "queued"}
+    assert sorted(timeouts) == ["a", "b"]
+    assert fanout.hung == 2
+
+    # every worker is stuck: later batches fail at once instead of queueing
+    started = time.monotonic()
+    result = fanout.run({"c": lambda: 1})
+    assert time.monotonic() - started < 0.1
+    assert "c" in result.errors
+
+    release.set()
+    deadline = time.monotonic() + 2
+    while fanout.hung and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert fanout.run({"c": lambda: 1}).results == {"c": 1}
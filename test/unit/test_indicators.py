@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from indicators import IndicatorCache, compute, encode_indicators, series_from_array
+from providers import FixtureProvider
+from timeseries import frame_to_array
+
+
+def history(period="1y", interval="1d"):
+    frame = FixtureProvider().get_history("AAPL", period=period, interval=interval)
+    return frame_to_array(frame), str(frame.index.tz)
+
+
+def test_matches_pandas_reference():
+    array, tz = history()
+    series = series_from_array(array, tz)
+    state = compute(series, intraday=False)
+    close = pd.Series(series.close)
+
+    assert np.allclose(state["sma50"], close.rolling(50).mean(), equal_nan=True)
+    assert np.allclose(state["ema12"], close.ewm(span=12, adjust=False).mean())
+    macd = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    assert np.allclose(state["macd_signal"], macd.ewm(span=9, adjust=False).mean())
+    assert np.allclose(state["bb_lower"], close.rolling(20).mean() - 2 * close.rolling(20).std(ddof=0),
+                       equal_nan=True)
+    assert np.isnan(state["rsi"][:14]).all()
+    assert ((state["rsi"][14:] >= 0) & (state["rsi"][14:] <= 100)).all()
+    typical = (series.high + series.low + series.close) / 3
+    assert np.isclose(state["vwap"][-1], (typical * series.volume).sum() / series.volume.sum())
+
+
+def test_incremental_update_equals_full_recompute():
+    for period, interval, intraday in (("1y", "1d", False), ("5d", "1m", True)):
+        array, tz = history(period, interval)
+        full = compute(series_from_array(array, tz), intraday)
+
+        cache = IndicatorCache()
+        cache.get("AAPL", series_from_array(array[:-40], tz), intraday)
+        # the last stored bar is still forming when it is first seen
+        revised = array[:-39].copy()
+        revised[-1, 4] *= 1.01
+        cache.get("AAPL", series_from_array(revised, tz), intraday)
+        state = cache.get("AAPL", series_from_array(array, tz), intraday)
+
+        for name, values in full.items():
+            assert np.allclose(values, state[name], equal_nan=True), name
+
+
+def test_unchanged_bars_reuse_the_cached_state():
+    array, tz = history()
+    cache = IndicatorCache()
+    first = cache.get("AAPL", series_from_array(array, tz), False)
+    assert cache.get("AAPL", series_from_array(array.copy(), tz), False) is first
+
+
+def test_encode_uses_nulls_for_warm_up_rows():
+    array, tz = history()
+    series = series_from_array(array, tz)
+    state = compute(series, False)
+    data = encode_indicators(series.ts, state, 0, np.arange(len(series.ts)), ["sma50"])
+    assert data["series"]["sma50"][:49] == [None] * 49
+    assert isinstance(data["series"]["sma50"][49], float)
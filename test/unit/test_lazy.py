@@ -0,0 +1,51 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def loaded_after(statement):
+    # a fresh interpreter, since the test session has long since imported numpy
+    probe = (f"import json, sys; {statement}; "
+             "print(json.dumps([name for name in ('numpy', 'pandas', 'yfinance') if name in sys.modules]))")
+    return json.loads(run(probe))
+
+
+def run(probe):
+    result = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, capture_output=True, text=True, check=True)
+    return result.stdout
+
+
+def test_importing_the_app_leaves_the_market_data_stack_unloaded():
+    assert loaded_after("import app") == []
+
+
+def test_lazy_module_loads_on_first_attribute():
+    assert loaded_after("import valuation; valuation.np.zeros(1)") == ["numpy"]
+
+
+def test_concurrent_first_use_sees_the_whole_module():
+    probe = """
+import threading
+from lazy import lazy_import
+pd = lazy_import("pandas")
+barrier = threading.Barrier(8)
+errors = []
+
+def touch():
+    barrier.wait()
+    try:
+        pd.Timestamp("2024-01-02")
+    except Exception as e:
+        errors.append(repr(e))
+
+threads = [threading.Thread(target=touch) for _ in range(8)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+print(errors)
+"""
+    assert run(probe).strip() == "[]"
@@ -0,0 +1,56 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from market_hours import Schedule, TradingCalendar
+
+
+NEW_YORK = ZoneInfo("America/New_York")
+CALENDAR = TradingCalendar.from_file()
+
+
+def at(*args):
+    return datetime(*args, tzinfo=NEW_YORK).timestamp()
+
+
+def test_sessions():
+    assert CALENDAR.session(at(2026, 10, 14, 3, 59)) == "closed"
+    assert CALENDAR.session(at(2026, 10, 14, 4, 0)) == "pre"
+    assert CALENDAR.session(at(2026, 10, 14, 9, 30)) == "regular"
+    assert CALENDAR.session(at(2026, 10, 14, 16, 0)) == "post"
+    assert CALENDAR.session(at(2026, 10, 14, 20, 0)) == "closed"
+    # weekend, holiday and half day
+    assert CALENDAR.session(at(2026, 10, 17, 12, 0)) == "closed"
+    assert CALENDAR.session(at(2026, 11, 26, 12, 0)) == "closed"
+    assert CALENDAR.session(at(2026, 11, 27, 13, 30)) == "post"
+
+
+def test_next_open_skips_weekends_and_holidays():
+    assert CALENDAR.next_open(at(2026, 11, 25, 17, 0)) == at(2026, 11, 27, 9, 30)
+    assert CALENDAR.next_open(at(2026, 10, 16, 17, 0)) == at(2026, 10, 19, 9, 30)
+    assert CALENDAR.next_open(at(2026, 10, 19, 8, 0)) == at(2026, 10, 19, 9, 30)
+
+
+def test_ttls_follow_the_session():
+    schedule = Schedule(CALENDAR)
+    assert schedule.ttl("quote", at(2026, 10, 14, 11, 0)) == 60
+    assert schedule.ttl("quote", at(2026, 10, 14, 17, 0)) == 300
+    assert schedule.ttl("news", at(2026, 10, 14, 11, 0)) == 900
+    # closed: prices keep until pre-market, Monday 04:00
+    assert schedule.ttl("quote", at(2026, 10, 17, 12, 0)) == at(2026, 10, 19, 4, 0) - at(2026, 10, 17, 12, 0)
+    assert schedule.ttl("news", at(2026, 10, 17, 12, 0)) == 4 * 3600
+
+
+def test_bar_ttl_is_judged_at_fetch_time():
+    schedule = Schedule(CALENDAR)
+    # a regular-hours fetch expires on the store's own schedule, so the closing bars are picked up
+    assert schedule.bar_ttl("1m", 60, at(2026, 10, 16, 15, 59)) == 60
+    assert schedule.bar_ttl("1m", 60, at(2026, 10, 16, 21, 0)) == at(2026, 10, 19, 4, 0) - at(2026, 10, 16, 21, 0)
+
+
+def test_refresher_wakes_before_the_open():
+    schedule = Schedule(CALENDAR, prewarm_lead=300)
+    assert schedule.refresh_interval("quote", at(2026, 10, 19, 9, 20)) == 300
+    assert schedule.refresh_interval("quote", at(2026, 10, 19, 9, 25)) == 300
+    assert schedule.refresh_interval("quote", at(2026, 10, 19, 9, 31)) == 60
+    # over the weekend it sleeps straight through to pre-market
+    assert schedule.refresh_interval("quote", at(2026, 10, 17, 12, 0)) == at(2026, 10, 19, 4, 0) - at(2026, 10, 17, 12, 0)
@@ -0,0 +1,29 @@
+from metrics import Counter, Histogram, Registry, server_timing
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    latency = registry.register(Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0)))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        latency.observe(value, "/")
+
+    text = registry.render()
+
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{route="/",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/",le="1.0"} 3' in text
+    assert 'latency_seconds_bucket{route="/",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{route="/"} 4' in text
+    assert 'latency_seconds_sum{route="/"} 4.25' in text
+
+
+def test_counter_labels_are_escaped():
+    registry = Registry()
+    calls = registry.register(Counter("calls_total", "Calls.", ("method",)))
+    calls.inc('get"quotes', amount=2)
+    assert 'calls_total{method="get\\"quotes"} 2' in registry.render()
+
+
+def test_server_timing_header():
+    header = server_timing([("core_data", 0.0012), ("render", 0.003)], 2, 0.0005, 0.01)
+    assert header == 'core_data;dur=1.2, render;dur=3.0, db;dur=0.5;desc="2 queries", total;dur=10.0'
@@ -0,0 +1,31 @@
+from news import NewsStore, ingest
+
+
+def item(link, timestamp, title=None):
+    return {"title": title or link, "link": link, "publisher": "Wire", "timestamp": timestamp}
+
+
+def test_duplicate_links_are_stored_once():
+    store = NewsStore()
+    assert store.add("AAPL", [item("a", 1), item("a", 1), item("#", 5), item("b", 2)]) == 2
+    assert store.add("AAPL", [item("b", 2)]) == 0
+    assert [news["link"] for news in store.latest(["AAPL"])] == ["b", "a"]
+
+
+def test_latest_merges_tickers_newest_first():
+    store = NewsStore()
+    ingest(store, {
+        "AAPL": [item("a1", 10), item("a2", 30), item("market", 40)],
+        "TSLA": [item("t1", 20), item("market", 40)],
+    })
+    assert [news["link"] for news in store.latest(["AAPL", "TSLA"], limit=4)] == ["market", "a2", "t1", "a1"]
+    assert [news["link"] for news in store.latest(["TSLA", "MSFT"])] == ["market", "t1"]
+    assert len(store.items) == 4
+
+
+def test_feeds_are_bounded_per_ticker():
+    store = NewsStore(per_ticker=2)
+    store.add("AAPL", [item("old", 1), item("mid", 2)])
+    store.add("AAPL", [item("new", 3)])
+    assert [news["link"] for news in store.latest(["AAPL"])] == ["new", "mid"]
+    assert "old" not in {news["link"] for news in store.items.values()}
@@ -0,0 +1,26 @@
+import numpy as np
+
+from payloads import decimate, encode_series
+from timeseries import Bars
+
+
+def bars(close):
+    close = np.asarray(close, dtype=float)
+    ts = np.arange(len(close), dtype=float) * 60 + 1_700_000_000
+    return Bars(ts, close, close, close, close, close, "America/New_York")
+
+
+def test_decimate_keeps_latest_point():
+    ts = np.arange(1000)
+    out_ts, out_values = decimate(ts, ts * 2, 100)
+    assert len(out_ts) <= 100
+    assert out_ts[-1] == 999
+    assert out_values[-1] == 1998
+
+
+def test_encode_series_uses_offsets_and_drops_gaps():
+    data = encode_series(bars([1.123456, np.nan, 3.0]), "1m")
+    assert data["start"] == 1_700_000_000
+    assert data["offsets"] == [0, 120]
+    assert data["prices"] == [1.1235, 3.0]
+    assert data["tz"] == "America/New_York"
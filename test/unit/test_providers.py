@@ -0,0 +1,166 @@
+import time
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from providers import FixtureProvider, MarketData, is_upstream_failure, quote_from_bars
+
+
+def test_quote_from_bars_uses_prior_close():
+    bars = pd.DataFrame(
+        {"Open": [10.0, 11.0], "High": [12.0, 13.0], "Low": [9.0, 10.5],
+         "Close": [11.0, 12.1], "Volume": [100, 200]},
+        index=pd.to_datetime(["2024-01-02", "2024-01-03"])
+    )
+    quote = quote_from_bars("AAPL", bars)
+    assert quote["price"] == 12.1
+    assert quote["previous_close"] == 11.0
+    assert round(quote["change_percent"], 2) == 10.0
+    assert quote["date"] == "2024-01-03"
+
+
+def test_fixture_provider_is_deterministic():
+    now = datetime(2024, 3, 6, 18, 0)
+    first = FixtureProvider(now=now).get_quotes(["AAPL", "MSFT"])
+    second = FixtureProvider(now=now).get_quotes(["MSFT", "AAPL"])
+    assert first == second
+    assert set(first) == {"AAPL", "MSFT"}
+
+
+def test_fixture_provider_intraday_session():
+    hist = FixtureProvider(now=datetime(2024, 3, 9, 12, 0)).get_history("AAPL", "1d", "1m")
+    # Saturday rolls back to Friday's full session
+    assert hist.index[0] == pd.Timestamp("2024-03-08 14:30", tz="UTC")
+    assert len(hist) == 391
+
+
+def test_fixture_file_limits_known_symbols(tmp_path):
+    path = tmp_path / "fixture.json"
+    path.write_text('{"AAPL": {"info": {"shortName": "Apple Inc.", "currency": "USD"}}}')
+    provider = FixtureProvider(path=str(path))
+    assert provider.get_info("AAPL")["shortName"] == "Apple Inc."
+    assert provider.get_info("NOPE") == {}
+    assert "NOPE" not in provider.get_quotes(["AAPL", "NOPE"])
+
+
+def test_market_data_selects_provider_from_config():
+    class App:
+        config = {"MARKET_DATA_PROVIDER": "fixture"}
+        extensions = {}
+
+    market_data = MarketData(App())
+    assert isinstance(market_data.provider, FixtureProvider)
+    assert App.extensions["market_data"] is market_data
+
+
+def test_statements_fetched_in_parallel_with_partial_failure():
+    class SlowProvider(FixtureProvider):
+        def get_statement(self, ticker, name):
+            if name == "cashflow":
+                raise RuntimeError("upstream error")
+            time.sleep(0.2)
+            return super().get_statement(ticker, name)
+
+    class App:
+        config = {"MARKET_DATA_PROVIDER": "fixture", "MARKET_DATA_RATE_LIMIT": None}
+        extensions = {}
+
+    market_data = MarketData(App())
+    market_data.provider = SlowProvider()
+    started = time.monotonic()
+    statements = market_data.get_statements("AAPL")
+    assert time.monotonic() - started < 0.5
+    assert statements["cashflow"].empty
+    assert not statements["income_stmt"].empty
+
+
+def test_only_outages_count_against_the_breaker():
+    class Flaky(FixtureProvider):
+        error = KeyError("NOTREAL")
+
+        def get_info(self, ticker):
+            raise self.error
+
+    class App:
+        config = {"MARKET_DATA_PROVIDER": "fixture", "MARKET_DATA_RATE_LIMIT": None,
+                  "MARKET_DATA_BREAKER_THRESHOLD": 2}
+        extensions = {}
+
+    market_data = MarketData(App())
+    market_data.provider = Flaky()
+    for _ in range(5):
+        with pytest.raises(KeyError):
+            market_data.get_info("NOTREAL")
+    assert market_data.breaker.state == "closed"
+
+    Flaky.error = ConnectionError("Too Many Requests. Rate limited.")
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            market_data.get_info("AAPL")
+    assert market_data.breaker.state == "open"
+    assert is_upstream_failure(type("HTTPError", (Exception,), {"status_code": 503})())
+    assert not is_upstream_failure(type("HTTPError", (Exception,), {"status_code": 404})())
+
+
+def test_batches_larger_than_the_rate_limit_allows_per_deadline_are_split():
+    class App:
+        config = {"MARKET_DATA_PROVIDER": "fixture", "MARKET_DATA_RATE_LIMIT": 20, "MARKET_DATA_BURST": 1,
+                  "MARKET_DATA_TIMEOUT": 1, "MARKET_DATA_BREAKER_THRESHOLD": 1}
+        extensions = {}
+
+    market_data = MarketData(App())
+    # 20 tokens per 1s deadline, so one batch of 30 could not finish in time
+    tickers = [f"T{i}" for i in range(30)]
+    assert set(market_data.get_infos(tickers)) == set(tickers)
+    assert market_data.breaker.state == "closed"
+    assert market_data.get_quotes(["AAPL"])
+
+
+def test_waiting_on_the_rate_limiter_is_not_an_upstream_stall():
+    class App:
+        config = {"MARKET_DATA_PROVIDER": "fixture", "MARKET_DATA_RATE_LIMIT": 5, "MARKET_DATA_BURST": 1,
+                  "MARKET_DATA_BREAKER_THRESHOLD": 1}
+        extensions = {}
+
+    market_data = MarketData(App())
+    result = market_data.fanout.run({t: (lambda t=t: market_data.get_info(t)) for t in ("A", "B", "C")},
+                                    timeout=0.1)
+    assert len(result.errors) == 2
+    assert market_data.breaker.state == "closed"
+
+    class Stuck(FixtureProvider):
+        def get_info(self, ticker):
+            time.sleep(0.3)
+            return {}
+
+    market_data.provider = Stuck()
+    market_data.limiter.rate = None
+    market_data.fanout.timeout = 0.1
+    assert market_data.get_infos(["D"]) == {}
+    assert market_data.breaker.state == "open"
+
+
+def test_news_batches_are_paced_and_do_not_open_the_quote_breaker():
+    class Down(FixtureProvider):
+        def get_news(self, ticker):
+            raise ConnectionError("Too Many Requests")
+
+    class App:
+        config = {"MARKET_DATA_PROVIDER": "fixture", "MARKET_DATA_RATE_LIMIT": 100,
+                  "MARKET_DATA_BREAKER_THRESHOLD": 2}
+        extensions = {}
+
+    market_data = MarketData(App())
+    pauses = []
+    batches = list(market_data.news_batches(["A", "B", "C", "D", "E"], size=2, sleep=pauses.append))
+    assert [sorted(batch) for batch in batches] == [["A", "B"], ["C", "D"], ["E"]]
+    assert pauses == [0.02, 0.02]
+
+    market_data.provider = Down()
+    batches = list(market_data.news_batches(["A", "B", "C", "D", "E"], size=2, sleep=pauses.append))
+    # two outages open the news breaker and the pass stops; quotes are unaffected
+    assert batches == [{}, {}]
+    assert market_data.news_breaker.state == "open"
+    assert market_data.breaker.state == "closed"
+    assert market_data.get_quotes(["AAPL"])
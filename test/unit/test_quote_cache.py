@@ -0,0 +1,107 @@
+from flask_caching.backends import SimpleCache
+
+from quote_cache import QuoteCache
+
+
+class CountingFetch:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, tickers):
+        self.calls.append(list(tickers))
+        return {ticker: {"ticker": ticker, "price": 1.0} for ticker in tickers if ticker != "BAD"}
+
+
+def test_order_does_not_matter():
+    fetch = CountingFetch()
+    quotes = QuoteCache(SimpleCache(), fetch)
+    quotes.get_quotes(["AAPL", "MSFT"])
+    assert set(quotes.get_quotes(["MSFT", "AAPL"])) == {"AAPL", "MSFT"}
+    assert fetch.calls == [["AAPL", "MSFT"]]
+
+
+def test_only_missing_symbols_go_upstream_in_one_batch():
+    fetch = CountingFetch()
+    quotes = QuoteCache(SimpleCache(), fetch)
+    quotes.get_quotes(["AAPL", "MSFT"])
+    result = quotes.get_quotes(["MSFT", "TSLA", "AAPL", "NVDA"])
+    assert set(result) == {"AAPL", "MSFT", "TSLA", "NVDA"}
+    assert fetch.calls[1] == ["TSLA", "NVDA"]
+
+
+def test_unknown_symbols_are_negative_cached_briefly():
+    fetch = CountingFetch()
+    clock = [1000.0]
+    quotes = QuoteCache(SimpleCache(), fetch, negative_timeout=30, clock=lambda: clock[0])
+    assert quotes.get_quotes(["BAD"]) == {}
+    assert quotes.get_quotes(["BAD", "AAPL"]) == {"AAPL": {"ticker": "AAPL", "price": 1.0}}
+    assert fetch.calls == [["BAD"], ["AAPL"]]
+
+    clock[0] += 31
+    quotes.get_quotes(["BAD"])
+    assert fetch.calls[-1] == ["BAD"]
+
+
+def test_negative_marks_do_not_cost_extra_cache_reads():
+    class CountingCache(SimpleCache):
+        keys = []
+
+        def get_dict(self, *keys):
+            self.keys.extend(keys)
+            return super().get_dict(*keys)
+
+    quotes = QuoteCache(CountingCache(), CountingFetch())
+    quotes.get_quotes(["AAPL", "BAD"])
+    CountingCache.keys.clear()
+    quotes.get_quotes(["AAPL", "BAD", "MSFT"])
+    assert CountingCache.keys == ["quote:AAPL", "quote:BAD", "quote:MSFT"]
+
+
+def test_last_known_good_served_stale_when_refresh_fails():
+    clock = [1000.0]
+    down = [False]
+
+    def fetch(tickers):
+        if down[0]:
+            raise ConnectionError("upstream down")
+        return {ticker: {"price": clock[0]} for ticker in tickers}
+
+    quotes = QuoteCache(SimpleCache(), fetch, timeout=60, jitter=0, clock=lambda: clock[0])
+    quotes.get_quotes(["AAPL"])
+
+    down[0] = True
+    clock[0] += 120
+    result = quotes.get_quotes(["AAPL", "MSFT"])
+    assert result == {"AAPL": {"price": 1000.0}}
+    assert result.stale == {"AAPL"}
+
+    down[0] = False
+    clock[0] += 31
+    result = quotes.get_quotes(["AAPL"])
+    assert result == {"AAPL": {"price": 1151.0}}
+    assert result.stale == set()
+
+
+def test_expiry_is_jittered_and_refreshed_early():
+    fetch = CountingFetch()
+    clock = [1000.0]
+    roll = [0.5]
+    quotes = QuoteCache(SimpleCache(), fetch, timeout=100, jitter=0.1, early=0.2,
+                        clock=lambda: clock[0], rand=lambda: roll[0])
+    quotes.get_quotes(["AAPL"])
+    entry = quotes.cache.get("quote:AAPL")
+    assert entry["ttl"] == 95
+
+    # outside the early window nobody refreshes
+    clock[0] += 70
+    quotes.get_quotes(["AAPL"])
+    assert len(fetch.calls) == 1
+
+    # 9.5s left of a 19s window: a roll of 0.5 or more refreshes, lower rolls keep the copy
+    clock[0] += 15.5
+    roll[0] = 0.4
+    quotes.get_quotes(["AAPL"])
+    assert len(fetch.calls) == 1
+    roll[0] = 0.6
+    assert quotes.get_quotes(["AAPL"]) == {"AAPL": {"ticker": "AAPL", "price": 1.0}}
+    assert len(fetch.calls) == 2
@@ -0,0 +1,35 @@
+from ratelimit import TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_bucket_allows_burst_then_paces():
+    clock = FakeClock()
+    bucket = TokenBucket(2, capacity=3, clock=clock, sleep=clock.sleep)
+    assert all(bucket.try_acquire() for _ in range(3))
+    assert bucket.try_acquire() is False
+
+    assert bucket.acquire() is True
+    assert clock.now == 0.5
+
+
+def test_bucket_acquire_times_out():
+    clock = FakeClock()
+    bucket = TokenBucket(1, capacity=1, clock=clock, sleep=clock.sleep)
+    bucket.acquire()
+    assert bucket.acquire(timeout=0.5) is False
+    assert clock.now == 0
+
+
+def test_disabled_bucket_never_blocks():
+    bucket = TokenBucket(None)
+    assert all(bucket.try_acquire() for _ in range(100))
@@ -0,0 +1,38 @@
+from refresher import Refresher
+
+
+def test_refresh_keeps_last_good_snapshot():
+    values = iter([1, RuntimeError("upstream down")])
+
+    def fetch():
+        value = next(values)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    refresher = Refresher(fetch, interval=60, default=0)
+    assert refresher.stale
+    assert refresher.refresh() is True
+    assert refresher.value == 1
+    assert refresher.refresh() is False
+    assert refresher.value == 1
+    assert not refresher.stale
+
+
+def test_get_returns_default_without_blocking():
+    refresher = Refresher(lambda: 42, interval=60, default="warming")
+    value = refresher.get()
+    refresher._thread.join(1)
+    refresher.stop()
+    assert value in ("warming", 42)
+    assert refresher.value == 42
+
+
+def test_interval_can_follow_a_schedule():
+    interval = [60]
+    refresher = Refresher(lambda: 1, interval=lambda: interval[0])
+    refresher.refresh()
+    refresher.updated_at -= 120
+    assert refresher.stale
+    interval[0] = 3600
+    assert not refresher.stale
@@ -0,0 +1,52 @@
+import multiprocessing
+import time
+
+from shared_cache import SQLiteCache
+
+
+def test_roundtrip_and_counters(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite"))
+    cache.set("AAPL", {"price": 1.5})
+    assert cache.get("AAPL") == {"price": 1.5}
+    assert cache.get("MSFT") is None
+    assert cache.get_many("AAPL", "MSFT") == [{"price": 1.5}, None]
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 2
+
+
+def test_per_entry_ttl(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite"))
+    cache.set("short", 1, timeout=1)
+    cache.set("forever", 2, timeout=0)
+    time.sleep(1.1)
+    assert cache.get("short") is None
+    assert cache.get("forever") == 2
+    assert cache.add("short", 3) is True
+    assert cache.add("forever", 4) is False
+
+
+def test_lru_eviction(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite"), threshold=2)
+    cache.touch_interval = 0
+    cache.set("quote:a", 1)
+    cache.set("quote:b", 2)
+    cache.get("quote:a")
+    cache.set("closes:c", 3)
+    assert cache.get("quote:b") is None
+    assert cache.get("quote:a") == 1
+    assert cache.stats()["evictions"] == 1
+    assert cache.evicted == {"quote": 1}
+    assert cache.stats()["size"] == 2
+
+
+def _write(path):
+    SQLiteCache(path).set("from-child", "hello")
+
+
+def test_shared_between_processes(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = SQLiteCache(path)
+    process = multiprocessing.get_context("spawn").Process(target=_write, args=(path,))
+    process.start()
+    process.join(30)
+    assert cache.get("from-child") == "hello"
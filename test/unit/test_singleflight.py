@@ -0,0 +1,42 @@
+import threading
+import time
+
+import pytest
+
+from singleflight import Group
+
+
+def test_concurrent_callers_share_one_execution():
+    group = Group()
+    calls = []
+    barrier = threading.Barrier(10)
+    results = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.1)
+        return "quotes"
+
+    def caller():
+        barrier.wait()
+        results.append(group.do("AAPL", fetch))
+
+    threads = [threading.Thread(target=caller) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert results == ["quotes"] * 10
+    assert group.calls == {}
+
+
+def test_errors_are_shared_and_not_remembered():
+    group = Group()
+
+    def boom():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        group.do("AAPL", boom)
+    assert group.do("AAPL", lambda: "ok") == "ok"
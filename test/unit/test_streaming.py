@@ -0,0 +1,63 @@
+import json
+import queue
+
+from streaming import QuoteHub, SimulatedFeed
+
+
+def test_one_poller_per_symbol():
+    feed = SimulatedFeed()
+    hub = QuoteHub(feed, interval=0.01)
+    first = hub.subscribe("AAPL")
+    second = hub.subscribe("AAPL")
+    assert len(hub.channels) == 1
+
+    a = first.get(timeout=2)
+    b = second.get(timeout=2)
+    assert a == b
+
+    hub.unsubscribe("AAPL", first)
+    hub.unsubscribe("AAPL", second)
+    assert hub.channels == {}
+
+
+def test_only_changes_are_pushed():
+    class StaticFeed:
+        def poll(self, ticker, since):
+            return [{"t": 60, "time": "00:01", "price": 1.0, "volume": 0.0},
+                    {"t": 120, "time": "00:02", "price": 2.0, "volume": 0.0}]
+
+    hub = QuoteHub(StaticFeed(), interval=0.01)
+    subscriber = hub.subscribe("AAPL")
+    try:
+        subscriber.get(timeout=0.2)
+        raise AssertionError("unchanged bars should not be pushed")
+    except queue.Empty:
+        pass
+    finally:
+        hub.unsubscribe("AAPL", subscriber)
+
+
+def test_stream_formats_server_sent_events():
+    hub = QuoteHub(SimulatedFeed(), interval=0.01)
+    stream = hub.stream("MSFT", heartbeat=1)
+    assert next(stream) == "retry: 5000\n\n"
+    event = next(stream)
+    assert event.startswith("event: bar\ndata: ")
+    assert "price" in json.loads(event.split("data: ", 1)[1])
+    stream.close()
+    assert hub.channels == {}
+
+
+def test_stream_ends_after_its_lifetime():
+    class QuietFeed:
+        def poll(self, ticker, since):
+            return []
+
+    now = [0.0]
+    hub = QuoteHub(QuietFeed(), interval=0.01)
+    stream = hub.stream("MSFT", heartbeat=0.01, lifetime=0.05, clock=lambda: now[0])
+    assert next(stream) == "retry: 5000\n\n"
+    assert next(stream) == ": keepalive\n\n"
+    now[0] = 1.0
+    assert list(stream) == []
+    assert hub.channels == {}
@@ -0,0 +1,40 @@
+from symbols import SymbolIndex, parse_nasdaq_directory, write_symbols
+
+
+ROWS = [
+    ("AAPL", "Apple Inc.", "NASDAQ"),
+    ("AMZN", "Amazon.com Inc.", "NASDAQ"),
+    ("AMD", "Advanced Micro Devices Inc.", "NASDAQ"),
+    ("A", "Agilent Technologies Inc.", "NYSE"),
+    ("MSFT", "Microsoft Corporation", "NASDAQ"),
+]
+
+
+def test_membership():
+    index = SymbolIndex(ROWS)
+    assert "AAPL" in index
+    assert "AAPLX" not in index
+    assert index.get("MSFT") == {"symbol": "MSFT", "name": "Microsoft Corporation", "exchange": "NASDAQ"}
+
+
+def test_prefix_search_symbols_then_names():
+    index = SymbolIndex(ROWS)
+    assert [row["symbol"] for row in index.search("am")] == ["AMD", "AMZN"]
+    assert [row["symbol"] for row in index.search("a", limit=3)] == ["A", "AAPL", "AMD"]
+    assert [row["symbol"] for row in index.search("micro")] == ["MSFT"]
+    assert index.search("  ") == []
+
+
+def test_parse_directory_and_roundtrip(tmp_path):
+    text = (
+        "ACT Symbol|Security Name|Exchange|CQS Symbol|ETF|Round Lot Size|Test Issue|NASDAQ Symbol\n"
+        "BRK.B|Berkshire Hathaway Inc. - Class B|N|BRK.B|N|100|N|BRK.B\n"
+        "ZXZZT|NYSE Test Issue|N|ZXZZT|N|100|Y|ZXZZT\n"
+        "File Creation Time: 1017202421:00|||||||\n"
+    )
+    rows = parse_nasdaq_directory(text)
+    assert rows == [("BRK-B", "Berkshire Hathaway Inc.", "NYSE")]
+
+    path = tmp_path / "symbols.csv"
+    write_symbols(str(path), rows + ROWS)
+    assert len(SymbolIndex.from_csv(str(path))) == 6
@@ -0,0 +1,153 @@
+import threading
+from datetime import datetime
+
+import numpy as np
+
+from providers import FixtureProvider
+from timeseries import OHLCVStore, merge
+
+
+NOW = datetime(2024, 3, 6, 18, 0)
+
+
+class CountingHistory:
+    def __init__(self):
+        self.provider = FixtureProvider(now=NOW)
+        self.calls = []
+
+    def __call__(self, ticker, period, interval):
+        self.calls.append((ticker, period, interval))
+        return self.provider.get_history(ticker, period=period, interval=interval)
+
+
+class Clock:
+    def __init__(self):
+        self.now = NOW.timestamp()
+
+    def __call__(self):
+        return self.now
+
+
+def test_ranges_are_sliced_from_one_fetch(tmp_path):
+    fetch = CountingHistory()
+    store = OHLCVStore(str(tmp_path), fetch, clock=Clock())
+    two_years = store.get("AAPL", "2y", "1d")
+    six_months = store.get("AAPL", "6mo", "1d")
+    assert fetch.calls == [("AAPL", "2y", "1d")]
+    assert 0 < len(six_months.close) < len(two_years.close)
+    assert six_months.close[-1] == two_years.close[-1]
+
+
+def test_only_the_tail_is_refetched(tmp_path):
+    fetch = CountingHistory()
+    clock = Clock()
+    store = OHLCVStore(str(tmp_path), fetch, clock=clock)
+    store.get("AAPL", "1y", "1d")
+    clock.now += 2 * 86400
+    store.get("AAPL", "1y", "1d")
+    assert fetch.calls[-1] == ("AAPL", "5d", "1d")
+
+
+def test_wider_range_backfills(tmp_path):
+    fetch = CountingHistory()
+    store = OHLCVStore(str(tmp_path), fetch, clock=Clock())
+    store.get("AAPL", "6mo", "1d")
+    store.get("AAPL", "2y", "1d")
+    store.get("AAPL", "1y", "1d")
+    assert [call[1] for call in fetch.calls] == ["6mo", "2y"]
+
+
+def test_intraday_one_day_is_latest_session(tmp_path):
+    store = OHLCVStore(str(tmp_path), CountingHistory(), clock=Clock())
+    bars = store.get("AAPL", "1d", "1m")
+    assert len(bars.ts) == 211
+    assert bars.tz == "UTC"
+
+
+def test_merge_replaces_overlapping_tail():
+    existing = np.array([[1, 0, 0, 0, 10, 0], [2, 0, 0, 0, 11, 0]], dtype=float)
+    fresh = np.array([[2, 0, 0, 0, 12, 0], [3, 0, 0, 0, 13, 0]], dtype=float)
+    assert merge(existing, fresh)[:, 4].tolist() == [10, 12, 13]
+
+
+def test_failed_refresh_serves_stored_bars_and_backs_off(tmp_path):
+    fetch = CountingHistory()
+    clock = Clock()
+    store = OHLCVStore(str(tmp_path), fetch, clock=clock, retry_after=30)
+    stored = store.get("AAPL", "1y", "1d")
+
+    def down(ticker, period, interval):
+        fetch.calls.append((ticker, period, interval))
+        raise ConnectionError("upstream down")
+
+    store.fetch = down
+    clock.now += 2 * 86400
+    bars = store.get("AAPL", "1y", "1d")
+    assert store.is_stale("AAPL", "1d")
+    assert bars.close[-1] == stored.close[-1]
+    calls = len(fetch.calls)
+
+    clock.now += 10
+    store.get("AAPL", "1y", "1d")
+    assert len(fetch.calls) == calls
+
+    store.fetch = fetch
+    clock.now += 30
+    store.get("AAPL", "1y", "1d")
+    assert not store.is_stale("AAPL", "1d")
+
+
+def test_intraday_history_is_trimmed_to_the_retention_window(tmp_path):
+    fetch = CountingHistory()
+    clock = Clock()
+    store = OHLCVStore(str(tmp_path), fetch, clock=clock, retain_days={"1m": 3})
+    first = store.get("AAPL", "5d", "1m")
+    array, meta = store.read("AAPL", "1m")
+    assert array[0, 0] >= clock.now - 3 * 86400
+    assert meta["covered_from"] == clock.now - 3 * 86400
+    assert first.close[-1] == array[-1, 4]
+
+    # a range wider than the window is served from what is kept, without refetching
+    store.get("AAPL", "5d", "1m")
+    assert len(fetch.calls) == 1
+
+
+def test_concurrent_cold_reads_in_one_process(tmp_path):
+    store = OHLCVStore(str(tmp_path), CountingHistory(), clock=Clock())
+    barrier = threading.Barrier(8)
+    errors = []
+    lengths = []
+
+    def open_chart():
+        barrier.wait()
+        try:
+            lengths.append(len(store.get("AAPL", "2y", "1d").close))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=open_chart) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(set(lengths)) == 1
+    assert not [name for name in tmp_path.iterdir() if name.suffix == ".tmp"]
+
+
+def test_unreadable_or_mismatched_files_count_as_missing(tmp_path):
+    fetch = CountingHistory()
+    store = OHLCVStore(str(tmp_path), fetch, clock=Clock())
+    store.get("AAPL", "6mo", "1d")
+    store.get("MSFT", "1y", "1d")
+    base = store._base("AAPL", "1d")
+
+    # the .npy of one write next to the .json of another
+    (tmp_path / "AAPL_1d.npy").write_bytes((tmp_path / "MSFT_1d.npy").read_bytes())
+    assert store.read("AAPL", "1d") == (None, None)
+
+    with open(base + ".npy", "r+b") as f:
+        f.truncate(100)
+    assert store.read("AAPL", "1d") == (None, None)
+    assert len(store.get("AAPL", "6mo", "1d").close)
+    assert fetch.calls[-1] == ("AAPL", "6mo", "1d")
@@ -0,0 +1,37 @@
+import numpy as np
+
+from valuation import extract_fundamentals, to_json, valuations
+
+
+def reference_dcf(fcf, discount_rate, growth_rate, years=5):
+    fcfs = [fcf * ((1 + growth_rate) ** year) / ((1 + discount_rate) ** year) for year in range(1, years + 1)]
+    terminal_value = (fcfs[-1] * (1 + growth_rate)) / (discount_rate - growth_rate)
+    return round(sum(fcfs) + terminal_value / ((1 + discount_rate) ** years), 2)
+
+
+def test_matches_single_ticker_models():
+    fundamentals = [{"eps": 6.0, "growth": 0.1, "dividend": 0.9, "fcf": 1e9}]
+    values = valuations(fundamentals)
+    assert values["lynch"][0] == round(6.0 * 0.1 * 22.5, 2)
+    assert values["ddm"][0, 0, 0] == round(0.9 / (0.08 - 0.05), 2)
+    assert values["dcf"][0, 0, 0] == reference_dcf(1e9, 0.08, 0.05)
+
+
+def test_sensitivity_grid_in_one_pass():
+    fundamentals = [{"fcf": 1e9}, {"fcf": 2e9, "dividend": 1.0}]
+    discount = [0.07, 0.08, 0.09]
+    growth = [0.02, 0.03]
+    values = valuations(fundamentals, discount, growth)
+    assert values["dcf"].shape == (2, 3, 2)
+    for i, fcf in enumerate([1e9, 2e9]):
+        for j, r in enumerate(discount):
+            for k, g in enumerate(growth):
+                assert np.isclose(values["dcf"][i, j, k], reference_dcf(fcf, r, g))
+
+
+def test_inapplicable_models_are_null():
+    fundamentals = [extract_fundamentals("LOSS", {"trailingEps": -1, "freeCashflow": -5})]
+    values = valuations(fundamentals, discount_rates=[0.03], growth_rates=[0.05])
+    assert to_json(values["lynch"]) == [None]
+    assert to_json(values["dcf"]) == [[[None]]]
+    assert fundamentals[0]["name"] == "LOSS"
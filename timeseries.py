@@ -0,0 +1,204 @@
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from collections import namedtuple
+
+from lazy import lazy_import
+from metrics import record_cache
+from providers import INTERVAL_MINUTES, PERIOD_DAYS
+
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+Bars = namedtuple("Bars", ["ts", "open", "high", "low", "close", "volume", "tz"])
+
+COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+DAY = 86400
+
+# how long a stored tail is trusted before asking upstream for newer bars
+REFRESH_AFTER = {"1m": 60, "5m": 300, "15m": 900, "30m": 1800, "1h": 3600, "1d": 3600}
+# days of bars kept per interval; older rows are dropped whenever the file is rewritten
+RETAIN_DAYS = {"1m": 30, "5m": 60, "15m": 60, "30m": 60, "1h": 730}
+
+
+def frame_to_array(frame):
+    if frame.empty:
+        return np.empty((0, 6), dtype=np.float64)
+    frame = frame.dropna(how="all", subset=list(COLUMNS))
+    ts = frame.index.asi8 // 10**9 if frame.index.tz is not None else \
+        frame.index.tz_localize("UTC").asi8 // 10**9
+    array = np.empty((len(frame), 6), dtype=np.float64)
+    array[:, 0] = ts
+    for i, column in enumerate(COLUMNS, start=1):
+        array[:, i] = frame[column].to_numpy(dtype=np.float64)
+    return array
+
+
+def merge(existing, fresh):
+    # fresh bars win from their first timestamp on; the last stored bar is often a partial one
+    if existing is None or not len(existing):
+        return fresh
+    if not len(fresh):
+        return existing
+    keep = np.searchsorted(existing[:, 0], fresh[0, 0], side="left")
+    return np.concatenate([existing[:keep], fresh])
+
+
+class OHLCVStore:
+    """Local columnar store of OHLCV bars, one memory-mapped .npy file per ticker+interval.
+
+    Rows are ``[epoch_seconds, open, high, low, close, volume]`` sorted by
+    time. A request only goes upstream when the store does not reach back far
+    enough for the range or when its tail has outlived ``refresh_after``
+    (``REFRESH_AFTER`` unless a ``(interval, fetched_at)`` callable is given);
+    the tail fetch asks for the smallest period that covers the gap and is
+    merged in. Every range is then served by slicing the stored array.
+
+    A failed refresh serves the stored bars as they are (``is_stale`` turns
+    true) and is not retried for ``retry_after`` seconds; symbols with
+    nothing stored re-raise the remembered error for that long instead.
+
+    Intervals listed in ``retain_days`` keep only that many days of bars,
+    so the files rewritten every minute during the session stay small.
+
+    Each writer renames its own temp files into place, and the metadata
+    records the row count and last timestamp it was written with, so a
+    reader that catches the .npy and .json from different writes, or an
+    unreadable file, treats the pair as missing and fetches again.
+    """
+
+    def __init__(self, root, fetch, clock=time.time, retry_after=30, refresh_after=None, retain_days=RETAIN_DAYS):
+        self.root = root
+        self.retain_days = retain_days
+        self.refresh_after = refresh_after or (lambda interval, fetched_at: REFRESH_AFTER.get(interval, 3600))
+        self.fetch = fetch
+        self.clock = clock
+        self.retry_after = retry_after
+        self.failures = {}
+        os.makedirs(root, exist_ok=True)
+
+    def _base(self, ticker, interval):
+        name = re.sub(r"[^A-Za-z0-9._-]", "_", ticker)
+        return os.path.join(self.root, f"{name}_{interval}")
+
+    def read(self, ticker, interval):
+        base = self._base(ticker, interval)
+        try:
+            with open(base + ".json") as f:
+                meta = json.load(f)
+            try:
+                array = np.load(base + ".npy", mmap_mode="r")
+            except ValueError:
+                # empty arrays cannot be memory-mapped
+                array = np.load(base + ".npy")
+        except (OSError, ValueError, EOFError):
+            return None, None
+        if array.ndim != 2:
+            return None, None
+        last = float(array[-1, 0]) if len(array) else None
+        # files from before the pair was tagged carry neither key and are taken as they are
+        if meta.get("rows", len(array)) != len(array) or meta.get("last", last) != last:
+            return None, None
+        return array, meta
+
+    def _replace(self, path, dump):
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                dump(f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def write(self, ticker, interval, array, meta):
+        base = self._base(ticker, interval)
+        array = np.ascontiguousarray(array)
+        meta = dict(meta, rows=len(array), last=float(array[-1, 0]) if len(array) else None)
+        # write-then-rename so readers in other workers never see a partial file
+        self._replace(base + ".npy", lambda f: np.save(f, array))
+        self._replace(base + ".json", lambda f: f.write(json.dumps(meta).encode()))
+        return array, meta
+
+    def _tail_period(self, gap_seconds):
+        days = gap_seconds / DAY + 1
+        for period, period_days in sorted(PERIOD_DAYS.items(), key=lambda item: item[1]):
+            if period_days >= days:
+                return period
+        return max(PERIOD_DAYS, key=PERIOD_DAYS.get)
+
+    def sync(self, ticker, period, interval):
+        now = self.clock()
+        needed_from = now - PERIOD_DAYS.get(period, 1) * DAY
+        retained_from = now - self.retain_days[interval] * DAY if interval in self.retain_days else None
+        if retained_from is not None:
+            needed_from = max(needed_from, retained_from)
+        array, meta = self.read(ticker, interval)
+
+        if array is None or needed_from < meta["covered_from"]:
+            fetch_period = period
+        elif now - meta["fetched_at"] >= self.refresh_after(interval, meta["fetched_at"]):
+            last = array[-1, 0] if len(array) else meta["covered_from"]
+            fetch_period = self._tail_period(now - last)
+            if interval in INTERVAL_MINUTES and PERIOD_DAYS[fetch_period] > 5:
+                # upstream only keeps a few days of intraday bars
+                fetch_period = period
+        else:
+            record_cache("ohlcv", hits=1)
+            return array, meta
+
+        record_cache("ohlcv", misses=1)
+        failure = self.failures.get((ticker, interval))
+        if failure and now - failure[0] < self.retry_after:
+            if array is None:
+                raise failure[1]
+            return array, meta
+        try:
+            frame = self.fetch(ticker, period=fetch_period, interval=interval)
+        except Exception as e:
+            self.failures[(ticker, interval)] = (now, e)
+            if array is None:
+                raise
+            logging.warning(f"Refreshing {ticker} {interval} bars failed, serving stored copy: {e}")
+            return array, meta
+        self.failures.pop((ticker, interval), None)
+        fresh = frame_to_array(frame)
+        array = merge(None if array is None else np.asarray(array), fresh)
+        covered_from = min(needed_from, meta["covered_from"]) if meta else needed_from
+        if retained_from is not None:
+            array = array[np.searchsorted(array[:, 0], retained_from, side="left"):]
+            covered_from = max(covered_from, retained_from)
+        tz = str(frame.index.tz) if getattr(frame.index, "tz", None) is not None else "UTC"
+        meta = {
+            "covered_from": covered_from,
+            "fetched_at": now,
+            "tz": meta["tz"] if meta and not len(fresh) else tz,
+        }
+        # what we just wrote, not a re-read another writer may have replaced meanwhile
+        return self.write(ticker, interval, array, meta)
+
+    def is_stale(self, ticker, interval):
+        return (ticker, interval) in self.failures
+
+    def window_start(self, array, meta, period, interval):
+        """Row index where ``period`` begins in a stored array."""
+        if not len(array):
+            return 0
+        ts = array[:, 0]
+        if interval in INTERVAL_MINUTES and period == "1d":
+            # one-day intraday ranges show the latest session, not the trailing 24h
+            last = pd.Timestamp(int(ts[-1]), unit="s", tz="UTC").tz_convert(meta["tz"])
+            start = last.normalize().timestamp()
+        else:
+            start = self.clock() - PERIOD_DAYS.get(period, 1) * DAY
+        return int(np.searchsorted(ts, start, side="left"))
+
+    def get(self, ticker, period="1d", interval="1m"):
+        array, meta = self.sync(ticker, period, interval)
+        window = array[self.window_start(array, meta, period, interval):]
+        return Bars(*(window[:, i] for i in range(6)), meta["tz"])
@@ -1,44 +1,49 @@
 import json
-import yfinance as yf
 
 WATCHLIST = 'watchlist.json'
 
-def save_watchlist(tickers):
-    with open(WATCHLIST, 'w') as f:
-        json.dump(tickers, f)
+def format_large_number(value):
+    try:
+        value = float(value)
+        if abs(value) >= 1_000_000_000:
+            return "${:,.2f}B".format(value / 1_000_000_000)
+        elif abs(value) >= 1_000_000:
+            return "${:,.2f}M".format(value / 1_000_000)
+        elif abs(value) >= 1_000:
+            return "${:,.2f}K".format(value / 1_000)
+        else:
+            return "${:,.2f}".format(value)
+    except (ValueError, TypeError):
+        return value
 
-def load_watchlist():
+def load_watchlist(path=WATCHLIST):
+    # legacy shared watchlist file, only read by the import-watchlist command
     try:
-        with open(WATCHLIST, 'r') as f:
+        with open(path, 'r') as f:
             return json.load(f)
     except FileNotFoundError:
         return []
 
-def fetch_stockdata(ticker):
+def fetch_stockdata(tickers, provider):
     try:
-        stock = yf.Ticker(ticker)
-        data = stock.history(period='1d')
-        if not data.empty:
-            row = data.iloc[-1]
-            price = row['Close']
-            high = row['High']
-            low = row['Low']
-            volume = row['Volume']
-            prev_close = stock.info.get('previousClose', price)
-            change = price - prev_close
-            change_percent = (change / prev_close * 100) if prev_close else 0
-            date = row.name.strftime("%Y-%m-%d")
+        quotes = provider.get_quotes(tickers)
+    except Exception:
+        return {}
 
-            return {
+    stale = getattr(quotes, 'stale', ())
+    data = {}
+    for ticker in tickers:
+        quote = quotes.get(ticker)
+        if quote:
+            data[ticker] = {
                 'ticker': ticker,
-                'price': price,
-                'date': date,
-                'change': change,
-                'change_percent': change_percent,
-                'high': high,
-                'low': low,
-                'volume': volume,
+                'price': quote['price'],
+                'date': quote['date'],
+                'change': quote['change'],
+                'change_percent': quote['change_percent'],
+                'high': quote['high'],
+                'low': quote['low'],
+                'volume': quote['volume'],
+                'stale': ticker in stale,
             }
-        return None
-    except Exception:
-        return None
\ No newline at end of file
+    return data
@@ -0,0 +1,76 @@
+from lazy import lazy_import
+
+
+np = lazy_import("numpy")
+
+
+LYNCH_MULTIPLE = 22.5
+DEFAULT_GROWTH = 0.05
+DEFAULT_DISCOUNT_RATE = 0.08
+DEFAULT_YEARS = 5
+
+# the subset of stock.info the valuation models and profile cards read
+INFO_FIELDS = {
+    "name": "shortName",
+    "long_name": "longName",
+    "currency": "currency",
+    "pe": "trailingPE",
+    "eps": "trailingEps",
+    "dividend": "dividendRate",
+    "growth": "earningsGrowth",
+    "fcf": "freeCashflow",
+}
+
+
+def extract_fundamentals(ticker, info):
+    fundamentals = {field: info.get(key) for field, key in INFO_FIELDS.items()}
+    fundamentals["name"] = fundamentals["name"] or ticker
+    fundamentals["long_name"] = fundamentals["long_name"] or ticker
+    fundamentals["currency"] = fundamentals["currency"] or "USD"
+    return fundamentals
+
+
+def _column(fundamentals, field):
+    return np.array([f.get(field) if f.get(field) is not None else np.nan for f in fundamentals],
+                    dtype=np.float64)
+
+
+def valuations(fundamentals, discount_rates=(DEFAULT_DISCOUNT_RATE,), growth_rates=(DEFAULT_GROWTH,),
+               years=DEFAULT_YEARS):
+    """Lynch, DDM and DCF values for many tickers over a grid of rates at once.
+
+    Returns arrays shaped ``(tickers,)`` for Lynch and
+    ``(tickers, discount_rates, growth_rates)`` for DDM and DCF, with NaN
+    wherever a model does not apply (missing inputs, non-positive EPS or
+    FCF, or a discount rate not above the growth rate).
+    """
+    eps = _column(fundamentals, "eps")
+    growth = _column(fundamentals, "growth")
+    dividend = _column(fundamentals, "dividend")
+    fcf = _column(fundamentals, "fcf")
+
+    growth = np.where(np.isnan(growth) | (growth == 0), DEFAULT_GROWTH, growth)
+    lynch = np.where(eps > 0, eps * growth * LYNCH_MULTIPLE, np.nan)
+
+    r = np.asarray(discount_rates, dtype=np.float64)[:, None]
+    g = np.asarray(growth_rates, dtype=np.float64)[None, :]
+    spread = np.where(r > g, r - g, np.nan)
+
+    dividend = np.where(dividend > 0, dividend, np.nan)
+    ddm = dividend[:, None, None] / spread
+
+    # discounted cash flow factors per (discount, growth, year)
+    year = np.arange(1, years + 1, dtype=np.float64)
+    factors = ((1 + g)[..., None] / (1 + r)[..., None]) ** year
+    # same terminal value treatment the /analysis page has always shown
+    terminal = factors[..., -1] * (1 + g) / spread / (1 + r) ** years
+    fcf = np.where(fcf > 0, fcf, np.nan)
+    dcf = fcf[:, None, None] * (factors.sum(axis=-1) + terminal)
+
+    return {"lynch": np.round(lynch, 2), "ddm": np.round(ddm, 2), "dcf": np.round(dcf, 2)}
+
+
+def to_json(values):
+    array = np.asarray(values, dtype=object)
+    array[np.isnan(np.asarray(values, dtype=np.float64))] = None
+    return array.tolist()